@@ -1,10 +1,11 @@
 # abstract_validator.py - version 1.1
 
-import spacy
 import os
 import re
+import sys
 import datetime
 import argparse
+from dataclasses import replace
 
 from config import INPUT_FILE, CONFIG_FILE, WEIGHT_FILE, OUTPUT_FILE
 from loader import Loader
@@ -14,16 +15,45 @@ from methodology_analysis import MethodologyValidator
 from outcomes_analysis import OutcomesValidator
 from impact_analysis import ImpactValidator
 from ethics_analysis import EthicsValidator
-from summarizer import StructuredSummarizer
+from results import AbstractResult, atomic_path, render_text, check_results_path, write_results
+from keyword_matcher import KeywordMatcher
+from bloom_detection import BloomIndex
+from pipeline import collect_requirements
+from domain_index import is_multi_tag, parse_tags
+from registry import REGISTRY
+from doc_cache import DocCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from corpus_reader import iter_corpus, parse_byte_range, parse_shard
+from dedup import DEFAULT_INDEX as DEFAULT_DEDUP_INDEX, DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD
+from journal import Journal, DEFAULT_NAME as DEFAULT_JOURNAL_NAME
+import profiling
 
 
 class AbstractValidator:
+    # Every component that reads the section Docs; their REQUIRES decide which
+    # spaCy components are loaded (NER is never needed). The summarizer is added
+    # in requirements(): it imports NumPy and spaCy, which this module only
+    # imports once a stage needs them (fast --help and --server start-up).
+    CONSUMERS = (
+        BackgroundValidator,
+        HypothesisValidator,
+        MethodologyValidator,
+        OutcomesValidator,
+        ImpactValidator,
+        EthicsValidator,
+    )
+
+    SECTION_NAMES = ("background", "hypothesis", "methodology", "outcomes", "impact")
+
     def __init__(self, input_file, config_file, weight_file, output_file,
                  domain_tag: str | None = None,
-                 lexicon_dir: str = "lexicon"):
+                 lexicon_dir: str = "lexicon",
+                 nlp=None,
+                 doc_cache=None):
         """
         domain_tag: optional curated lexicon tag (e.g., 'pparg', 'obesity')
         lexicon_dir: base directory for lexicon/<tag>/lexicon_<tag>.csv
+        nlp: optional spaCy pipeline already loaded by the caller (e.g., BatchValidator)
+        doc_cache: optional DocCache; parsed sections are reused across runs
         """
         self.loader = Loader(
             input_file, 
@@ -34,137 +64,177 @@ class AbstractValidator:
         )
         self.output_file = output_file
         self.domain_tag = domain_tag
-        self.nlp = spacy.load("en_core_web_sm")
+        # With a cache the model is only loaded once a section misses it
+        self.nlp = nlp if nlp is not None else REGISTRY.get_pipeline(self.requirements(), lazy=doc_cache is not None)
+        self.doc_cache = doc_cache
         self.results = []
+        self.features = {}           # section -> SectionFeatures
+        self.signals = {}            # weight section -> {weight key: detected factor} (rescoring.py)
+        self.scores = {}             # weight section -> score (%)
+        self.domain_hits = {}        # weight section -> number of domain terms found
+        self.section_results = []    # SectionResult per validator, in report order
+        self.summary = ""
+        self.result = None           # AbstractResult (results.py)
         self.keywords = []
         self.domain_lexicon = None   # <<< place to keep save the lexicon
+        self.domain_scores = {}      # multi-domain mode: tag -> hits and BKG/HYP scores
+        self.best_domain = None
+        self.content_key = None      # batch mode: dedup.content_key() of the sections and keywords
+        self.resumed = False         # batch --resume: result taken from the journal, report already written
+
+    @classmethod
+    def requirements(cls):
+        """
+        Token attributes needed by all validators and the summarizer.
+        """
+        from summarizer import StructuredSummarizer
+
+        return collect_requirements(*cls.CONSUMERS, StructuredSummarizer)
+
+    def set_resources(self, config, weights, domain_lexicon=None, matcher=None, bloom_index=None):
+        """
+        Reuse configuration already loaded by the caller instead of reading it again.
+        """
+        self.config = config
+        self.weights = weights
+        self.domain_lexicon = domain_lexicon
+        self.matcher = matcher if matcher is not None else KeywordMatcher(config)
+        self.bloom_index = bloom_index if bloom_index is not None else BloomIndex(
+            config["BLOOM_VERBS"], config["BLOOM_SYNONYMS"]
+        )
+
+    def set_sections(self, sections, keywords):
+        """
+        sections : [background, hypothesis, methodology, outcomes, impact] texts
+        keywords : list of keywords from the #keywords section
+        """
+        self.sections = list(sections)
+        self.keywords = keywords
+
+    def set_docs(self, docs):
+        """
+        Use section Docs parsed elsewhere (e.g., by nlp.pipe in BatchValidator).
+        """
+        (self.background_doc,
+         self.hypothesis_doc,
+         self.methodology_doc,
+         self.outcomes_doc,
+         self.impact_doc) = docs
 
     def load_resources(self):
-        self.config = self.loader.load_config()
-        self.weights = self.loader.load_weights()
+        # Config, weights and lexicon are shared process-wide (reloaded if the files change)
+        self.config = REGISTRY.get_config(self.loader.config_file)
+        self.weights = REGISTRY.get_weights(self.loader.weight_file)
+        self.matcher = REGISTRY.get_matcher(self.loader.config_file)
+        self.bloom_index = REGISTRY.get_bloom_index(self.loader.config_file)
         raw_text = self.loader.load_text()
         background, hypothesis, methodology, outcomes, impact, keywords = self.loader.split_sections(raw_text)
         self.keywords = keywords
 
         # Cargar lexicon de dominio (si domain_tag fue proporcionado)
-        self.domain_lexicon = self.loader.load_domain_lexicon()
-        
-        self.background_doc = self.nlp(background)
-        self.hypothesis_doc = self.nlp(hypothesis)
-        self.methodology_doc = self.nlp(methodology)
-        self.outcomes_doc = self.nlp(outcomes)
-        self.impact_doc = self.nlp(impact)
+        # In multi-domain mode the lexicon is chosen later by select_domain()
+        if not is_multi_tag(self.domain_tag):
+            self.domain_lexicon = REGISTRY.get_lexicon(self.loader.lexicon_dir, self.domain_tag)
         self.sections = [background, hypothesis, methodology, outcomes, impact]
-        
+
     def process_sections(self):
-        (self.background_doc,
-         self.hypothesis_doc,
-         self.methodology_doc,
-         self.outcomes_doc,
-         self.impact_doc) = [self.nlp(section) for section in self.sections]
-
-    def add_header(self):
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        header = [
-            "========================================================",
-            "      SPAA: SCIENTIFIC PROPOSAL ABSTRACT ANALIZER",
-            "        ",
-            "--------------------------------------------------------",
-            " A domain-aware expert system for evaluating scientific",
-            " proposal abstracts using NLP-spaCy and curated lexicons.",
-            "--------------------------------------------------------",
-            "Developer: Flavio F. Contreras-Torres",
-            "Version: v.1.0 - May, 2025. Oviedo",
-            "Version: v.1.1 - November, 2025. Monterrey",
-            f"Execution Date: {now}",
-            "--------------------------------------------------------",
-            "GitHub: https://github.com/NanoBiostructuresRG",
-            "========================================================\n"
+        # Each section is parsed exactly once; validators and summarizer reuse these Docs
+        if self.doc_cache is not None:
+            self.set_docs(list(self.doc_cache.pipe(self.nlp, self.sections)))
+        else:
+            self.set_docs(list(self.nlp.pipe(self.sections)))
+
+    def docs(self):
+        return [
+            self.background_doc,
+            self.hypothesis_doc,
+            self.methodology_doc,
+            self.outcomes_doc,
+            self.impact_doc,
         ]
-        self.results.extend(header)
+
+    def extract_features(self):
+        """
+        Single extraction pass per section Doc; validators score from these features.
+        """
+        from section_features import extract_features
+
+        self.features = {
+            name: extract_features(doc, self.matcher, self.bloom_index, text)
+            for name, doc, text in zip(self.SECTION_NAMES, self.docs(), self.sections)
+        }
+        if profiling.ACTIVE is not None:
+            profiling.count("tokens", sum(features.n_tokens for features in self.features.values()))
+            profiling.count("sentences", sum(len(list(doc.sents)) for doc in self.docs() if len(doc)))
+
+    def release_docs(self):
+        """
+        Drop the section Docs once features and summary have been produced.
+        """
+        self.set_docs([None] * len(self.SECTION_NAMES))
+
+    def record(self, result):
+        """
+        Keep the SectionResult of a validator; its flags allow re-scoring without NLP.
+        """
+        self.section_results.append(result)
+        self.signals[result.section] = result.flags
+        self.scores[result.section] = result.score
+        if result.section in ("BACKGROUND", "HYPOTHESIS"):
+            self.domain_hits[result.section] = result.domain_terms
 
     def validate_background(self):
         validator = BackgroundValidator(
-            self.background_doc, 
-            self.config, 
+            self.features["background"],
             self.weights["BACKGROUND"],
             domain_lexicon=self.domain_lexicon
         )
-        feedback, score = validator.validate()
-        self.results.append("[1. BACKGROUND VALIDATION]\n")
-        self.results.extend(feedback)
-        self.results.append(f"\nBKG_SCORE: {score}%\n")
+        self.record(validator.validate())
 
     def validate_hypothesis(self):
         validator = HypothesisValidator(
-            self.hypothesis_doc,
-            self.config,
+            self.features["hypothesis"],
             self.weights["HYPOTHESIS"],
-            self.config["BLOOM_VERBS"],
-            self.config["BLOOM_SYNONYMS"],
             domain_lexicon=self.domain_lexicon # opcional
         )
-        feedback, score = validator.validate()
-        self.results.append("\n[2. HYPOTHESIS VALIDATION]\n")
-        self.results.extend(feedback)
-        self.results.append(f"\nHYP_SCORE: {score}%\n")
+        self.record(validator.validate())
 
     def validate_methodology(self):
         validator = MethodologyValidator(
-            self.methodology_doc,
-            self.config["BLOOM_VERBS"],
-            self.config["BLOOM_SYNONYMS"],
+            self.features["methodology"],
             self.weights["METHODOLOGY"],
             # domain_lexicon=self.domain_lexicon  # opcional
         )
-        feedback, score = validator.validate()
-        self.results.append("\n[3. METHODOLOGY VALIDATION]\n")
-        self.results.extend(feedback)
-        self.results.append(f"\nMETH_SCORE: {score}%\n")
+        self.record(validator.validate())
 
     def validate_outcomes(self):
         validator = OutcomesValidator(
-            self.outcomes_doc,
-            self.config["BLOOM_VERBS"],
-            self.config["BLOOM_SYNONYMS"],
+            self.features["outcomes"],
             self.weights["OUTCOMES"],
             # domain_lexicon=self.domain_lexicon  # opcional
         )
-        feedback, score = validator.validate()
-        self.results.append("\n[4. EXPECTED OUTCOMES VALIDATION]\n")
-        self.results.extend(feedback)
-        self.results.append(f"\nOUT_SCORE: {score}%\n")
+        self.record(validator.validate())
 
     def validate_impact(self):
         validator = ImpactValidator(
-            self.impact_doc,
-            self.config["BLOOM_VERBS"],
-            self.config["BLOOM_SYNONYMS"],
+            self.features["impact"],
             self.weights["IMPACT"],
             # domain_lexicon=self.domain_lexicon  # opcional
         )
-        feedback, score = validator.validate()
-        self.results.append("\n[5. IMPACT VALIDATION]\n")
-        self.results.extend(feedback)
-        self.results.append(f"\nIMPACT_SCORE: {score}%\n")
+        self.record(validator.validate())
 
     def validate_ethics(self):
         validator = EthicsValidator(
-            self.impact_doc,
-            self.config["ETHICS_KEYWORDS"],
+            self.features["impact"],
             self.weights["ETHICS"]
         )
-        feedback, score = validator.validate()
-        self.results.append("\n[6. ETHICS VALIDATION]\n")
-        self.results.extend(feedback)
-        self.results.append(f"\nETHICS_SCORE: {score}%\n")
+        self.record(validator.validate())
 
     def summarize_abstract(self):
-        full_text = " ".join(self.sections)
-        full_doc = self.nlp(full_text)
-        full_text_lower = full_text.lower()
+        from summarizer import StructuredSummarizer
+
+        full_text_lower = " ".join(self.sections).lower()
 
-            
         matched_keywords = []
         for kw in self.keywords:
             if kw.lower() in full_text_lower:
@@ -194,27 +264,156 @@ class AbstractValidator:
             n_sent_outcomes=1,
             n_sent_impact=1,
         )
-        self.results.append("\n[7. ABSTRACT SUMMARY]\n")
-        self.results.append(summary)
+        self.summary = summary
     
+    def select_domain(self):
+        """
+        Multi-domain mode (--tag all, or tag1,tag2,...): score Background and
+        Hypothesis against every requested lexicon from the features of the
+        single parse, then keep the best-fitting lexicon for the report.
+        """
+        index = REGISTRY.get_domain_index(self.loader.lexicon_dir)
+        tags = parse_tags(self.domain_tag, self.loader.lexicon_dir)
+        for tag in tags:
+            if tag not in index.tags:
+                print(f"[WARN] Domain lexicon not found for tag '{tag}'")
+        tags = [tag for tag in tags if tag in index.tags]
+
+        bkg_hits = index.hits(self.features["background"].lemmas, tags)
+        hyp_hits = index.hits(self.features["hypothesis"].lemmas, tags)
+
+        # Validators only read the 'ALL' set, so passing the hit set gives the
+        # same result as the full lexicon; equal hit sets share one evaluation
+        scores = {}
+
+        def score(validator_class, section, hits):
+            key = (validator_class, section, frozenset(hits))
+            if key not in scores:
+                validator = validator_class(
+                    self.features[section],
+                    self.weights[section.upper()],
+                    domain_lexicon={"ALL": hits}
+                )
+                scores[key] = validator.validate().score
+            return scores[key]
+
+        self.domain_scores = {}
+        for tag in tags:
+            bkg = bkg_hits.get(tag, set())
+            hyp = hyp_hits.get(tag, set())
+            self.domain_scores[tag] = {
+                "background_hits": len(bkg),
+                "hypothesis_hits": len(hyp),
+                "background_score": score(BackgroundValidator, "background", bkg),
+                "hypothesis_score": score(HypothesisValidator, "hypothesis", hyp),
+            }
+
+        ranking = self.domain_ranking()
+        self.best_domain = ranking[0] if ranking else None
+        self.domain_lexicon = (
+            REGISTRY.get_lexicon(self.loader.lexicon_dir, self.best_domain) if self.best_domain else None
+        )
+
+    def domain_ranking(self):
+        """
+        Tags sorted by BKG + HYP score, then by number of domain terms.
+        """
+        def fit_key(tag):
+            fit = self.domain_scores[tag]
+            return (
+                fit["background_score"] + fit["hypothesis_score"],
+                fit["background_hits"] + fit["hypothesis_hits"],
+            )
+        return sorted(self.domain_scores, key=fit_key, reverse=True)
+
+    def build_result(self, abstract_id=None):
+        """
+        AbstractResult of the evaluation; self.results holds its text rendering.
+        """
+        self.result = AbstractResult(
+            id=abstract_id if abstract_id is not None else self.loader.input_file,
+            executed_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            sections=list(self.section_results),
+            summary=self.summary,
+            keywords=list(self.keywords),
+            best_domain=self.best_domain,
+            # In report order: best-fitting domain first
+            domain_scores={tag: self.domain_scores[tag] for tag in self.domain_ranking()},
+        )
+        self.results = render_text(self.result)
+        return self.result
+
+    def use_result(self, result, keywords=None):
+        """
+        Adopt an AbstractResult computed earlier for the same text (dedup.py)
+        instead of evaluating; self.results holds its text rendering.
+        """
+        self.section_results = []
+        for section in result.sections:
+            self.record(section)
+        self.summary = result.summary
+        self.keywords = list(keywords) if keywords is not None else list(result.keywords)
+        self.best_domain = result.best_domain
+        self.domain_scores = dict(result.domain_scores)
+        self.result = replace(
+            result,
+            id=self.loader.input_file,
+            executed_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            keywords=list(self.keywords),
+        )
+        self.results = render_text(self.result)
+        return self.result
+
+    def report_dict(self, abstract_id=None):
+        """
+        JSON-serializable report: AbstractResult.to_dict() plus the text report.
+        """
+        data = self.result.to_dict()
+        if abstract_id is not None:
+            data["id"] = abstract_id
+        data["report"] = "\n".join(self.results)
+        return data
+
     def save_results(self):
         os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(self.results))
+        with atomic_path(self.output_file) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.results))
         print(f"Validation completed. Results saved to: {self.output_file}")
 
+    def evaluate(self):
+        """
+        Run every validator and the summarizer on the parsed section Docs.
+        """
+        self.section_results = []
+        with profiling.scope(self.loader.input_file):
+            with profiling.stage("extract_features"):
+                self.extract_features()
+            if is_multi_tag(self.domain_tag):
+                with profiling.stage("select_domain"):
+                    self.select_domain()
+            for name, validate in (
+                ("validate_background", self.validate_background),
+                ("validate_hypothesis", self.validate_hypothesis),
+                ("validate_methodology", self.validate_methodology),
+                ("validate_outcomes", self.validate_outcomes),
+                ("validate_impact", self.validate_impact),
+                ("validate_ethics", self.validate_ethics),
+                ("summarize_abstract", self.summarize_abstract),
+            ):
+                with profiling.stage(name):
+                    validate()
+            with profiling.stage("build_result"):
+                return self.build_result()
+
     def run(self):
-        self.load_resources()
-        self.process_sections()
-        self.add_header()
-        self.validate_background()
-        self.validate_hypothesis()
-        self.validate_methodology()
-        self.validate_outcomes()
-        self.validate_impact()
-        self.validate_ethics()
-        self.summarize_abstract()
-        self.save_results()
+        with profiling.stage("load_resources"):
+            self.load_resources()
+        with profiling.stage("parse"):
+            self.process_sections()
+        self.evaluate()
+        with profiling.stage("save_results"):
+            self.save_results()
 
 def parse_args():
     parser = argparse.ArgumentParser(description="SPAA - Scientific Proposal Abstract Analyzer")
@@ -222,11 +421,318 @@ def parse_args():
         "--tag",
         type=str,
         default=None,
-        help="Domain tag to activate a curated lexicon (e.g., pparg, obesity, cb1)."
+        help="Domain tag to activate a curated lexicon (e.g., pparg, obesity, cb1). "
+             "Use 'all' or a comma-separated list to score every lexicon in one pass."
+    )
+    parser.add_argument(
+        "--input-dir",
+        type=str,
+        default=None,
+        help="Batch mode: evaluate every abstract file in this directory."
+    )
+    parser.add_argument(
+        "--glob",
+        type=str,
+        default="*.txt",
+        help="Batch mode: filename pattern inside --input-dir (default: *.txt)."
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default="output",
+        help="Batch mode: directory for the per-abstract reports (default: output)."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Batch mode: number of sections per nlp.pipe batch (default: 64)."
+    )
+    parser.add_argument(
+        "--n-process",
+        type=int,
+        default=1,
+        help="Batch mode: number of processes used by nlp.pipe (default: 1)."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk cache of parsed sections."
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Re-parse every section and overwrite its cache entry."
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory of the parsed-section cache (default: {DEFAULT_CACHE_DIR})."
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Size bound of the parsed-section cache in MB; least recently used entries are evicted."
+    )
+    parser.add_argument(
+        "--jsonl-in",
+        type=str,
+        default=None,
+        help="Streaming mode: read JSONL abstracts ({id, sections, keywords} or {id, text}) from this file, or '-' for stdin."
+    )
+    parser.add_argument(
+        "--jsonl-out",
+        type=str,
+        default="-",
+        help="Streaming mode: write one JSON result per abstract to this file, or '-' for stdout (default)."
+    )
+    parser.add_argument(
+        "--corpus",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Corpus mode: stream every abstract of these multi-abstract files ('# abstract: <id>' headers) "
+             "through a memory-mapped offset index (<file>.idx, see corpus_reader.py)."
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="Corpus mode: only evaluate the K-th of N byte ranges of each file, as K/N (e.g., 2/8)."
+    )
+    parser.add_argument(
+        "--byte-range",
+        type=parse_byte_range,
+        default=None,
+        help="Corpus mode: only evaluate the abstracts starting in this byte range, as START:END."
+    )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Corpus mode: rescan the corpus files and overwrite their offset index."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Batch / corpus mode: skip the abstracts finished by an earlier run (same text and settings) "
+             "according to its journal, and only evaluate the missing or changed ones."
+    )
+    parser.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+        help=f"Batch / corpus mode: progress journal of the run (default: <output-dir>/{DEFAULT_JOURNAL_NAME})."
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Re-validate the input file (or every --input-dir file) whenever it changes, "
+             "re-parsing only the edited sections."
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.5,
+        help="Watch mode: polling interval in seconds (default: 0.5)."
+    )
+    parser.add_argument(
+        "--server",
+        type=str,
+        default=None,
+        help="Forward the abstract to a running server.py (e.g., http://127.0.0.1:8765 or unix:/tmp/spaa.sock)."
+    )
+    parser.add_argument(
+        "--results-out",
+        type=str,
+        default=None,
+        help="Also write structured results; format from the extension (.json, .jsonl, .csv, .parquet, .npz)."
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="output/profile_trace.json",
+        default=None,
+        help="Time every stage and spaCy component; writes a Chrome trace (default: output/profile_trace.json) "
+             "and prints a summary table."
+    )
+    parser.add_argument(
+        "--features-out",
+        type=str,
+        default=None,
+        help="Save the detected signals as a feature matrix (.npz) for NLP-free re-scoring (rescoring.py)."
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Batch / streaming mode: reuse stored results for exact duplicates and flag near-duplicates "
+             "(index persisted across runs, see dedup.py)."
+    )
+    parser.add_argument(
+        "--dedup-index",
+        type=str,
+        default=DEFAULT_DEDUP_INDEX,
+        help=f"SQLite index of seen abstracts and their results (default: {DEFAULT_DEDUP_INDEX})."
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=DEFAULT_DEDUP_THRESHOLD,
+        help=f"Estimated Jaccard similarity above which abstracts are near-duplicates (default: {DEFAULT_DEDUP_THRESHOLD})."
+    )
+    parser.add_argument(
+        "--dedup-report",
+        type=str,
+        default=None,
+        help="Write the duplicates found and the near-duplicate groups to this JSON file (implies --dedup)."
     )
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
-    validator = AbstractValidator(INPUT_FILE, CONFIG_FILE, WEIGHT_FILE, OUTPUT_FILE, domain_tag=args.tag)
-    validator.run()
+    if args.server:
+        from client import ValidationClient
+
+        # The warm server does the parsing; only the report is written here
+        report = ValidationClient(args.server).validate_file(INPUT_FILE, tag=args.tag)
+        os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+            f.write(report["report"])
+        print(f"Validation completed. Results saved to: {OUTPUT_FILE}")
+        raise SystemExit(0)
+    profiler = profiling.activate(profiling.Profiler()) if args.profile else None
+    doc_cache = None
+    if not args.no_cache:
+        doc_cache = DocCache(args.cache_dir, args.cache_max_mb * 1024 * 1024, rebuild=args.rebuild_cache)
+    dedup = None
+    if args.dedup or args.dedup_report:
+        if args.input_dir or args.jsonl_in or args.corpus:
+            from dedup import DedupIndex
+
+            dedup = DedupIndex(args.dedup_index, threshold=args.dedup_threshold)
+        else:
+            print("[WARN] --dedup only applies to batch (--input-dir / --corpus) and streaming (--jsonl-in) mode")
+    journal = None
+    if (args.input_dir or args.corpus) and not (args.watch or args.jsonl_in):
+        # Batch runs always keep a journal, so a failed run can be resumed
+        journal = Journal(args.journal or os.path.join(args.output_dir, DEFAULT_JOURNAL_NAME))
+    elif args.resume:
+        print("[WARN] --resume only applies to batch (--input-dir / --corpus) mode")
+    if args.watch:
+        from incremental import watch, directory_files
+
+        if args.input_dir:
+            paths = directory_files(args.input_dir, args.glob)
+            output_for = lambda path: os.path.join(
+                args.output_dir, f"{os.path.splitext(os.path.basename(path))[0]}_results.txt"
+            )
+        else:
+            paths = lambda: [INPUT_FILE]
+            output_for = lambda path: OUTPUT_FILE
+        watch(paths, output_for, interval=args.watch_interval, domain_tag=args.tag, doc_cache=doc_cache)
+    elif args.jsonl_in:
+        from batch_validator import BatchValidator
+        from streaming import stream_validate
+
+        batch = BatchValidator(
+            [],
+            CONFIG_FILE,
+            WEIGHT_FILE,
+            output_dir=args.output_dir,
+            domain_tag=args.tag,
+            batch_size=args.batch_size,
+            n_process=args.n_process,
+            doc_cache=doc_cache,
+            dedup=dedup,
+        )
+        if profiler:
+            profiler.instrument(batch.nlp)
+        count = stream_validate(batch, args.jsonl_in, args.jsonl_out)
+        print(f"Streaming completed: {count} abstracts", file=sys.stderr)
+        if dedup is not None:
+            counts = batch.dedup_counts
+            print(f"Dedup: {counts['reused']} stored results reused, {counts['exact']} exact and "
+                  f"{counts['near']} near-duplicates flagged", file=sys.stderr)
+            if args.dedup_report:
+                from dedup import write_report
+
+                write_report(batch.dedup_matches, dedup, args.dedup_report)
+                print(f"Dedup report saved to: {args.dedup_report}", file=sys.stderr)
+    elif args.corpus:
+        from batch_validator import BatchValidator
+
+        if args.shard and args.byte_range:
+            print("[WARN] --byte-range is ignored when --shard is given")
+        batch = BatchValidator(
+            [],
+            CONFIG_FILE,
+            WEIGHT_FILE,
+            output_dir=args.output_dir,
+            domain_tag=args.tag,
+            batch_size=args.batch_size,
+            n_process=args.n_process,
+            doc_cache=doc_cache,
+            features_out=args.features_out,
+            results_out=args.results_out,
+            dedup=dedup,
+            dedup_report=args.dedup_report,
+            journal=journal,
+            resume=args.resume,
+            corpus=True,
+        )
+        if profiler:
+            profiler.instrument(batch.nlp)
+        batch.run(iter_corpus(args.corpus, shard=args.shard, byte_range=args.byte_range,
+                              rebuild_index=args.rebuild_index))
+    elif args.input_dir:
+        from batch_validator import BatchValidator
+
+        batch = BatchValidator.from_directory(
+            args.input_dir,
+            pattern=args.glob,
+            config_file=CONFIG_FILE,
+            weight_file=WEIGHT_FILE,
+            output_dir=args.output_dir,
+            domain_tag=args.tag,
+            batch_size=args.batch_size,
+            n_process=args.n_process,
+            doc_cache=doc_cache,
+            features_out=args.features_out,
+            results_out=args.results_out,
+            dedup=dedup,
+            dedup_report=args.dedup_report,
+            journal=journal,
+            resume=args.resume,
+        )
+        if profiler:
+            profiler.instrument(batch.nlp)
+        batch.run()
+    else:
+        validator = AbstractValidator(INPUT_FILE, CONFIG_FILE, WEIGHT_FILE, OUTPUT_FILE, domain_tag=args.tag,
+                                      doc_cache=doc_cache)
+        if args.results_out:
+            check_results_path(args.results_out)
+        if profiler:
+            profiler.instrument(validator.nlp)
+        validator.run()
+        if args.results_out:
+            write_results([validator.result], args.results_out)
+            print(f"Structured results saved to: {args.results_out}")
+        if args.features_out:
+            from rescoring import FeatureMatrix
+
+            FeatureMatrix.from_validators([validator], validator.weights).save(args.features_out)
+            print(f"Signal matrix saved to: {args.features_out}")
+    if dedup is not None:
+        dedup.close()
+    if journal is not None:
+        journal.close()
+    if profiler:
+        profiling.deactivate()
+        if args.n_process > 1:
+            print("[WARN] spaCy component timings only cover the main process (use --n-process 1)", file=sys.stderr)
+        print(profiler.format_summary(), file=sys.stderr)
+        profiler.write_trace(args.profile)
+        print(f"Profile trace saved to: {args.profile}", file=sys.stderr)
@@ -0,0 +1,202 @@
+# async_api.py - asyncio interface for validating many abstracts
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CONFIG_FILE, WEIGHT_FILE
+from batch_validator import BatchValidator
+from abstract_validator import AbstractValidator
+from registry import REGISTRY
+
+
+def read_item(item):
+    """
+    (abstract id, raw text) of one input item: a path to an abstract file,
+    a (id, text) pair or a {"id", "text"} dict. Raw text must come in one of
+    the explicit forms, so a mistyped path fails instead of being scored as text.
+    """
+    if isinstance(item, dict):
+        return item.get("id"), item["text"]
+    if isinstance(item, tuple):
+        abstract_id, text = item
+        return abstract_id, text
+    path = os.fspath(item)
+    if "\n" in path:
+        raise ValueError("Raw abstract text must be passed as an (id, text) pair or an {\"id\", \"text\"} dict")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Abstract file not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return path, f.read()
+
+
+def item_id(item):
+    """
+    Best-effort abstract id of an item that could not be read, or None (raw text).
+    """
+    if isinstance(item, dict):
+        return item.get("id")
+    if isinstance(item, tuple) and item:
+        return item[0]
+    if isinstance(item, (str, os.PathLike)) and "\n" not in os.fspath(item):
+        return os.fspath(item)
+    return None
+
+
+def error_record(index, abstract_id, exc):
+    return {"index": index, "id": abstract_id, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def evaluate_batch(batch, config_file=CONFIG_FILE, weight_file=WEIGHT_FILE,
+                   domain_tag=None, lexicon_dir="lexicon"):
+    """
+    Runs in the executor: read, parse (one nlp.pipe call) and evaluate a batch.
+    batch   : list of (index, item)
+    returns : list of report_dict() with an extra 'index' key, in batch order.
+              An item that cannot be read, split or evaluated gets an error record
+              {"index", "id", "error"} instead; only a pipeline failure raises.
+
+    Module-level so it can also be sent to a ProcessPoolExecutor, where every
+    worker keeps its own warm pipeline in the process-wide REGISTRY.
+    """
+    validator = BatchValidator(
+        [],
+        config_file,
+        weight_file,
+        output_dir="",
+        domain_tag=domain_tag,
+        lexicon_dir=lexicon_dir,
+        nlp=REGISTRY.get_pipeline(AbstractValidator.requirements()),
+    )
+    validator.load_resources()
+
+    results = {}  # index -> report or error record
+    abstracts = []
+    for index, item in batch:
+        try:
+            abstract_id, text = read_item(item)
+            *sections, keywords = validator.loader.split_sections(text)
+        except Exception as exc:
+            abstract_id = item_id(item)
+            abstract_id = abstract_id if abstract_id is not None else f"abstract-{index}"
+            results[index] = error_record(index, abstract_id, exc)
+            continue
+        abstract_id = abstract_id if abstract_id is not None else f"abstract-{index}"
+        abstracts.append((index, abstract_id, sections, keywords))
+
+    texts = [section for _, _, sections, _ in abstracts for section in sections]
+    docs = list(validator.nlp.pipe(texts, batch_size=len(texts) or 1))
+
+    n = len(AbstractValidator.SECTION_NAMES)
+    for i, (index, abstract_id, sections, keywords) in enumerate(abstracts):
+        try:
+            evaluated = validator.evaluate_parsed(abstract_id, sections, keywords, docs[i * n:(i + 1) * n])
+            result = evaluated.report_dict(abstract_id)
+        except Exception as exc:
+            results[index] = error_record(index, abstract_id, exc)
+            continue
+        result["index"] = index
+        results[index] = result
+    return [results[index] for index, _ in batch]
+
+
+async def iter_batches(items, batch_size):
+    """
+    Groups (index, item) pairs of a sync or async iterable into lists of batch_size.
+    """
+    batch = []
+    index = 0
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            batch.append((index, item))
+            index += 1
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    else:
+        for item in items:
+            batch.append((index, item))
+            index += 1
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+async def validate_many(items, concurrency=4, batch_size=8, ordered=False, executor=None,
+                        config_file=CONFIG_FILE, weight_file=WEIGHT_FILE,
+                        domain_tag=None, lexicon_dir="lexicon"):
+    """
+    Async generator of report dicts (see AbstractValidator.report_dict, plus 'index').
+    An item that cannot be read or evaluated yields {"index", "id", "error"} and the
+    stream goes on; only an executor or pipeline failure ends it.
+
+    items       : iterable or async iterable of paths, (id, text) pairs or
+                  {"id", "text"} dicts (see read_item)
+    concurrency : maximum number of batches submitted to the executor at once
+    batch_size  : abstracts per batch (their sections share one nlp.pipe call)
+    ordered     : yield in input order instead of completion order
+    executor    : concurrent.futures executor for parsing and scoring. By default a
+                  single worker thread, since one spaCy pipeline should not be used
+                  from several threads; pass a ProcessPoolExecutor to parse in parallel.
+
+    Reading, parsing and scoring all run in the executor, so the event loop is
+    never blocked for the length of a parse.
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spaa-parse")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    finished = asyncio.Queue()  # list of results, an exception, or None when everything is done
+
+    async def run_batch(batch):
+        try:
+            results = await loop.run_in_executor(
+                executor, evaluate_batch, batch, config_file, weight_file, domain_tag, lexicon_dir
+            )
+            await finished.put(results)
+        except Exception as exc:
+            await finished.put(exc)
+        finally:
+            semaphore.release()
+
+    async def produce():
+        tasks = []
+        try:
+            async for batch in iter_batches(items, batch_size):
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(run_batch(batch)))
+            await asyncio.gather(*tasks)
+        except Exception as exc:
+            await finished.put(exc)
+        finally:
+            for task in tasks:
+                task.cancel()
+        await finished.put(None)
+
+    producer = asyncio.create_task(produce())
+    buffered = {}
+    next_index = 0
+    try:
+        while True:
+            results = await finished.get()
+            if results is None:
+                break
+            if isinstance(results, Exception):
+                raise results
+            if not ordered:
+                for result in results:
+                    yield result
+                continue
+            for result in results:
+                buffered[result["index"]] = result
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
+    finally:
+        producer.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,29 +1,38 @@
 # background_analysis.py - version 1.1
 
+from results import SectionResult, evidence_spans
+
 class BackgroundValidator:
-    def __init__(self, doc, config, weights, domain_lexicon=None):
+    # Token attributes read from the spaCy Doc (see pipeline.py)
+    REQUIRES = frozenset({"lemma_"})
+
+    def __init__(self, features, weights, domain_lexicon=None):
         """
-        doc            : spaCy Doc from background section
-        config         : diccionary from config_keywords.json
+        features       : SectionFeatures of the background section (section_features.py)
         weights        : diccionary of weights for BACKGROUND (config_weights.json)
                          p.ej. {"problem": 25, "justification": 25, "concept": 25, "knowledge_gap": 25, "domain": 20}
         domain_lexicon : dict with words sets for POS y 'ALL', o None
                          p.ej. {"NOUN": set(...), "VERB": set(...), "ADJ": set(...), "ALL": set(...)}
         """
-        self.doc = doc
-        self.config = config
+        self.features = features
         self.weights = weights
         self.domain_lexicon = domain_lexicon
         self.feedback = []
+        self.evidence = []
+        self.signals = {}        # weight key -> detected factor (see rescoring.py)
+        self.domain_terms = set()
         self.score = 0
 
     def validate(self):
         total = sum(self.weights.values()) if self.weights else 1
-        text_lower = self.doc.text.lower()
-        lemmas_lower = [t.lemma_.lower() for t in self.doc]
+        lemmas_lower = self.features.lemmas
+        hits = self.features.keyword_hits
+        self.evidence = hits.evidence(
+            "PROBLEM_KEYWORDS", "JUSTIFICATION_KEYWORDS", "CONCEPT_KEYWORDS", "KNOWLEDGE_GAP_PHRASES"
+        )
 
         # 1) Problem
-        problem_flag = any(kw.lower() in lemmas_lower for kw in self.config.get("PROBLEM_KEYWORDS", []))
+        problem_flag = hits.found("PROBLEM_KEYWORDS")
         
         if problem_flag:
             self.feedback.append(f"Problem statement detected (+{self.weights.get('problem', 0)})")
@@ -32,7 +41,7 @@ class BackgroundValidator:
             self.feedback.append("No clear problem statement found (+0)")
 
         # 2) Justification / context
-        justification_flag = any(kw.lower() in lemmas_lower for kw in self.config.get("JUSTIFICATION_KEYWORDS", []))
+        justification_flag = hits.found("JUSTIFICATION_KEYWORDS")
         
         if justification_flag: 
             self.feedback.append(f"Contextual justification detected (+{self.weights.get('justification', 0)})")
@@ -41,7 +50,7 @@ class BackgroundValidator:
             self.feedback.append("No justification or contextal frame provided (+0)")
 
         # 3) Key concepto / approach
-        concept_flag = any(keyword.lower() in text_lower for keyword in self.config.get("CONCEPT_KEYWORDS", []))
+        concept_flag = hits.found("CONCEPT_KEYWORDS")
         
         if concept_flag:
             self.feedback.append(f"Key concept introduced (+{self.weights.get('concept', 0)})")
@@ -50,7 +59,7 @@ class BackgroundValidator:
             self.feedback.append("No core scientific concept or approach introduced (+0)")
 
         # 4) Knowledge gap
-        gap_flag = any(phrase.lower() in text_lower for phrase in self.config.get("KNOWLEDGE_GAP_PHRASES", []))
+        gap_flag = hits.found("KNOWLEDGE_GAP_PHRASES")
         
         if gap_flag:
             self.feedback.append(f"Knowledge gap clearly identified (+{self.weights.get('knowledge_gap', 0)})")
@@ -62,10 +71,13 @@ class BackgroundValidator:
         domain_weight = self.weights.get("domain", 0)
         domain_hits = set()
 
-        if self.domain_lexicon is not None and domain_weight > 0:
+        if self.domain_lexicon is not None:
             # Intersection between background and lexicon lemmas["ALL"]
             lex_all = self.domain_lexicon.get("ALL", set())
-            domain_hits = {lemma for lemma in lemmas_lower if lemma in lex_all}
+            self.domain_terms = {lemma for lemma in lemmas_lower if lemma in lex_all}
+
+        if self.domain_lexicon is not None and domain_weight > 0:
+            domain_hits = self.domain_terms
 
             if domain_hits:
                 sample = ", ".join(sorted(list(domain_hits))[:5])
@@ -79,6 +91,14 @@ class BackgroundValidator:
                     "Background lacks domain-specific terminology from the curated lexicon (+0)"
                 )
         
+        self.signals = {
+            "problem": float(problem_flag),
+            "justification": float(justification_flag),
+            "concept": float(concept_flag),
+            "knowledge_gap": float(gap_flag),
+            "domain": float(bool(self.domain_terms)),
+        }
+
         # 6) Contextual summary
         self.feedback.append("\n[Contextual Background Summary]")
 
@@ -125,4 +145,11 @@ class BackgroundValidator:
             )
 
         percentage = (self.score / total) * 100
-        return self.feedback, round(percentage, 1)
+        return SectionResult(
+            "BACKGROUND",
+            round(percentage, 1),
+            flags=self.signals,
+            feedback=self.feedback,
+            evidence=evidence_spans(self.evidence),
+            domain_terms=len(self.domain_terms),
+        )
@@ -0,0 +1,318 @@
+# batch_validator.py - version 1.1
+
+import glob
+import os
+import time
+from collections import deque
+
+from loader import Loader
+from domain_index import is_multi_tag
+from registry import REGISTRY
+from abstract_validator import AbstractValidator
+from rescoring import FeatureMatrix, signal_record
+from results import check_results_path, write_results
+from corpus_reader import report_name
+from dedup import content_key, section_hashes, settings_signature, write_report
+import profiling
+
+
+class BatchValidator:
+    """
+    Evaluates a corpus of abstract files with a single spaCy model.
+
+    All sections of all abstracts are streamed through one nlp.pipe call, so the
+    model is loaded once and parsing runs in batches (optionally multi-process).
+    Each abstract still goes through the same validators as AbstractValidator and
+    gets its own report under output_dir.
+    """
+
+    SECTIONS_PER_ABSTRACT = 5
+
+    def __init__(self, input_files, config_file, weight_file, output_dir,
+                 domain_tag: str | None = None,
+                 lexicon_dir: str = "lexicon",
+                 batch_size: int = 64,
+                 n_process: int = 1,
+                 nlp=None,
+                 doc_cache=None,
+                 features_out=None,
+                 results_out=None,
+                 dedup=None,
+                 dedup_report=None,
+                 journal=None,
+                 resume=False,
+                 corpus=False):
+        """
+        input_files : list of abstract files (same # section format as input_data/)
+        output_dir  : directory where '<name>_results.txt' reports are written
+        batch_size  : number of sections per nlp.pipe batch
+        n_process   : number of processes used by nlp.pipe
+        nlp         : optional spaCy pipeline already loaded by the caller
+        doc_cache   : optional DocCache; cached sections skip nlp.pipe entirely
+        features_out: optional .npz path for the signal matrix used by rescoring.py
+        results_out : optional cohort file of AbstractResults (.json, .jsonl, .csv, .parquet, .npz)
+        dedup       : optional DedupIndex (dedup.py); exact duplicates reuse stored results,
+                      near-duplicates are flagged
+        dedup_report: optional JSON path for the duplicates found by run()
+        journal     : optional Journal (journal.py); run() appends every finished abstract
+        resume      : skip the abstracts the journal has as finished (same content and settings)
+        corpus      : abstracts come from corpus files (corpus_reader.py); their ids are
+                      not file paths, so reports are named after the whole id (report_name)
+        """
+        self.input_files = list(input_files)
+        self.config_file = config_file
+        self.weight_file = weight_file
+        self.output_dir = output_dir
+        self.domain_tag = domain_tag
+        self.lexicon_dir = lexicon_dir
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.nlp = nlp if nlp is not None else REGISTRY.get_pipeline(
+            AbstractValidator.requirements(), lazy=doc_cache is not None
+        )
+        self.doc_cache = doc_cache
+        self.features_out = features_out
+        self.results_out = results_out
+        if results_out:
+            check_results_path(results_out)
+        self.dedup = dedup
+        self.dedup_report = dedup_report
+        self.dedup_matches = []   # flagged DedupMatch objects (duplicates or shared sections)
+        self.dedup_counts = {"exact": 0, "near": 0, "reused": 0}
+        self.journal = journal
+        self.resume = resume and journal is not None
+        self.resumed = 0
+        self.corpus = corpus
+        if dedup is not None or journal is not None:
+            # Stored results are only reused under the same config, weights, lexicons and model
+            settings = settings_signature(config_file, weight_file, domain_tag, lexicon_dir, self.nlp)
+            for store in (dedup, journal):
+                if store is not None:
+                    store.settings = settings
+        self.loader = Loader(
+            None,
+            config_file,
+            weight_file,
+            lexicon_dir=lexicon_dir,
+            domain_tag=domain_tag
+        )
+
+    @classmethod
+    def from_directory(cls, input_dir, pattern="*.txt", **kwargs):
+        """
+        Build a BatchValidator for every file in input_dir matching pattern.
+        """
+        input_files = sorted(glob.glob(os.path.join(input_dir, pattern)))
+        return cls(input_files, **kwargs)
+
+    def load_resources(self):
+        self.config = REGISTRY.get_config(self.config_file)
+        self.weights = REGISTRY.get_weights(self.weight_file)
+        # In multi-domain mode each AbstractValidator picks its own lexicon
+        self.domain_lexicon = (
+            None if is_multi_tag(self.domain_tag) else REGISTRY.get_lexicon(self.lexicon_dir, self.domain_tag)
+        )
+        self.matcher = REGISTRY.get_matcher(self.config_file)
+        self.bloom_index = REGISTRY.get_bloom_index(self.config_file)
+
+    def output_path(self, input_file):
+        if self.corpus:
+            name = report_name(input_file)
+        else:
+            name = os.path.splitext(os.path.basename(input_file))[0]
+        return os.path.join(self.output_dir, f"{name}_results.txt")
+
+    def iter_sections(self, input_files=None):
+        """
+        Yields (input_file, sections, keywords) for every input file (or every
+        file of input_files, e.g. one shard of sharding.py).
+        """
+        for input_file in self.input_files if input_files is None else input_files:
+            with open(input_file, "r", encoding="utf-8") as f:
+                raw_text = f.read()
+            background, hypothesis, methodology, outcomes, impact, keywords = self.loader.split_sections(raw_text)
+            yield input_file, [background, hypothesis, methodology, outcomes, impact], keywords
+
+    def iter_parsed(self, abstracts=None):
+        """
+        Streams every section of every abstract through nlp.pipe and yields
+        (input_file, sections, keywords, docs) once all five Docs of an abstract are ready.
+        abstracts : optional iterable of (id, sections, keywords); defaults to iter_sections()
+        """
+        pending = deque()
+        abstracts = self.iter_sections() if abstracts is None else abstracts
+
+        def texts():
+            for input_file, sections, keywords in abstracts:
+                pending.append((input_file, sections, keywords))
+                yield from sections
+
+        if self.doc_cache is not None:
+            docs = self.doc_cache.pipe(self.nlp, texts(), batch_size=self.batch_size, n_process=self.n_process)
+        else:
+            docs = self.nlp.pipe(texts(), batch_size=self.batch_size, n_process=self.n_process)
+        for abstract_docs in zip(*[iter(docs)] * self.SECTIONS_PER_ABSTRACT):
+            input_file, sections, keywords = pending.popleft()
+            yield input_file, sections, keywords, abstract_docs
+
+    def validate_all(self, abstracts=None):
+        """
+        Python API: yields one evaluated AbstractValidator per input file
+        (or per (id, sections, keywords) of abstracts), in input order.
+        Reports are not written to disk.
+        """
+        with profiling.stage("load_resources"):
+            self.load_resources()
+        if self.dedup is not None or self.journal is not None:
+            yield from self.validate_reusing(self.iter_sections() if abstracts is None else abstracts)
+            return
+        for input_file, sections, keywords, docs in self.iter_parsed(abstracts):
+            yield self.evaluate_parsed(input_file, sections, keywords, docs)
+
+    def check_duplicate(self, input_file, sections, keywords):
+        with profiling.stage("dedup"):
+            match = self.dedup.check(input_file, sections, keywords)
+        if match.kind:
+            self.dedup_counts[match.kind] += 1
+            print(f"[DEDUP] {input_file}: {match.kind} duplicate of {match.duplicate_of} "
+                  f"(similarity {match.similarity:.2f})")
+        if match.kind or match.shared_sections:
+            self.dedup_matches.append(match)
+        return match
+
+    def validate_reusing(self, abstracts):
+        """
+        validate_all() in front of the stored results: an abstract is not parsed when
+        - resume is set and the journal has it as finished (its report is on disk), or
+        - its content already has a result in the dedup index (from an earlier run,
+          or earlier in this one).
+        Every validator carries its content_key. Input order is kept.
+        """
+        order = deque()    # per abstract: (input_file, keywords, content, source)
+        in_flight = set()  # content keys parsed in this run
+
+        def fresh():
+            for input_file, sections, keywords in abstracts:
+                if self.dedup is not None:
+                    content = self.check_duplicate(input_file, sections, keywords).content
+                else:
+                    content = content_key(section_hashes(sections), keywords)
+                if self.resume and self.journal.finished(input_file, content):
+                    source = "journal"
+                elif self.dedup is not None and (content in in_flight or self.dedup.has_result(content)):
+                    source = "dedup"
+                else:
+                    source = "parse"
+                    in_flight.add(content)
+                order.append((input_file, keywords, content, source))
+                if source == "parse":
+                    yield input_file, sections, keywords
+
+        def stored(entry):
+            input_file, keywords, content, source = entry
+            validator = AbstractValidator(
+                input_file,
+                self.config_file,
+                self.weight_file,
+                self.output_path(input_file),
+                domain_tag=self.domain_tag,
+                lexicon_dir=self.lexicon_dir,
+                nlp=self.nlp
+            )
+            if source == "journal":
+                validator.use_result(self.journal.result(input_file), keywords)
+                validator.resumed = True
+                self.resumed += 1
+            else:
+                validator.use_result(self.dedup.result(content), keywords)
+                self.dedup_counts["reused"] += 1
+            validator.content_key = content
+            return validator
+
+        for input_file, sections, keywords, docs in self.iter_parsed(fresh()):
+            # Abstracts ahead of this one that were not parsed
+            while order[0][3] != "parse":
+                yield stored(order.popleft())
+            _, _, content, _ = order.popleft()
+            validator = self.evaluate_parsed(input_file, sections, keywords, docs)
+            validator.content_key = content
+            if self.dedup is not None:
+                self.dedup.store_result(content, validator.result)
+            yield validator
+        while order:
+            yield stored(order.popleft())
+        if self.dedup is not None:
+            self.dedup.commit()
+
+    def evaluate_parsed(self, input_file, sections, keywords, docs):
+        """
+        Evaluated AbstractValidator for one abstract whose five section Docs
+        are already parsed (load_resources() must have been called).
+        """
+        validator = AbstractValidator(
+            input_file,
+            self.config_file,
+            self.weight_file,
+            self.output_path(input_file),
+            domain_tag=self.domain_tag,
+            lexicon_dir=self.lexicon_dir,
+            nlp=self.nlp
+        )
+        validator.set_resources(
+            self.config, self.weights, self.domain_lexicon, self.matcher, self.bloom_index
+        )
+        validator.set_sections(sections, keywords)
+        validator.set_docs(docs)
+        validator.evaluate()
+        validator.release_docs()
+        return validator
+
+    def run(self, abstracts=None):
+        """
+        Evaluates every input file (or every (id, sections, keywords) of abstracts,
+        e.g. a corpus_reader stream) and writes one report per abstract.
+        Returns the list of written report paths.
+        """
+        start = time.perf_counter()
+        written = []
+        records = []
+        results = []
+        for validator in self.validate_all(abstracts):
+            # A resumed abstract's report is already on disk
+            if not validator.resumed:
+                with profiling.stage("save_results"):
+                    validator.save_results()
+                if self.journal is not None:
+                    self.journal.record(
+                        validator.loader.input_file, validator.content_key, validator.output_file, validator.result
+                    )
+            written.append(validator.output_file)
+            if self.features_out:
+                records.append(signal_record(validator))
+            if self.results_out:
+                results.append(validator.result)
+
+        elapsed = time.perf_counter() - start
+        if self.journal is not None:
+            self.journal.sync()
+        processed = len(written) - self.resumed
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        print(f"Batch completed: {processed} abstracts in {elapsed:.2f} s ({rate:.1f} abstracts/s)")
+        if self.resume:
+            print(f"Resumed: {self.resumed} abstracts already finished in an earlier run were skipped")
+        if self.doc_cache is not None:
+            print(f"Parsed-section cache: {self.doc_cache.hits} hits, {self.doc_cache.misses} misses")
+        if self.features_out:
+            FeatureMatrix.from_records(records, self.weights).save(self.features_out)
+            print(f"Signal matrix saved to: {self.features_out}")
+        if self.results_out:
+            write_results(results, self.results_out)
+            print(f"Structured results saved to: {self.results_out}")
+        if self.dedup is not None:
+            counts = self.dedup_counts
+            print(f"Dedup: {counts['reused']} stored results reused, {counts['exact']} exact and "
+                  f"{counts['near']} near-duplicates flagged")
+            if self.dedup_report:
+                write_report(self.dedup_matches, self.dedup, self.dedup_report)
+                print(f"Dedup report saved to: {self.dedup_report}")
+        return written
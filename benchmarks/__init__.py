@@ -0,0 +1 @@
+# benchmarks - performance benchmarks for SPAA (see run_benchmarks.py)
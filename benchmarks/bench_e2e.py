@@ -0,0 +1,156 @@
+# bench_e2e.py - end-to-end benchmarks: cold start, per-abstract latency, batch throughput, peak RSS
+#
+# Usage (from the repository root):
+#     python -m benchmarks.bench_e2e --n 200 --seed 0
+#
+# Cold start runs abstract_validator.py in fresh subprocesses; the other
+# measurements run in-process on a synthetic corpus (benchmarks/corpus.py).
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import CorpusGenerator, write_directory
+from profiling import percentile
+
+
+def max_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in kB on Linux (bytes on macOS)
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def bench_cold_start(corpus_dir, repeat=3, tag=None):
+    """
+    Wall time of 'python abstract_validator.py' on one abstract in a fresh process
+    (interpreter start, imports, model load, parse, validation, report).
+    """
+    input_file = sorted(os.listdir(corpus_dir))[0]
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        single_dir = os.path.join(tmp, "in")
+        os.makedirs(single_dir)
+        with open(os.path.join(corpus_dir, input_file), "rb") as src, \
+                open(os.path.join(single_dir, input_file), "wb") as dst:
+            dst.write(src.read())
+        command = [sys.executable, os.path.join(ROOT, "abstract_validator.py"),
+                   "--input-dir", single_dir, "--output-dir", os.path.join(tmp, "out"), "--no-cache"]
+        if tag:
+            command += ["--tag", tag]
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - start)
+    return {
+        "cold_start_s": min(timings),
+        "cold_start_max_rss_mb": max_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def bench_latency(abstracts, tag=None, warmup=5):
+    """
+    Per-abstract latency of a warm AbstractValidator (parse + validation + summary),
+    one abstract at a time as in the single-file and server modes.
+    """
+    from abstract_validator import AbstractValidator
+    from config import CONFIG_FILE, WEIGHT_FILE
+    from domain_index import is_multi_tag
+    from registry import REGISTRY
+
+    nlp = REGISTRY.get_pipeline(AbstractValidator.requirements())
+    config = REGISTRY.get_config(CONFIG_FILE)
+    weights = REGISTRY.get_weights(WEIGHT_FILE)
+    lexicon = None if is_multi_tag(tag) else REGISTRY.get_lexicon("lexicon", tag)
+    matcher = REGISTRY.get_matcher(CONFIG_FILE)
+    bloom_index = REGISTRY.get_bloom_index(CONFIG_FILE)
+
+    def evaluate(sections, keywords):
+        validator = AbstractValidator(None, CONFIG_FILE, WEIGHT_FILE, None, domain_tag=tag, nlp=nlp)
+        validator.set_resources(config, weights, lexicon, matcher, bloom_index)
+        validator.set_sections(sections, keywords)
+        validator.process_sections()
+        validator.evaluate()
+
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _, _, sections, keywords in abstracts[:warmup]:
+            evaluate(list(sections.values()), keywords)
+        for _, _, sections, keywords in abstracts:
+            start = time.perf_counter()
+            evaluate(list(sections.values()), keywords)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "latency_p50_ms": percentile(timings, 50),
+        "latency_p95_ms": percentile(timings, 95),
+        "latency_p99_ms": percentile(timings, 99),
+    }
+
+
+def bench_throughput(corpus_dir, tag=None, batch_size=64, n_process=1, repeat=3):
+    """
+    Abstracts per second of BatchValidator over the corpus directory (best of repeat
+    runs, reports written to a temp dir).
+    """
+    from batch_validator import BatchValidator
+    from config import CONFIG_FILE, WEIGHT_FILE
+
+    rates = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        batch = BatchValidator.from_directory(
+            corpus_dir,
+            config_file=CONFIG_FILE,
+            weight_file=WEIGHT_FILE,
+            output_dir=out_dir,
+            domain_tag=tag,
+            batch_size=batch_size,
+            n_process=n_process,
+        )
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                written = batch.run()
+                elapsed = time.perf_counter() - start
+            rates.append(len(written) / elapsed if elapsed > 0 else 0.0)
+    return {"batch_abstracts_per_s": max(rates)}
+
+
+def run(n=200, seed=0, tag=None, cold_repeat=3, batch_size=64):
+    """
+    dict metric -> value for the whole end-to-end suite.
+    """
+    abstracts = list(CorpusGenerator(seed).generate(n))
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        write_directory(abstracts, corpus_dir)
+        metrics = {}
+        if cold_repeat:
+            metrics.update(bench_cold_start(corpus_dir, cold_repeat, tag))
+        metrics.update(bench_latency(abstracts, tag))
+        metrics.update(bench_throughput(corpus_dir, tag, batch_size))
+    metrics["peak_rss_mb"] = max_rss_mb()
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end SPAA benchmarks on a synthetic corpus")
+    parser.add_argument("--n", type=int, default=200, help="Number of synthetic abstracts.")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed.")
+    parser.add_argument("--tag", type=str, default=None, help="Domain tag (e.g., pparg, all).")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="Cold-start runs (0 to skip).")
+    parser.add_argument("--batch-size", type=int, default=64, help="nlp.pipe batch size for the throughput run.")
+    args = parser.parse_args()
+
+    for name, value in run(args.n, args.seed, args.tag, args.cold_repeat, args.batch_size).items():
+        print(f"{name:<24} {value:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# bench_micro.py - micro-benchmarks of the hot functions
+#
+# Usage (from the repository root):
+#     python -m benchmarks.bench_micro --n 50 --seed 0
+#
+# Section Docs of a synthetic corpus are parsed once up front; each benchmark
+# then times a single function over all of them (best of --repeat runs) and
+# reports microseconds per call.
+
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import CorpusGenerator
+
+# weight section -> (validator module, class, section Doc it reads)
+VALIDATORS = {
+    "BACKGROUND":  ("background_analysis",  "BackgroundValidator",  "background"),
+    "HYPOTHESIS":  ("hypothesis_analysis",  "HypothesisValidator",  "hypothesis"),
+    "METHODOLOGY": ("methodology_analysis", "MethodologyValidator", "methodology"),
+    "OUTCOMES":    ("outcomes_analysis",    "OutcomesValidator",    "outcomes"),
+    "IMPACT":      ("impact_analysis",      "ImpactValidator",      "impact"),
+    "ETHICS":      ("ethics_analysis",      "EthicsValidator",      "impact"),
+}
+SECTION_NAMES = ("background", "hypothesis", "methodology", "outcomes", "impact")
+
+
+def time_per_call(function, calls, repeat):
+    """
+    Best-of-repeat time of function() divided by the number of calls it makes, in µs.
+    """
+    best = min(timeit.repeat(function, number=1, repeat=repeat))
+    return best / calls * 1e6
+
+
+class MicroBenchmarks:
+    """
+    Shared fixtures (parsed Docs, features, resources) and one method per benchmark.
+    """
+
+    def __init__(self, n=50, seed=0, tag="pparg", repeat=5):
+        from abstract_validator import AbstractValidator
+        from config import CONFIG_FILE, WEIGHT_FILE
+        from registry import REGISTRY
+        from section_features import extract_features
+
+        self.tag = tag
+        self.repeat = repeat
+        self.config = REGISTRY.get_config(CONFIG_FILE)
+        self.weights = REGISTRY.get_weights(WEIGHT_FILE)
+        self.matcher = REGISTRY.get_matcher(CONFIG_FILE)
+        self.bloom_index = REGISTRY.get_bloom_index(CONFIG_FILE)
+        self.lexicon = REGISTRY.get_lexicon("lexicon", tag)
+
+        abstracts = list(CorpusGenerator(seed).generate(n))
+        nlp = REGISTRY.get_pipeline(AbstractValidator.requirements())
+        texts = [text for _, _, sections, _ in abstracts for text in sections.values()]
+        docs = list(nlp.pipe(texts))
+        self.keywords = [keywords for _, _, _, keywords in abstracts]
+        self.docs = {
+            name: docs[index::len(SECTION_NAMES)] for index, name in enumerate(SECTION_NAMES)
+        }
+        self.features = {
+            name: [extract_features(doc, self.matcher, self.bloom_index) for doc in section_docs]
+            for name, section_docs in self.docs.items()
+        }
+
+    def all_docs(self):
+        return [doc for section_docs in self.docs.values() for doc in section_docs]
+
+    def bench_detect_bloom_level(self):
+        from bloom_detection import detect_bloom_level
+
+        docs = self.all_docs()
+        verbs, synonyms = self.config["BLOOM_VERBS"], self.config["BLOOM_SYNONYMS"]
+        return {
+            # as called by older code: index rebuilt on every call
+            "detect_bloom_level_us": time_per_call(
+                lambda: [detect_bloom_level(doc, verbs, synonyms) for doc in docs], len(docs), self.repeat
+            ),
+            # with the shared BloomIndex from the registry
+            "detect_bloom_level_indexed_us": time_per_call(
+                lambda: [detect_bloom_level(doc, verbs, synonyms, self.bloom_index) for doc in docs],
+                len(docs), self.repeat
+            ),
+        }
+
+    def bench_keyword_checks(self):
+        """
+        KeywordMatcher.match per section Doc, then each validator's checks on the
+        precomputed features (the keyword / phrase / Bloom / domain rules).
+        """
+        import importlib
+
+        docs = self.all_docs()
+        metrics = {
+            "keyword_match_us": time_per_call(
+                lambda: [self.matcher.match(doc) for doc in docs], len(docs), self.repeat
+            )
+        }
+        for section, (module_name, class_name, doc_name) in VALIDATORS.items():
+            validator_class = getattr(importlib.import_module(module_name), class_name)
+            features = self.features[doc_name]
+            weights = self.weights[section]
+            if section in ("BACKGROUND", "HYPOTHESIS"):
+                make = lambda f, c=validator_class, w=weights: c(f, w, domain_lexicon=self.lexicon)
+            else:
+                make = lambda f, c=validator_class, w=weights: c(f, w)
+            metrics[f"validate_{section.lower()}_us"] = time_per_call(
+                lambda: [make(f).validate() for f in features], len(features), self.repeat
+            )
+        return metrics
+
+    def bench_summarizer(self):
+        from summarizer import Summarizer
+
+        pairs = [
+            (doc, keywords)
+            for section_docs in self.docs.values()
+            for doc, keywords in zip(section_docs, self.keywords)
+        ]
+        return {
+            "summarizer_us": time_per_call(
+                lambda: [Summarizer(doc, keywords, max_chars=400).summarize(1) for doc, keywords in pairs],
+                len(pairs), self.repeat
+            )
+        }
+
+    def bench_load_domain_lexicon(self):
+        from loader import Loader
+
+        loader = Loader(None, None, None, lexicon_dir=os.path.join(ROOT, "lexicon"), domain_tag=self.tag)
+        loader.load_domain_lexicon()  # builds the compiled artifact if missing
+        return {
+            "load_domain_lexicon_us": time_per_call(lambda: [loader.load_domain_lexicon() for _ in range(10)], 10, self.repeat)
+        }
+
+    def run(self):
+        metrics = {}
+        for bench in (self.bench_detect_bloom_level, self.bench_keyword_checks,
+                      self.bench_summarizer, self.bench_load_domain_lexicon):
+            metrics.update(bench())
+        return metrics
+
+
+def run(n=50, seed=0, tag="pparg", repeat=5):
+    return MicroBenchmarks(n, seed, tag, repeat).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of SPAA hot functions")
+    parser.add_argument("--n", type=int, default=50, help="Number of synthetic abstracts used as fixtures.")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed.")
+    parser.add_argument("--tag", type=str, default="pparg", help="Domain lexicon for the lexicon benchmarks.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats (best is kept).")
+    args = parser.parse_args()
+
+    for name, value in run(args.n, args.seed, args.tag, args.repeat).items():
+        print(f"{name:<32} {value:>10.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench_pipeline.py - before/after benchmark for requirement-driven pipeline pruning
+#
+# Usage (from the repository root):
+#     python benchmarks/bench_pipeline.py --repeat 20
+#
+# Each configuration runs in a fresh subprocess so that load time and peak
+# memory (max RSS) are measured independently.
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CONFIGURATIONS = {
+    "full":      "every en_core_web_sm component (before: spacy.load with NER)",
+    "pruned":    "components required by AbstractValidator.requirements()",
+    "sentences": "sentence-only fast path (senter)",
+}
+
+
+def load_sections():
+    from loader import Loader
+
+    loader = Loader(None, None, None)
+    sections = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "input_data", "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            sections.extend(loader.split_sections(f.read())[:5])
+    return sections
+
+
+def measure(configuration, repeat):
+    import spacy
+    from abstract_validator import AbstractValidator
+    from pipeline import MODEL_NAME, load_pipeline
+
+    start = time.perf_counter()
+    if configuration == "full":
+        nlp = spacy.load(MODEL_NAME)
+    elif configuration == "pruned":
+        nlp = load_pipeline(AbstractValidator.requirements())
+    else:
+        nlp = load_pipeline({"sents"})
+    load_time = time.perf_counter() - start
+
+    texts = load_sections() * repeat
+    start = time.perf_counter()
+    n_tokens = sum(len(doc) for doc in nlp.pipe(texts))
+    parse_time = time.perf_counter() - start
+
+    return {
+        "configuration": configuration,
+        "components": nlp.pipe_names,
+        "load_s": round(load_time, 3),
+        "parse_s": round(parse_time, 3),
+        "tokens_per_s": round(n_tokens / parse_time, 1) if parse_time > 0 else 0.0,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spaCy pipeline pruning")
+    parser.add_argument("--repeat", type=int, default=20, help="Times the sample sections are parsed.")
+    parser.add_argument("--child", choices=sorted(CONFIGURATIONS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.repeat)))
+        return
+
+    rows = []
+    for configuration in CONFIGURATIONS:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", configuration, "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True, cwd=ROOT,
+        )
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'configuration':<12} {'load (s)':>9} {'parse (s)':>10} {'tokens/s':>10} {'max RSS (MB)':>13}  components")
+    for row in rows:
+        print(f"{row['configuration']:<12} {row['load_s']:>9} {row['parse_s']:>10} {row['tokens_per_s']:>10} "
+              f"{row['max_rss_mb']:>13}  {', '.join(row['components'])}")
+    for configuration, description in CONFIGURATIONS.items():
+        print(f"  {configuration:<10}: {description}")
+
+
+if __name__ == "__main__":
+    main()
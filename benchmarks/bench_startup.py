@@ -0,0 +1,176 @@
+# bench_startup.py - CLI start-up time: import cost (-X importtime) and a start-up budget
+#
+# Usage (from the repository root):
+#     python -m benchmarks.bench_startup --repeat 5 --budget-ms 500 --top 15
+#
+# Every measurement runs in a fresh interpreter. The exit code is 1 when
+# 'abstract_validator.py --help' takes longer than --budget-ms, or when
+# importing the CLI module pulls in a heavy dependency (spaCy, NumPy, ...):
+# those must only be imported by the stage that needs them, so that --help,
+# --server forwarding and other light invocations start fast.
+# It is also 1 when a re-run whose sections are all in the parsed-section
+# cache takes longer than --cached-budget-ms or loads the spaCy model.
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import INPUT_FILE
+from pipeline import MODEL_NAME
+
+CLI_MODULE = "abstract_validator"
+# Modules that must not be imported by 'import abstract_validator'
+HEAVY_MODULES = ("spacy", "thinc", "numpy", "sqlite3", "multiprocessing")
+DEFAULT_BUDGET_MS = 500.0
+DEFAULT_CACHED_BUDGET_MS = 1000.0
+
+
+def import_times(module):
+    """
+    -X importtime of 'import module' in a fresh interpreter: the rows of module
+    and everything it imported, as (name, self_us, cumulative_us, depth) with
+    module itself last at depth 0 (importtime lists children before parents).
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    # Drop what the interpreter imported at start-up (site, encodings, ...)
+    end = next(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def imported_packages(command):
+    """
+    Top-level packages imported by command (run with -X importtime).
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *command],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in completed.stderr.splitlines()
+        if line.startswith("import time:") and "self [us]" not in line
+    }
+
+
+def wall_time(command, repeat):
+    """
+    Best wall time in seconds of command over repeat fresh runs.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def cached_run(repeat):
+    """
+    Best wall time in seconds of a batch run over INPUT_FILE whose sections are
+    all in the parsed-section cache (a first run fills it), and whether that
+    cached run imported the spaCy model.
+    """
+    tmp = tempfile.mkdtemp(prefix="spaa_startup_")
+    try:
+        input_dir = os.path.join(tmp, "input")
+        os.makedirs(input_dir)
+        shutil.copy(os.path.join(ROOT, INPUT_FILE), input_dir)
+        command = [
+            os.path.join(ROOT, "abstract_validator.py"),
+            "--input-dir", input_dir,
+            "--output-dir", os.path.join(tmp, "output"),
+            "--cache-dir", os.path.join(tmp, "cache"),
+            "--journal", os.path.join(tmp, "journal.sqlite"),
+        ]
+        subprocess.run([sys.executable, *command], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        seconds = wall_time([sys.executable, *command], repeat)
+        loads_model = MODEL_NAME in imported_packages(command)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return seconds, loads_model
+
+
+def run(repeat=5):
+    """
+    dict metric -> value (milliseconds), the import rows of the CLI module and
+    whether the cached run loaded the spaCy model.
+    """
+    rows = import_times(CLI_MODULE)
+    cached_seconds, loads_model = cached_run(repeat)
+    metrics = {
+        "import_cli_ms": rows[-1][2] / 1000,
+        "cli_help_ms": wall_time([sys.executable, os.path.join(ROOT, "abstract_validator.py"), "--help"], repeat) * 1000,
+        "cached_run_ms": cached_seconds * 1000,
+    }
+    return metrics, rows, loads_model
+
+
+def heavy_imports(rows):
+    """
+    Heavy top-level packages found among the imported modules.
+    """
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+    return [name for name in HEAVY_MODULES if name in imported]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPAA CLI start-up benchmark and budget check")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh runs per wall-time measurement (best is kept).")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Maximum wall time of 'abstract_validator.py --help' (default: {DEFAULT_BUDGET_MS:.0f}).")
+    parser.add_argument("--cached-budget-ms", type=float, default=DEFAULT_CACHED_BUDGET_MS,
+                        help="Maximum wall time of a re-run served from the parsed-section cache "
+                             f"(default: {DEFAULT_CACHED_BUDGET_MS:.0f}).")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list (by cumulative time).")
+    args = parser.parse_args()
+
+    baseline_ms = wall_time([sys.executable, "-c", "pass"], args.repeat) * 1000
+    metrics, rows, loads_model = run(args.repeat)
+    print(f"{'interpreter_ms':<24} {baseline_ms:>10.1f}   (python -c pass, for reference)")
+    for name, value in metrics.items():
+        print(f"{name:<24} {value:>10.1f}")
+
+    print(f"\nSlowest imports under 'import {CLI_MODULE}' (cumulative ms, self ms):")
+    for name, self_us, cumulative_us, depth in sorted(rows[:-1], key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>9.1f} {self_us / 1000:>9.1f}  {'  ' * (depth - 1)}{name}")
+
+    failures = []
+    heavy = heavy_imports(rows)
+    if heavy:
+        failures.append(f"'import {CLI_MODULE}' imports {', '.join(heavy)}; import them where they are used")
+    if metrics["cli_help_ms"] > args.budget_ms:
+        failures.append(f"--help took {metrics['cli_help_ms']:.0f} ms, budget {args.budget_ms:.0f} ms")
+    if loads_model:
+        failures.append(f"a fully cached run loads {MODEL_NAME}; it must only be loaded on a cache miss")
+    if metrics["cached_run_ms"] > args.cached_budget_ms:
+        failures.append(f"cached run took {metrics['cached_run_ms']:.0f} ms, budget {args.cached_budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"[FAIL] {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"\nWithin budget ({args.budget_ms:.0f} ms --help, {args.cached_budget_ms:.0f} ms cached run), "
+          "no heavy imports at start-up, no model load on a cached run.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# corpus.py - reproducible synthetic corpus of proposal abstracts
+#
+# Usage (from the repository root):
+#     python -m benchmarks.corpus --n 500 --seed 7 --out-dir bench_corpus
+#     python -m benchmarks.corpus --n 500 --jsonl bench_corpus.jsonl
+#
+# Abstracts follow the '# background / # hypothesis / ...' file format and mix
+# terms from config_keywords.json and every lexicon/<tag>/lexicon_<tag>.csv,
+# each rule firing with some probability so that scores vary across the corpus.
+
+import argparse
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import CONFIG_FILE
+from domain_index import discover_tags, lexicon_csv_path
+from lexicon_cache import read_lexicon_csv
+
+SUBJECTS = ("This project", "The proposed study", "Our work", "This research program")
+FILLER = (
+    "Previous reports have described several experimental models with heterogeneous results.",
+    "Most available data come from small cohorts and short follow-up periods.",
+    "Standardized protocols are still lacking across laboratories.",
+    "Several groups have proposed complementary strategies in recent years.",
+    "The underlying mechanisms involve multiple interacting pathways.",
+)
+
+
+class CorpusGenerator:
+    """
+    Builds abstracts from sentence templates filled with configuration keywords,
+    Bloom verbs and domain lexicon terms. The same seed gives the same corpus.
+    """
+
+    def __init__(self, seed=0, config_file=CONFIG_FILE, lexicon_dir=os.path.join(ROOT, "lexicon")):
+        self.random = random.Random(seed)
+        with open(config_file if os.path.isabs(config_file) else os.path.join(ROOT, config_file), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+
+        self.domain_terms = {}
+        for tag in discover_tags(lexicon_dir):
+            rows = read_lexicon_csv(lexicon_csv_path(lexicon_dir, tag)) or []
+            rows.sort(key=lambda row: -row[2])  # frequent terms first, like real text
+            self.domain_terms[tag] = {
+                pos: [word for word, word_pos, _ in rows if word_pos == pos][:300]
+                for pos in ("NOUN", "ADJ", "VERB")
+            }
+
+        self.bloom = {
+            level: verbs + [syn for verb in verbs for syn in self.config["BLOOM_SYNONYMS"].get(verb, [])]
+            for level, verbs in self.config["BLOOM_VERBS"].items()
+        }
+
+    def pick(self, key):
+        return self.random.choice(self.config[key])
+
+    def chance(self, p):
+        return self.random.random() < p
+
+    def term(self, tag, pos="NOUN"):
+        words = self.domain_terms.get(tag, {}).get(pos) or ["system"]
+        return self.random.choice(words)
+
+    def verb(self):
+        level = self.random.choice(list(self.bloom))
+        return self.random.choice(self.bloom[level])
+
+    def background(self, tag):
+        r = self.random
+        sentences = [
+            f"The {self.term(tag, 'ADJ')} regulation of {self.term(tag)} and {self.term(tag)} "
+            f"has been studied in the context of {self.term(tag)} {self.term(tag)}."
+        ]
+        if self.chance(0.7):
+            sentences.append(
+                f"A major {self.pick('PROBLEM_KEYWORDS')} in this field is the limited control of {self.term(tag)} activity."
+            )
+        if self.chance(0.6):
+            sentences.append(f"There is an increasing {self.pick('JUSTIFICATION_KEYWORDS')} for reliable tools in {self.term(tag)} research.")
+        if self.chance(0.5):
+            sentences.append(f"Approaches based on {self.pick('CONCEPT_KEYWORDS')} offer new opportunities.")
+        sentences.extend(r.sample(FILLER, r.randint(1, 3)))
+        if self.chance(0.6):
+            sentences.append(f"However, the role of {self.term(tag)} in {self.term(tag)} {self.pick('KNOWLEDGE_GAP_PHRASES')}.")
+        return " ".join(sentences)
+
+    def hypothesis(self, tag):
+        tone = self.pick("HYPOTHESIS_TONE_PHRASES") if self.chance(0.7) else "might"
+        relation = self.pick("CAUSAL_VERBS") if self.chance(0.6) else "relate"
+        domain = self.pick("DOMAIN_KEYWORDS") if self.chance(0.5) else self.term(tag)
+        return (
+            f"Increased {self.term(tag)} {domain} {tone} {relation} to changes in {self.term(tag)} "
+            f"and {self.term(tag, 'ADJ')} {self.term(tag)}, which we will {self.verb()} in relevant models."
+        )
+
+    def methodology(self, tag):
+        future = "will" if self.chance(0.8) else "may"
+        sentences = [
+            f"{self.random.choice(SUBJECTS)} {future} {self.verb()} {self.term(tag)} samples using {self.term(tag)} assays.",
+            f"The team {future} {self.verb()} {self.term(tag)} {self.term(tag)} under controlled conditions.",
+        ]
+        for _ in range(self.random.randint(1, 4)):
+            sentences.append(
+                f"Data on {self.term(tag)} and {self.term(tag)} {future} be collected to {self.verb()} "
+                f"the {self.term(tag, 'ADJ')} response."
+            )
+        return " ".join(sentences)
+
+    def outcomes(self, tag):
+        tone = self.pick("OUTCOMES_TONE_PHRASES") if self.chance(0.6) else "may possibly"
+        future = " and will provide new data" if self.chance(0.6) else ""
+        return (
+            f"The study {tone} {self.verb()} the contribution of {self.term(tag)} to {self.term(tag)}{future}. "
+            f"Results on {self.term(tag)} {self.term(tag)} are reported as comparative profiles."
+        )
+
+    def impact(self, tag):
+        sentences = []
+        if self.chance(0.5):
+            sentences.append(f"It {self.pick('IMPACT_MODAL_PHRASES')} improve {self.term(tag)} management.")
+        if self.chance(0.6):
+            sentences.append(f"The results {self.pick('IMPACT_PROJECTION_PHRASES')} better {self.term(tag)} strategies.")
+        sentences.append(f"This work will {self.verb()} new approaches for {self.term(tag)} {self.term(tag)}.")
+        if self.chance(0.2):
+            sentences.append(f"All procedures follow {self.pick('ETHICS_KEYWORDS')} requirements.")
+        return " ".join(sentences)
+
+    def keywords(self, tag):
+        terms = {self.term(tag) for _ in range(6)}
+        if self.chance(0.5):
+            terms.add(self.pick("CONCEPT_KEYWORDS"))
+        return sorted(terms)[:5]
+
+    def abstract(self, index):
+        """
+        (id, tag, sections dict, keywords) of one synthetic abstract.
+        """
+        tag = self.random.choice(sorted(self.domain_terms)) if self.domain_terms else None
+        sections = {
+            "background": self.background(tag),
+            "hypothesis": self.hypothesis(tag),
+            "methodology": self.methodology(tag),
+            "outcomes": self.outcomes(tag),
+            "impact": self.impact(tag),
+        }
+        return f"synthetic_{index:06d}", tag, sections, self.keywords(tag)
+
+    def generate(self, n):
+        for index in range(n):
+            yield self.abstract(index)
+
+
+def to_text(sections, keywords):
+    """
+    Abstract in the input_data/ file format.
+    """
+    parts = [f"# {name}\n{text}\n" for name, text in sections.items()]
+    parts.append(f"# keywords\n{', '.join(keywords)}\n")
+    return "\n".join(parts)
+
+
+def write_directory(abstracts, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for abstract_id, _, sections, keywords in abstracts:
+        path = os.path.join(out_dir, f"{abstract_id}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(to_text(sections, keywords))
+        paths.append(path)
+    return paths
+
+
+def write_jsonl(abstracts, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for abstract_id, tag, sections, keywords in abstracts:
+            f.write(json.dumps({"id": abstract_id, "tag": tag, "sections": sections, "keywords": keywords}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus of proposal abstracts")
+    parser.add_argument("--n", type=int, default=100, help="Number of abstracts.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same corpus).")
+    parser.add_argument("--out-dir", type=str, default=None, help="Write one .txt file per abstract here.")
+    parser.add_argument("--jsonl", type=str, default=None, help="Write the corpus as JSONL (streaming mode input).")
+    args = parser.parse_args()
+
+    abstracts = list(CorpusGenerator(args.seed).generate(args.n))
+    if args.jsonl:
+        write_jsonl(abstracts, args.jsonl)
+        print(f"{len(abstracts)} abstracts written to {args.jsonl}")
+    if args.out_dir or not args.jsonl:
+        out_dir = args.out_dir or "bench_corpus"
+        write_directory(abstracts, out_dir)
+        print(f"{len(abstracts)} abstracts written to {out_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# run_benchmarks.py - full benchmark suite with a stored baseline and regression check
+#
+# Usage (from the repository root):
+#     python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+#     python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --tolerance 0.10
+#
+# With --compare the exit code is 1 when any metric is worse than the baseline
+# by more than the tolerance, so the suite can gate a CI job. Baselines are
+# machine-specific: record one on the machine that runs the comparison.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import bench_e2e, bench_micro, bench_startup
+
+
+def higher_is_better(metric):
+    return metric.endswith("_per_s")
+
+
+def environment():
+    """
+    Metadata stored with the metrics; comparisons across different environments are flagged.
+    """
+    import spacy
+    from pipeline import MODEL_NAME
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    try:
+        model_version = spacy.util.get_package_version(MODEL_NAME) or ""
+    except Exception:
+        model_version = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "spacy": spacy.__version__,
+        "model": f"{MODEL_NAME} {model_version}".strip(),
+        "commit": commit,
+    }
+
+
+def run_suite(args):
+    metrics = {}
+    if not args.skip_startup:
+        metrics.update(bench_startup.run(args.repeat)[0])
+    if not args.skip_e2e:
+        metrics.update(bench_e2e.run(args.n, args.seed, args.tag, args.cold_repeat, args.batch_size))
+    if not args.skip_micro:
+        metrics.update(bench_micro.run(args.micro_n, args.seed, args.micro_tag, args.repeat))
+    return metrics
+
+
+def compare(current, baseline, tolerance):
+    """
+    Rows (metric, baseline, current, relative change, status); status is 'ok',
+    'improved', 'REGRESSION' or 'new'. A positive change is always an improvement.
+    """
+    rows = []
+    for metric, value in current.items():
+        reference = baseline.get(metric)
+        if not reference:
+            rows.append((metric, None, value, 0.0, "new"))
+            continue
+        change = (value - reference) / reference
+        if not higher_is_better(metric):
+            change = -change
+        if change < -tolerance:
+            status = "REGRESSION"
+        elif change > tolerance:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((metric, reference, value, change, status))
+    return rows
+
+
+def print_metrics(metrics):
+    for name, value in metrics.items():
+        print(f"{name:<32} {value:>12.3f}")
+
+
+def print_comparison(rows, tolerance):
+    print(f"{'metric':<32} {'baseline':>12} {'current':>12} {'change':>8}  status (tolerance {tolerance:.0%})")
+    for metric, reference, value, change, status in rows:
+        reference_text = f"{reference:>12.3f}" if reference is not None else f"{'-':>12}"
+        print(f"{metric:<32} {reference_text} {value:>12.3f} {change:>+7.1%}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPAA benchmark suite (end-to-end + micro-benchmarks)")
+    parser.add_argument("--n", type=int, default=200, help="Synthetic abstracts for the end-to-end benchmarks.")
+    parser.add_argument("--micro-n", type=int, default=50, help="Synthetic abstracts used as micro-benchmark fixtures.")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed.")
+    parser.add_argument("--tag", type=str, default=None, help="Domain tag for the end-to-end benchmarks.")
+    parser.add_argument("--micro-tag", type=str, default="pparg", help="Domain lexicon for the micro-benchmarks.")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="Cold-start runs (0 to skip).")
+    parser.add_argument("--batch-size", type=int, default=64, help="nlp.pipe batch size for the throughput run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Micro-benchmark timing repeats (best is kept).")
+    parser.add_argument("--skip-e2e", action="store_true", help="Skip the end-to-end benchmarks.")
+    parser.add_argument("--skip-micro", action="store_true", help="Skip the micro-benchmarks.")
+    parser.add_argument("--skip-startup", action="store_true", help="Skip the CLI start-up benchmark.")
+    parser.add_argument("--save-baseline", type=str, default=None, help="Write the results as a baseline JSON file.")
+    parser.add_argument("--compare", type=str, default=None, help="Compare against a baseline JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative slowdown allowed before a metric counts as a regression (default: 0.10).")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    metrics = run_suite(args)
+    env = environment()
+
+    if args.save_baseline:
+        directory = os.path.dirname(args.save_baseline)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        settings = {key: getattr(args, key) for key in ("n", "micro_n", "seed", "tag", "micro_tag", "batch_size")}
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "environment": env,
+                "settings": settings,
+                "metrics": metrics,
+            }, f, indent=2)
+        print(f"Baseline saved to: {args.save_baseline}")
+
+    if baseline is None:
+        print_metrics(metrics)
+        return
+
+    for key, value in baseline.get("environment", {}).items():
+        if key != "commit" and env.get(key) != value:
+            print(f"[WARN] Baseline recorded with {key}={value}, now {env.get(key)}; timings may not be comparable")
+    print(f"Baseline: {args.compare} (commit {baseline.get('environment', {}).get('commit') or '?'})")
+
+    rows = compare(metrics, baseline.get("metrics", {}), args.tolerance)
+    print_comparison(rows, args.tolerance)
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
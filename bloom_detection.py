@@ -1,36 +1,86 @@
 # bloom_detection.py - (differentiated scoring)
 
-def detect_bloom_level(doc, bloom_verbs, bloom_synonyms):
-    found_exact = set()
-    found_synonym = set()
-
-    for token in doc:
-        if token.pos_ == "VERB":
-            lemma = token.lemma_.lower()
-            # Direct match in BLOOM_VERBS
-            for level, verbs in bloom_verbs.items():
-                if lemma in verbs:
-                    found_exact.add(level)
-            # Indirect match in BLOOM_SYNONYMS
-            for core, synonyms in bloom_synonyms.items():
-                if lemma in synonyms:
-                    # Need to find what Bloom level the core belongs to
-                    for level, verbs in bloom_verbs.items():
-                        if core in verbs:
-                            found_synonym.add(level)
-
-    # Priority: HIGH > MEDIUM > LOW
-    if "HIGH" in found_exact:
-        return ("Bloom level: HIGH (exact match)", 1.0)
-    elif "HIGH" in found_synonym:
-        return ("Bloom level: HIGH (via synonym)", 0.8)
-    elif "MEDIUM" in found_exact:
-        return ("Bloom level: MEDIUM (exact match)", 0.7)
-    elif "MEDIUM" in found_synonym:
-        return ("Bloom level: MEDIUM (via synonym)", 0.6)
-    elif "LOW" in found_exact:
-        return ("Bloom level: LOW (exact match)", 0.4)
-    elif "LOW" in found_synonym:
-        return ("Bloom level: LOW (via synonym)", 0.3)
-    else:
-        return ("No Bloom-level verbs detected.", 0.0)
+from collections import Counter
+
+# (level, match kind) in priority order: HIGH > MEDIUM > LOW, exact > synonym
+BLOOM_RESULTS = (
+    (("HIGH", "exact"),     "Bloom level: HIGH (exact match)",     1.0),
+    (("HIGH", "synonym"),   "Bloom level: HIGH (via synonym)",     0.8),
+    (("MEDIUM", "exact"),   "Bloom level: MEDIUM (exact match)",   0.7),
+    (("MEDIUM", "synonym"), "Bloom level: MEDIUM (via synonym)",   0.6),
+    (("LOW", "exact"),      "Bloom level: LOW (exact match)",      0.4),
+    (("LOW", "synonym"),    "Bloom level: LOW (via synonym)",      0.3),
+)
+NO_BLOOM_RESULT = ("No Bloom-level verbs detected.", 0.0)
+
+
+class BloomIndex:
+    """
+    Inverted index built once from BLOOM_VERBS / BLOOM_SYNONYMS:
+        lemma -> ((level, "exact" | "synonym"), ...)
+    so that detection costs one dictionary lookup per verb.
+    """
+
+    def __init__(self, bloom_verbs, bloom_synonyms):
+        index = {}
+        core_levels = {}
+        for level, verbs in bloom_verbs.items():
+            for verb in verbs:
+                index.setdefault(verb, set()).add((level, "exact"))
+                core_levels.setdefault(verb, []).append(level)
+
+        all_synonyms = set()
+        for core, synonyms in bloom_synonyms.items():
+            for synonym in synonyms:
+                all_synonyms.add(synonym)
+                # A synonym takes the level(s) of its core verb
+                for level in core_levels.get(core, []):
+                    index.setdefault(synonym, set()).add((level, "synonym"))
+
+        self.index = {lemma: tuple(sorted(matches)) for lemma, matches in index.items()}
+
+        # Verbs that state an analytical/evaluative purpose (MethodologyValidator)
+        self.purpose_lemmas = frozenset(
+            set(bloom_verbs.get("MEDIUM", [])) | set(bloom_verbs.get("HIGH", [])) | all_synonyms
+        )
+
+    def lookup(self, lemma):
+        return self.index.get(lemma, ())
+
+    def histogram(self, verb_lemmas):
+        """
+        Counter of (level, kind) over the given (lowercased) verb lemmas.
+        """
+        counts = Counter()
+        index = self.index
+        for lemma in verb_lemmas:
+            matches = index.get(lemma)
+            if matches:
+                counts.update(matches)
+        return counts
+
+
+def resolve_bloom_level(histogram):
+    """
+    Highest-priority Bloom result present in the histogram: (message, factor).
+    """
+    for key, message, factor in BLOOM_RESULTS:
+        if histogram.get(key):
+            return (message, factor)
+    return NO_BLOOM_RESULT
+
+
+def detect_bloom(doc, index):
+    """
+    Returns (message, factor, histogram) for the VERB tokens of doc.
+    """
+    histogram = index.histogram(token.lemma_.lower() for token in doc if token.pos_ == "VERB")
+    message, factor = resolve_bloom_level(histogram)
+    return message, factor, histogram
+
+
+def detect_bloom_level(doc, bloom_verbs, bloom_synonyms, index=None):
+    if index is None:
+        index = BloomIndex(bloom_verbs, bloom_synonyms)
+    message, factor, _ = detect_bloom(doc, index)
+    return (message, factor)
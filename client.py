@@ -0,0 +1,71 @@
+# client.py - thin client for a running SPAA validation server (server.py)
+
+import http.client
+import json
+import socket
+
+DEFAULT_ADDRESS = "http://127.0.0.1:8765"
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ValidationClient:
+    """
+    address : 'http://host:port' or 'unix:/path/to/socket'
+    Only the standard library is used, so the client starts without importing spaCy.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=300):
+        self.address = address
+        self.timeout = timeout
+
+    def connection(self):
+        if self.address.startswith("unix:"):
+            return UnixHTTPConnection(self.address[len("unix:"):], timeout=self.timeout)
+        hostport = self.address.split("://", 1)[-1].rstrip("/")
+        return http.client.HTTPConnection(hostport, timeout=self.timeout)
+
+    def request(self, method, path, payload=None):
+        conn = self.connection()
+        try:
+            body = json.dumps(payload).encode("utf-8") if payload is not None else None
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise RuntimeError(f"Server error {response.status}: {data.get('error')}")
+        return data
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def validate(self, text=None, sections=None, keywords=None, abstract_id=None, tag=None):
+        """
+        text     : raw abstract in the '# section' file format, or
+        sections : dict section name -> text, with keywords as a list
+        Returns the report dict (id, scores, evidence, best_domain, domain_scores, report).
+        """
+        payload = {"id": abstract_id, "tag": tag}
+        if text is not None:
+            payload["text"] = text
+        else:
+            payload["sections"] = sections or {}
+            payload["keywords"] = keywords or []
+        return self.request("POST", "/validate", {k: v for k, v in payload.items() if v is not None})
+
+    def validate_file(self, input_file, tag=None):
+        with open(input_file, "r", encoding="utf-8") as f:
+            return self.validate(text=f.read(), abstract_id=input_file, tag=tag)
@@ -0,0 +1,374 @@
+# corpus_reader.py - header grammar, memory-mapped multi-abstract corpus files and their offset index
+#
+# Corpus file format: the '# section' format of input_data/, with any number of
+# abstracts per file, each one opened by an abstract header line:
+#
+#     # abstract: PRJ-2024-0001
+#     # background
+#     ...
+#     # keywords
+#     a, b, c
+#     # abstract: PRJ-2024-0002
+#     ...
+#
+# A file without abstract headers is a single abstract whose id is the file name.
+
+import mmap
+import os
+import re
+import struct
+import zlib
+from array import array
+from bisect import bisect_left
+
+SECTION_NAMES = ("background", "hypothesis", "methodology", "outcomes", "impact", "keywords")
+
+# A header is a whole line: optional BOM / indentation, one or more '#', a known
+# name and optionally text on the same line (the abstract id, or the first words
+# of the section). A '#' anywhere else ("the #1 risk factor", "#hashtag",
+# "# 1. Introduction") is prose.
+HEADER_BODY = (
+    r"[ \t]*#+[ \t]*(abstract|background|hypothesis|methodology|outcomes|impact|keywords)"
+    r"(?![\w-])[ \t]*:?[ \t]*(.*?)[ \t]*\r?$"
+)
+HEADER_RE = re.compile(r"^(?:\ufeff)?" + HEADER_BODY, re.IGNORECASE | re.MULTILINE)
+HEADER_RE_BYTES = re.compile(rb"^(?:\xef\xbb\xbf)?" + HEADER_BODY.encode("ascii"), re.IGNORECASE | re.MULTILINE)
+
+MAGIC = b"SPAACIX\0"
+FORMAT_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+# magic, format version, source mtime_ns, source size, n_abstracts, ids blob size
+HEADER = struct.Struct("<8sIqQII")
+
+# Per abstract: start, end, then (start, end) of each of SECTION_NAMES (content only,
+# header line excluded); a missing section is (0, 0)
+FIELDS = 2 + 2 * len(SECTION_NAMES)
+
+
+def parse_keywords(text):
+    return [kw.strip() for kw in text.split(",") if kw.strip()]
+
+
+def section_spans(headers, end):
+    """
+    (header match, content_start, content_end) for every header of an iterator
+    of matches; a section runs from the end of its header name to the next
+    header (or end). Only one match is held at a time.
+    """
+    previous = None
+    for match in headers:
+        if previous is not None:
+            yield previous, previous.start(2), match.start()
+        previous = match
+    if previous is not None:
+        yield previous, previous.start(2), end
+
+
+def split_sections(text):
+    """
+    (background, hypothesis, methodology, outcomes, impact, keywords) of one
+    abstract in the '# section' format. Text before the first header is
+    ignored and a repeated section replaces the earlier one. keywords is ""
+    (not a list) when the abstract has no keywords section, as before.
+    """
+    values = dict.fromkeys(SECTION_NAMES)
+    for match, start, end in section_spans(HEADER_RE.finditer(text), len(text)):
+        name = match.group(1).lower()
+        if name != "abstract":
+            values[name] = text[start:end].strip()
+    *sections, keywords = (values[name] for name in SECTION_NAMES)
+    sections = [section or "" for section in sections]
+    return (*sections, "" if keywords is None else parse_keywords(keywords))
+
+
+# ----------------------------
+# Offset index
+# ----------------------------
+class CorpusIndex:
+    """
+    Byte offsets of every abstract and section of a corpus file.
+    ids[i] is the id of abstract i, offsets[i * FIELDS:(i + 1) * FIELDS] its offsets.
+    """
+
+    def __init__(self, ids, offsets):
+        self.ids = ids
+        self.offsets = offsets  # array('q')
+        self.starts = offsets[0::FIELDS]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def scan(cls, buffer, default_id):
+        """
+        Build the index with one regex pass over buffer (bytes or mmap).
+        """
+        ids = []
+        offsets = array("q")
+        current = None  # offsets of the abstract being read
+
+        def close(end):
+            if current is not None:
+                current[1] = end
+                offsets.extend(current)
+
+        for match, start, end in section_spans(HEADER_RE_BYTES.finditer(buffer), len(buffer)):
+            name = match.group(1).lower()
+            if name == b"abstract":
+                close(match.start())
+                abstract_id = match.group(2).decode("utf-8", errors="replace").strip()
+                ids.append(abstract_id or f"{default_id}:{len(ids)}")
+                current = [match.start(), 0] + [0] * (FIELDS - 2)
+                continue
+            if current is None:
+                # Sections before any abstract header: the single-abstract file format
+                ids.append(default_id)
+                current = [match.start(), 0] + [0] * (FIELDS - 2)
+            slot = 2 + 2 * SECTION_NAMES.index(name.decode("ascii"))
+            current[slot:slot + 2] = [start, end]
+        close(len(buffer))
+        return cls(ids, offsets)
+
+    def write(self, path, source_stat):
+        blob = "\n".join(self.ids).encode("utf-8")
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, source_stat.st_mtime_ns, source_stat.st_size, len(self.ids), len(blob))
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(self.offsets.tobytes())
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read(cls, path, source_stat):
+        """
+        Index stored at path, or None if missing, invalid or stale (mtime / size changed).
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, mtime_ns, size, n_abstracts, blob_size = HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+        if mtime_ns != source_stat.st_mtime_ns or size != source_stat.st_size:
+            return None
+        offset = HEADER.size
+        offsets = array("q")
+        offsets.frombytes(data[offset:offset + 8 * FIELDS * n_abstracts])
+        offset += 8 * FIELDS * n_abstracts
+        ids = data[offset:offset + blob_size].decode("utf-8").split("\n") if n_abstracts else []
+        if len(ids) != n_abstracts or len(offsets) != FIELDS * n_abstracts:
+            return None
+        return cls(ids, offsets)
+
+
+def index_path(corpus_path):
+    return corpus_path + INDEX_SUFFIX
+
+
+# ----------------------------
+# Reader
+# ----------------------------
+class CorpusReader:
+    """
+    Memory-mapped corpus file with its persisted offset index (<file>.idx,
+    rebuilt when the file's mtime or size changes).
+
+    - random access: reader.abstract(abstract_id) or reader.read(i)
+    - streaming: iter(reader), or reader.iter_range(start, end) for the abstracts
+      that start inside a byte range (see byte_ranges() to shard a file)
+
+    Only the abstracts being read are decoded; the file itself stays in the page cache.
+    A repeated id is read as '<id>#2', '<id>#3', ... (quiet: without a warning).
+    Yields / returns (id, [background, hypothesis, methodology, outcomes, impact], keywords),
+    the item format of BatchValidator.validate_all().
+    """
+
+    def __init__(self, path, index_file=None, rebuild=False, quiet=False):
+        self.path = path
+        self.index_file = index_file or index_path(path)
+        self.file = open(path, "rb")
+        stat = os.fstat(self.file.fileno())
+        # mmap cannot map an empty file
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+
+        self.index = None if rebuild else CorpusIndex.read(self.index_file, stat)
+        if self.index is None:
+            self.index = CorpusIndex.scan(self.buffer, os.path.splitext(os.path.basename(path))[0])
+            try:
+                self.index.write(self.index_file, stat)
+            except OSError as exc:
+                # Read-only archive directory: keep the index in memory
+                print(f"[WARN] Could not write corpus index for {path}: {exc}")
+
+        # Unique id per abstract: a repeated id gets '#2', '#3', ... so that its
+        # report, journal entry and results never replace the earlier one's
+        self.abstract_ids = []
+        self.positions = {}
+        counts = {}
+        for i, abstract_id in enumerate(self.index.ids):
+            counts[abstract_id] = counts.get(abstract_id, 0) + 1
+            if counts[abstract_id] > 1:
+                unique_id = f"{abstract_id}#{counts[abstract_id]}"
+                if not quiet:
+                    print(f"[WARN] Duplicate abstract id '{abstract_id}' in {path}; read as '{unique_id}'")
+            else:
+                unique_id = abstract_id
+            self.abstract_ids.append(unique_id)
+            self.positions[unique_id] = i
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+    def ids(self):
+        return list(self.abstract_ids)
+
+    def qualify(self, taken):
+        """
+        Rename the ids also found in taken (ids of the corpus files read before
+        this one) to '<id>@<file name>'.
+        """
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        clashes = [i for i, abstract_id in enumerate(self.abstract_ids) if abstract_id in taken]
+        for i in clashes:
+            old_id = self.abstract_ids[i]
+            self.abstract_ids[i] = f"{old_id}@{stem}"
+            self.positions[self.abstract_ids[i]] = self.positions.pop(old_id)
+        if clashes:
+            print(f"[WARN] {len(clashes)} abstract id(s) of {self.path} also appear in an earlier corpus file; "
+                  f"read as '<id>@{stem}' (e.g. '{self.abstract_ids[clashes[0]]}')")
+
+    def decode(self, start, end):
+        return self.buffer[start:end].decode("utf-8", errors="replace").strip()
+
+    def read(self, i):
+        """
+        (id, sections, keywords) of the i-th abstract of the file.
+        """
+        fields = self.index.offsets[i * FIELDS:(i + 1) * FIELDS]
+        values = [self.decode(fields[slot], fields[slot + 1]) for slot in range(2, FIELDS, 2)]
+        *sections, keywords = values
+        return self.abstract_ids[i], sections, parse_keywords(keywords)
+
+    def abstract(self, abstract_id):
+        """
+        Random access by id, as returned by ids() (KeyError if the id is not in the file).
+        """
+        return self.read(self.positions[abstract_id])
+
+    def raw_text(self, i):
+        """
+        The i-th abstract exactly as written in the file.
+        """
+        fields = self.index.offsets[i * FIELDS:(i + 1) * FIELDS]
+        return self.buffer[fields[0]:fields[1]].decode("utf-8", errors="replace")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.read(i)
+
+    def iter_range(self, start=0, end=None):
+        """
+        Abstracts whose first byte lies in [start, end): contiguous ranges that
+        cover the file give every abstract to exactly one range.
+        """
+        end = len(self.buffer) if end is None else end
+        i = bisect_left(self.index.starts, start)
+        while i < len(self) and self.index.starts[i] < end:
+            yield self.read(i)
+            i += 1
+
+    def byte_ranges(self, n):
+        """
+        Split the file into n contiguous byte ranges of similar size, cut at abstract starts.
+        """
+        size = len(self.buffer)
+        cuts = [0]
+        for k in range(1, n):
+            i = bisect_left(self.index.starts, size * k // n)
+            cut = self.index.starts[i] if i < len(self) else size
+            cuts.append(max(cut, cuts[-1]))
+        cuts.append(size)
+        return list(zip(cuts[:-1], cuts[1:]))
+
+
+def parse_byte_range(value):
+    """
+    'START:END' (either side may be empty) -> (start, end or None).
+    """
+    start, _, end = value.partition(":")
+    return int(start or 0), int(end) if end else None
+
+
+def parse_shard(value):
+    """
+    'K/N' (1-based) -> (k, n).
+    """
+    k, _, n = value.partition("/")
+    k, n = int(k), int(n)
+    if not 1 <= k <= n:
+        raise ValueError(f"Invalid shard '{value}': expected K/N with 1 <= K <= N")
+    return k, n
+
+
+def open_corpus(path, earlier=(), rebuild=False):
+    """
+    CorpusReader of path whose ids are unique across a run: ids that also occur
+    in the corpus files of earlier (read before path in the same run) are
+    qualified with the file name (CorpusReader.qualify). Only the offset
+    indexes of the earlier files are read.
+    """
+    taken = set()
+    for other in earlier:
+        with CorpusReader(other, quiet=True) as reader:
+            taken.update(reader.ids())
+    reader = CorpusReader(path, rebuild=rebuild)
+    if taken:
+        reader.qualify(taken)
+    return reader
+
+
+def report_name(abstract_id):
+    """
+    File name stem of the report of a corpus abstract: the whole id with path
+    separators and other unsafe characters replaced (dots are kept). A hash of
+    the id is appended when anything was replaced, so distinct ids never share
+    a report ("doi/10.1/x" and "doi_10.1_x" stay apart).
+    """
+    stem = re.sub(r"[^\w.@#+=,-]", "_", abstract_id).strip(".") or "_"
+    if stem != abstract_id:
+        stem = f"{stem}-{zlib.crc32(abstract_id.encode('utf-8')):08x}"
+    return stem
+
+
+def iter_corpus(paths, shard=None, byte_range=None, rebuild_index=False):
+    """
+    Streams (id, sections, keywords) from every corpus file; ids are unique
+    across paths (see open_corpus).
+    shard      : (k, n) -> only the k-th of n byte ranges of each file
+    byte_range : (start, end) -> only the abstracts starting in that byte range (single file)
+    """
+    for number, path in enumerate(paths):
+        with open_corpus(path, earlier=paths[:number], rebuild=rebuild_index) as reader:
+            if shard is not None:
+                k, n = shard
+                start, end = reader.byte_ranges(n)[k - 1]
+            elif byte_range is not None:
+                start, end = byte_range
+            else:
+                start, end = 0, None
+            yield from reader.iter_range(start, end)
@@ -0,0 +1,433 @@
+# dedup.py - exact and near-duplicate detection in front of the pipeline
+#
+# Usage (report only, nothing is validated):
+#     python dedup.py input_data --index .spaa_cache/dedup.sqlite --threshold 0.8
+#
+# In batch / streaming mode use 'abstract_validator.py --dedup': exact duplicates
+# reuse the stored results and near-duplicates are flagged (see BatchValidator).
+#
+# NumPy and sqlite3 are imported where they are used: the CLI imports this
+# module for its defaults on every start.
+
+import argparse
+import datetime
+import glob
+import hashlib
+import json
+import os
+import re
+import zlib
+
+from domain_index import is_multi_tag, lexicon_csv_path, parse_tags
+from results import AbstractResult, atomic_path
+
+DEFAULT_INDEX = ".spaa_cache/dedup.sqlite"
+DEFAULT_THRESHOLD = 0.8   # estimated Jaccard similarity of word shingles
+NUM_PERM = 128            # MinHash permutations
+BANDS = 16                # LSH bands of NUM_PERM // BANDS rows each
+SHINGLE_SIZE = 3          # words per shingle
+SEED = 1
+
+MERSENNE = (1 << 32) - 1  # multipliers / offsets stay below 2**32 so a*x + b fits in uint64
+PRIME = 4294967311        # smallest prime above 2**32
+
+SECTION_NAMES = ("background", "hypothesis", "methodology", "outcomes", "impact")
+WORD_RE = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS abstracts (
+    id           TEXT PRIMARY KEY,
+    content      TEXT NOT NULL,   -- sha256 of the section hashes and keywords
+    signature    BLOB NOT NULL,   -- MinHash, NUM_PERM uint64 values
+    group_id     TEXT NOT NULL,   -- near-duplicate group (id of its first member)
+    duplicate_of TEXT,            -- closest earlier abstract when it was added
+    similarity   REAL,
+    seen_at      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS abstracts_content ON abstracts (content);
+CREATE TABLE IF NOT EXISTS sections (hash TEXT NOT NULL, section TEXT NOT NULL, id TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS sections_hash ON sections (hash);
+CREATE INDEX IF NOT EXISTS sections_id ON sections (id);
+CREATE TABLE IF NOT EXISTS buckets (bucket TEXT NOT NULL, id TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS buckets_bucket ON buckets (bucket);
+CREATE INDEX IF NOT EXISTS buckets_id ON buckets (id);
+CREATE TABLE IF NOT EXISTS results (
+    content  TEXT NOT NULL,
+    settings TEXT NOT NULL,       -- settings_signature() the result was computed with
+    result   TEXT NOT NULL,       -- AbstractResult.to_dict() as JSON
+    PRIMARY KEY (content, settings)
+);
+"""
+
+
+def sha256(data):
+    return hashlib.sha256(data.encode("utf-8") if isinstance(data, str) else data).hexdigest()
+
+
+EMPTY_HASH = sha256("")
+
+
+def section_hashes(sections):
+    return [sha256(section) for section in sections]
+
+
+def content_key(hashes, keywords):
+    """
+    Exact identity of an abstract: its five section hashes plus its keywords.
+    """
+    return sha256("\0".join(hashes) + "\0" + ",".join(kw.strip().lower() for kw in keywords))
+
+
+def file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return sha256(f.read())
+    except OSError:
+        return ""
+
+
+def settings_signature(config_file, weight_file, domain_tag=None, lexicon_dir="lexicon", nlp=None):
+    """
+    Everything a stored result depends on besides the text: config and weight
+    file contents, the domain tag and lexicon contents, and the spaCy model.
+    A result is only reused under the same signature.
+    """
+    if domain_tag is None:
+        tags = []
+    elif is_multi_tag(domain_tag):
+        tags = parse_tags(domain_tag, lexicon_dir)
+    else:
+        tags = [domain_tag.lower()]
+    parts = [
+        file_digest(config_file),
+        file_digest(weight_file),
+        str(domain_tag),
+        *(f"{tag}:{file_digest(lexicon_csv_path(lexicon_dir, tag))}" for tag in tags),
+    ]
+    if nlp is not None:
+        from doc_cache import DocCache
+
+        parts.append(DocCache.namespace(nlp))
+    return sha256("\n".join(parts))
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles with universal hashes (a*x + b) mod PRIME,
+    computed for all permutations at once with NumPy.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=SEED):
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, MERSENNE, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text):
+        """
+        crc32 of every run of shingle_size lowercased words (the words themselves for shorter texts).
+        """
+        import numpy as np
+
+        words = WORD_RE.findall(text.lower())
+        k = min(self.shingle_size, len(words))
+        if k == 0:
+            return np.zeros(0, dtype=np.uint64)
+        grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+        return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text):
+        import numpy as np
+
+        shingles = self.shingles(text)
+        if len(shingles) == 0:
+            return np.full(self.num_perm, PRIME, dtype=np.uint64)
+        hashed = (np.outer(self.a, shingles) + self.b[:, None]) % np.uint64(PRIME)
+        return hashed.min(axis=1)
+
+
+def similarity(signature_a, signature_b):
+    """
+    Estimated Jaccard similarity: share of equal MinHash values.
+    """
+    return float((signature_a == signature_b).mean())
+
+
+def band_buckets(signature, bands=BANDS):
+    """
+    LSH bucket keys, one per band; abstracts sharing a bucket are near-duplicate candidates.
+    """
+    rows = len(signature) // bands
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(bands)
+    ]
+
+
+class DedupMatch:
+    """
+    Outcome of DedupIndex.check() for one abstract.
+    kind            : 'exact', 'near' or None
+    duplicate_of    : id of the matching abstract
+    similarity      : estimated Jaccard similarity (1.0 for exact duplicates)
+    content         : content_key of the abstract
+    shared_sections : section name -> id of another abstract with the identical section
+    """
+
+    __slots__ = ("abstract_id", "kind", "duplicate_of", "similarity", "content", "group_id", "shared_sections")
+
+    def __init__(self, abstract_id, kind, duplicate_of, similarity, content, group_id, shared_sections):
+        self.abstract_id = abstract_id
+        self.kind = kind
+        self.duplicate_of = duplicate_of
+        self.similarity = similarity
+        self.content = content
+        self.group_id = group_id
+        self.shared_sections = shared_sections
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class DedupIndex:
+    """
+    Persistent (SQLite) index of every abstract seen so far:
+    - per-section sha256 hashes (template reuse of single sections),
+    - a content key per abstract and the results computed for it, reused for exact duplicates,
+    - MinHash signatures with LSH buckets to find near-duplicates.
+
+    Results are stored per settings_signature(), so a change of config, weights,
+    lexicon or model never reuses stale scores.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX, settings="", threshold=DEFAULT_THRESHOLD,
+                 num_perm=NUM_PERM, bands=BANDS, shingle_size=SHINGLE_SIZE):
+        import sqlite3
+
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.settings = settings
+        self.threshold = threshold
+        self.bands = bands
+        self.hasher = MinHasher(num_perm, shingle_size)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.check_parameters({"num_perm": num_perm, "bands": bands, "shingle_size": shingle_size, "seed": SEED})
+        self.pending = 0
+
+    def check_parameters(self, parameters):
+        stored = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if not stored:
+            self.conn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in parameters.items()])
+            self.conn.commit()
+            return
+        different = {k: stored.get(k) for k, v in parameters.items() if stored.get(k) != str(v)}
+        if different:
+            raise ValueError(
+                f"Dedup index {self.path} was built with {different}; use another --dedup-index or delete it"
+            )
+
+    # ----------------------------
+    # Lookup and insertion
+    # ----------------------------
+    def check(self, abstract_id, sections, keywords):
+        """
+        Classify one abstract against the index and add it (signature, sections, group).
+        Exact duplicates are matched on the content key, near-duplicates on the
+        estimated similarity of the LSH candidates (>= threshold).
+        """
+        import numpy as np
+
+        abstract_id = str(abstract_id)
+        text = "\n".join(sections)
+        hashes = section_hashes(sections)
+        content = content_key(hashes, keywords)
+        signature = self.hasher.signature(text)
+        buckets = band_buckets(signature, self.bands)
+
+        previous = self.conn.execute("SELECT content FROM abstracts WHERE id = ?", (abstract_id,)).fetchone()
+        if previous is not None and previous[0] != content:
+            self.forget(abstract_id)  # same id, new text (e.g. the file was edited)
+
+        kind, duplicate_of, best, group_id = None, None, 0.0, abstract_id
+        row = self.conn.execute(
+            "SELECT id, group_id FROM abstracts WHERE content = ? AND id != ? ORDER BY seen_at, rowid LIMIT 1",
+            (content, abstract_id),
+        ).fetchone()
+        if row is not None:
+            kind, duplicate_of, best, group_id = "exact", row[0], 1.0, row[1]
+        else:
+            candidates = self.conn.execute(
+                f"SELECT DISTINCT a.id, a.signature, a.group_id FROM buckets b JOIN abstracts a ON a.id = b.id "
+                f"WHERE b.bucket IN ({','.join('?' * len(buckets))}) AND b.id != ?",
+                (*buckets, abstract_id),
+            ).fetchall()
+            for candidate_id, blob, candidate_group in candidates:
+                score = similarity(signature, np.frombuffer(blob, dtype=np.uint64))
+                if score >= self.threshold and score > best:
+                    kind, duplicate_of, best, group_id = "near", candidate_id, score, candidate_group
+
+        shared = {}
+        for section, digest in zip(SECTION_NAMES, hashes):
+            if not digest or digest == EMPTY_HASH:
+                continue
+            other = self.conn.execute(
+                "SELECT id FROM sections WHERE hash = ? AND id != ? LIMIT 1", (digest, abstract_id)
+            ).fetchone()
+            if other is not None:
+                shared[section] = other[0]
+
+        if previous is None or previous[0] != content:
+            self.add(abstract_id, content, signature, buckets, hashes, group_id, duplicate_of, best if kind else None)
+        else:
+            group_id = self.conn.execute("SELECT group_id FROM abstracts WHERE id = ?", (abstract_id,)).fetchone()[0]
+        return DedupMatch(abstract_id, kind, duplicate_of, best if kind else None, content, group_id, shared)
+
+    def add(self, abstract_id, content, signature, buckets, hashes, group_id, duplicate_of, score):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO abstracts VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (abstract_id, content, signature.tobytes(), group_id, duplicate_of, score,
+             datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        self.conn.executemany("INSERT INTO buckets VALUES (?, ?)", [(bucket, abstract_id) for bucket in buckets])
+        self.conn.executemany(
+            "INSERT INTO sections VALUES (?, ?, ?)",
+            [(digest, section, abstract_id) for section, digest in zip(SECTION_NAMES, hashes)],
+        )
+        self.changed()
+
+    def forget(self, abstract_id):
+        for table in ("abstracts", "buckets", "sections"):
+            self.conn.execute(f"DELETE FROM {table} WHERE id = ?", (abstract_id,))
+
+    # ----------------------------
+    # Stored results (exact duplicates)
+    # ----------------------------
+    def result(self, content):
+        """
+        AbstractResult stored for this content under the current settings, or None.
+        """
+        row = self.conn.execute(
+            "SELECT result FROM results WHERE content = ? AND settings = ?", (content, self.settings)
+        ).fetchone()
+        return AbstractResult.from_dict(json.loads(row[0])) if row else None
+
+    def has_result(self, content):
+        return self.conn.execute(
+            "SELECT 1 FROM results WHERE content = ? AND settings = ?", (content, self.settings)
+        ).fetchone() is not None
+
+    def store_result(self, content, result):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+            (content, self.settings, json.dumps(result.to_dict(), ensure_ascii=False)),
+        )
+        self.changed()
+
+    def changed(self, every=500):
+        self.pending += 1
+        if self.pending >= every:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    # ----------------------------
+    # Reports
+    # ----------------------------
+    def groups(self, min_size=2):
+        """
+        Near-duplicate groups: group id -> member ids (in order of arrival).
+        """
+        members = {}
+        for abstract_id, group_id in self.conn.execute("SELECT id, group_id FROM abstracts ORDER BY seen_at, rowid"):
+            members.setdefault(group_id, []).append(abstract_id)
+        return {group_id: ids for group_id, ids in members.items() if len(ids) >= min_size}
+
+    def shared_sections(self, min_size=2):
+        """
+        Sections reused verbatim: (section, hash) -> ids, e.g. a template methodology.
+        """
+        shared = {}
+        rows = self.conn.execute(
+            "SELECT section, hash, id FROM sections WHERE hash IN "
+            "(SELECT hash FROM sections WHERE hash != ? GROUP BY hash HAVING COUNT(DISTINCT id) >= ?) "
+            "ORDER BY rowid",
+            (EMPTY_HASH, min_size),
+        )
+        for section, digest, abstract_id in rows:
+            shared.setdefault((section, digest), []).append(abstract_id)
+        return shared
+
+
+def write_report(matches, index, path):
+    """
+    JSON report of one run: the duplicates found and every group in the index.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    report = {
+        "exact": [match.to_dict() for match in matches if match.kind == "exact"],
+        "near": [match.to_dict() for match in matches if match.kind == "near"],
+        "shared_sections": [match.to_dict() for match in matches if not match.kind and match.shared_sections],
+        "groups": [{"group_id": group_id, "members": ids} for group_id, ids in index.groups().items()],
+    }
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    from config import CONFIG_FILE, WEIGHT_FILE
+    from loader import Loader
+
+    parser = argparse.ArgumentParser(description="Find exact and near-duplicate abstracts (no validation)")
+    parser.add_argument("input_dir", help="Directory of abstract files.")
+    parser.add_argument("--glob", type=str, default="*.txt", help="Filename pattern inside input_dir.")
+    parser.add_argument("--index", type=str, default=DEFAULT_INDEX, help=f"SQLite index (default: {DEFAULT_INDEX}).")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Estimated Jaccard similarity for near-duplicates (default: {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--report", type=str, default=None, help="Write the JSON report here.")
+    args = parser.parse_args()
+
+    loader = Loader(None, CONFIG_FILE, WEIGHT_FILE)
+    index = DedupIndex(args.index, threshold=args.threshold)
+    matches = []
+    for path in sorted(glob.glob(os.path.join(args.input_dir, args.glob))):
+        with open(path, "r", encoding="utf-8") as f:
+            *sections, keywords = loader.split_sections(f.read())
+        match = index.check(path, sections, keywords)
+        matches.append(match)
+        if match.kind:
+            print(f"[DEDUP] {path}: {match.kind} duplicate of {match.duplicate_of} (similarity {match.similarity:.2f})")
+    index.commit()
+
+    groups = index.groups()
+    print(f"{len(matches)} abstracts: {sum(m.kind == 'exact' for m in matches)} exact, "
+          f"{sum(m.kind == 'near' for m in matches)} near-duplicates, {len(groups)} group(s) in the index")
+    for (section, _), ids in index.shared_sections().items():
+        print(f"[DEDUP] identical {section} section in {len(ids)} abstracts: {', '.join(ids[:5])}"
+              f"{' ...' if len(ids) > 5 else ''}")
+    if args.report:
+        write_report(matches, index, args.report)
+        print(f"Dedup report saved to: {args.report}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# doc_cache.py - persistent cache of parsed section Docs
+
+import hashlib
+import os
+from collections import deque
+
+DEFAULT_CACHE_DIR = ".spaa_cache/docs"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class DocCache:
+    """
+    On-disk cache of parsed Docs, one DocBin file per section:
+        <cache_dir>/<key[:2]>/<key>.spacy
+    The key is the sha256 of the model name, version and active components
+    plus the section text, so a model upgrade never reuses stale parses.
+
+    Entries are evicted least-recently-used first (file mtime is refreshed on
+    every hit) once the directory grows beyond max_bytes.
+
+    nlp may be a LazyPipeline (pipeline.py): keys and hits only use its meta,
+    pipe_names and vocab, so the model is loaded on the first miss.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, rebuild=False):
+        """
+        cache_dir : directory holding the DocBin files
+        max_bytes : size bound of the cache directory
+        rebuild   : ignore existing entries and overwrite them with fresh parses
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # bytes on disk, computed lazily
+
+    @staticmethod
+    def namespace(nlp):
+        meta = nlp.meta
+        return f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}|{','.join(nlp.pipe_names)}"
+
+    def key(self, nlp, text):
+        digest = hashlib.sha256(self.namespace(nlp).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.spacy")
+
+    def contains(self, key):
+        return not self.rebuild and os.path.exists(self.path(key))
+
+    def load(self, nlp, key):
+        """
+        Cached Doc for key, or None if missing or unreadable (a truncated or
+        corrupted entry is removed, so it is parsed and stored again).
+        """
+        from spacy.tokens import DocBin
+
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                doc_bin = DocBin().from_bytes(f.read())
+            doc = next(iter(doc_bin.get_docs(nlp.vocab)))
+            os.utime(path)  # LRU: mark as recently used
+            return doc
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            # Torn write, disk error or a DocBin that no longer decodes (zlib, msgpack, ...)
+            print(f"[WARN] Dropping unreadable cached Doc {path}: {exc.__class__.__name__}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def store(self, key, doc):
+        from spacy.tokens import DocBin
+
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = DocBin(docs=[doc], store_user_data=False).to_bytes()
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        self._size = self.disk_size() if self._size is None else self._size + len(data) - previous
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        """
+        List of (mtime, size, path) for every cached Doc.
+        """
+        found = []
+        if not os.path.isdir(self.cache_dir):
+            return found
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".spacy"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, st.st_size, path))
+        return found
+
+    def disk_size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Remove least-recently-used entries until the cache is at 90% of max_bytes.
+        """
+        entries = sorted(self.entries())
+        size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                pass
+        self._size = size
+
+    def pipe(self, nlp, texts, batch_size=None, n_process=1):
+        """
+        Drop-in replacement for nlp.pipe(texts): yields one Doc per text, in order.
+        Cached texts are loaded from disk; only the misses go through nlp.pipe,
+        and their Docs are stored.
+
+        The input is read lazily and every text gets a slot in a queue: the misses
+        are fed to a single nlp.pipe generator (so a multiprocess pool is started
+        once, not once per batch) and the hits are yielded as their turn comes.
+        Look-ahead is bounded: when more than 8 * batch_size * n_process hits are
+        queued behind a pending miss, the pipeline is drained and started again on
+        the next miss. Cached Docs are read only when yielded.
+        """
+        look_ahead = None  # set when the pipeline starts (nlp.batch_size may load a LazyPipeline)
+        texts = iter(texts)
+        slots = deque()  # (key, text, miss) of every text read and not yet yielded
+        parsed = deque()  # Docs of the misses at the front of the queue
+        queued_hits = 0
+        hit = object()
+
+        def read():
+            """
+            Queues the next text; returns it if it is a miss, hit for a cached text
+            and None at the end of the input.
+            """
+            nonlocal queued_hits
+            text = next(texts, None)
+            if text is None:
+                return None
+            key = self.key(nlp, text)
+            miss = not self.contains(key)
+            slots.append((key, text, miss))
+            if miss:
+                return text
+            queued_hits += 1
+            return hit
+
+        def feed(first):
+            yield first
+            while queued_hits <= look_ahead:
+                text = read()
+                if text is None:
+                    return
+                if text is not hit:
+                    yield text
+
+        docs = None
+        while True:
+            if slots:
+                key, text, miss = slots.popleft()
+                if not miss:
+                    queued_hits -= 1
+                    yield self.cached(nlp, key, text)
+                    continue
+                doc = parsed.popleft() if parsed else next(docs)
+                self.misses += 1
+                self.store(key, doc)
+                yield doc
+            elif docs is not None:
+                # Every pending miss was yielded: let the pipeline read on
+                doc = next(docs, None)
+                if doc is None:
+                    docs = None
+                else:
+                    parsed.append(doc)
+            else:
+                text = read()
+                if text is None:
+                    return
+                if text is not hit:
+                    look_ahead = 8 * (batch_size or nlp.batch_size) * max(1, n_process)
+                    docs = nlp.pipe(feed(text), batch_size=batch_size, n_process=n_process)
+
+    def cached(self, nlp, key, text):
+        """
+        Doc of a text found in the cache; parsed again if its entry was evicted
+        or turned out unreadable since it was checked.
+        """
+        doc = self.load(nlp, key)
+        if doc is None:
+            self.misses += 1
+            doc = nlp(text)
+            self.store(key, doc)
+        else:
+            self.hits += 1
+        return doc
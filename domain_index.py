@@ -0,0 +1,82 @@
+# domain_index.py - one inverted index over every curated domain lexicon
+
+import os
+
+from lexicon_cache import load_lexicon
+
+ALL_TAGS = "all"
+
+
+def lexicon_csv_path(lexicon_dir, tag):
+    return os.path.join(lexicon_dir, tag, f"lexicon_{tag}.csv")
+
+
+def discover_tags(lexicon_dir="lexicon"):
+    """
+    Tags that have a lexicon/<tag>/lexicon_<tag>.csv file, sorted.
+    """
+    if not os.path.isdir(lexicon_dir):
+        return []
+    return sorted(
+        tag for tag in os.listdir(lexicon_dir)
+        if os.path.isfile(lexicon_csv_path(lexicon_dir, tag))
+    )
+
+
+def is_multi_tag(domain_tag):
+    """
+    True for '--tag all' or a comma-separated list of tags.
+    """
+    return domain_tag is not None and (domain_tag.lower() == ALL_TAGS or "," in domain_tag)
+
+
+def parse_tags(domain_tag, lexicon_dir="lexicon"):
+    if domain_tag.lower() == ALL_TAGS:
+        return discover_tags(lexicon_dir)
+    return [tag.strip().lower() for tag in domain_tag.split(",") if tag.strip()]
+
+
+class DomainIndex:
+    """
+    Inverted index lemma -> bitset of the tags whose lexicon contains it.
+    Bit i of the (Python int) bitset stands for self.tags[i], so one lookup
+    per distinct lemma gives the hits for every domain at once.
+    """
+
+    def __init__(self, lexicon_dir="lexicon", tags=None):
+        self.lexicon_dir = lexicon_dir
+        self.tags = list(tags) if tags is not None else discover_tags(lexicon_dir)
+        self.index = {}
+        for bit, tag in enumerate(self.tags):
+            compiled = load_lexicon(lexicon_csv_path(lexicon_dir, tag))
+            if compiled is None:
+                continue
+            mask = 1 << bit
+            for word in set(compiled.words):
+                self.index[word] = self.index.get(word, 0) | mask
+
+    def tag_mask(self, tags):
+        positions = {tag: bit for bit, tag in enumerate(self.tags)}
+        mask = 0
+        for tag in tags:
+            if tag in positions:
+                mask |= 1 << positions[tag]
+        return mask
+
+    def hits(self, lemmas, tags=None):
+        """
+        dict tag -> set of lemmas found in that tag's lexicon (tags without hits are omitted).
+        tags restricts the result to a subset of self.tags.
+        """
+        restrict = self.tag_mask(tags) if tags is not None else -1
+        per_bit = {}
+        for lemma in set(lemmas):
+            mask = self.index.get(lemma, 0) & restrict
+            while mask:
+                low = mask & -mask
+                per_bit.setdefault(low.bit_length() - 1, set()).add(lemma)
+                mask ^= low
+        return {self.tags[bit]: found for bit, found in per_bit.items()}
+
+    def counts(self, lemmas, tags=None):
+        return {tag: len(found) for tag, found in self.hits(lemmas, tags).items()}
@@ -1,18 +1,29 @@
 # ethics_analysis.py - OOP version
 
+from results import SectionResult, evidence_spans
+
 class EthicsValidator:
-    def __init__(self, doc, keywords, weights):
-        self.doc = doc
-        self.keywords = keywords
+    # Only the raw text is read, no pipeline component is needed (see pipeline.py)
+    REQUIRES = frozenset()
+
+    def __init__(self, features, weights):
+        """
+        features : SectionFeatures of the section scanned for ETHICS_KEYWORDS (impact)
+        """
+        self.features = features
         self.weights = weights
         self.feedback = []
+        self.evidence = []
+        self.signals = {}  # weight key -> detected factor (see rescoring.py)
         self.score = 0
 
     def validate(self):
         total = sum(self.weights.values())
-        text_lower = self.doc.text.lower()
 
-        ethics_mentioned = any(phrase in text_lower for phrase in self.keywords)
+        hits = self.features.keyword_hits
+        self.evidence = hits.evidence("ETHICS_KEYWORDS")
+
+        ethics_mentioned = hits.found("ETHICS_KEYWORDS")
 
         if ethics_mentioned:
             self.feedback.append(f"Ethical approval or considerations detected (+{self.weights['mention']})")
@@ -20,5 +31,13 @@ class EthicsValidator:
         else:
             self.feedback.append("No explicit mention of ethical approval or considerations (+0)")
 
+        self.signals = {"mention": float(ethics_mentioned)}
+
         percentage = (self.score / total) * 100 if total > 0 else 0
-        return self.feedback, round(percentage, 1)
+        return SectionResult(
+            "ETHICS",
+            round(percentage, 1),
+            flags=self.signals,
+            feedback=self.feedback,
+            evidence=evidence_spans(self.evidence),
+        )
@@ -1,34 +1,35 @@
 # hypothesis_analysis.py - version 1.1
 
-from bloom_detection import detect_bloom_level
+from results import SectionResult, evidence_spans
 
 class HypothesisValidator:
-    def __init__(self, doc, config, weights, bloom_verbs, bloom_synonyms, domain_lexicon=None):
+    # Token attributes read from the spaCy Doc (see pipeline.py)
+    REQUIRES = frozenset({"lemma_", "pos_"})
+
+    def __init__(self, features, weights, domain_lexicon=None):
         """
-        doc            : spaCy Doc from hypothesis section
-        config         : config_keywords.json
+        features       : SectionFeatures of the hypothesis section (section_features.py)
         weights        : weights for HYPOTHESIS in config_weights.json
-        bloom_verbs    : diccionary of BLOOM_VERBS
-        bloom_synonyms : diccionary of BLOOM_SYNONYMS
         domain_lexicon : dict with words sets for POS y 'ALL', o None
                          p.ej. {"NOUN": set(...), "VERB": set(...), "ADJ": set(...), "ALL": set(...)}
         """
-        self.doc = doc
-        self.config = config
+        self.features = features
         self.weights = weights
-        self.bloom_verbs = bloom_verbs
-        self.bloom_synonyms = bloom_synonyms
         self.domain_lexicon = domain_lexicon
         self.feedback = []
+        self.evidence = []
+        self.signals = {}        # weight key -> detected factor (see rescoring.py)
+        self.domain_terms = set()
         self.score = 0
 
     def validate(self):
         total = sum(self.weights.values()) if self.weights else 1
-        text_lower = self.doc.text.lower()
-        lemmas_lower = [t.lemma_.lower() for t in self.doc]
+        lemmas_lower = self.features.lemmas
+        hits = self.features.keyword_hits
+        self.evidence = hits.evidence("HYPOTHESIS_TONE_PHRASES", "CAUSAL_VERBS", "DOMAIN_KEYWORDS")
 
         # 1) Tone
-        tone_flag = any(phrase.lower() in text_lower for phrase in self.config.get("HYPOTHESIS_TONE_PHRASES", []))
+        tone_flag = hits.found("HYPOTHESIS_TONE_PHRASES")
         if tone_flag:
             self.feedback.append(f"Hypothesis uses appropriate scientific tone (+{self.weights.get('tone', 0)})")
             self.score += self.weights.get("tone", 0)
@@ -36,7 +37,7 @@ class HypothesisValidator:
             self.feedback.append("Hypothesis tone may be too weak or informal (+0)")
 
         # 2) Relation/causality
-        relation_flag = any(token_lemma in self.config.get("CAUSAL_VERBS", []) for token_lemma in lemmas_lower)
+        relation_flag = hits.found("CAUSAL_VERBS")
         if relation_flag:
             self.feedback.append(f"Relationship between variables is stated (+{self.weights.get('relation', 0)})")
             self.score += self.weights.get("relation", 0)
@@ -47,8 +48,7 @@ class HypothesisValidator:
         domain_weight = self.weights.get("domain", 0)
 
         # a) Matches with DOMAIN_KEYWORDS from JSON
-        domain_keywords = [kw.lower() for kw in self.config.get("DOMAIN_KEYWORDS", [])]
-        hits_config = {lemma for lemma in lemmas_lower if lemma in domain_keywords}
+        hits_config = hits.terms("DOMAIN_KEYWORDS")
 
         # b) Matches with the domain lexicon, if one exists
         hits_lexicon = set()
@@ -58,6 +58,7 @@ class HypothesisValidator:
 
         # c) Both sources of evidence
         combined_hits = hits_config | hits_lexicon
+        self.domain_terms = combined_hits
         domain_flag = bool(combined_hits) and domain_weight > 0
 
         if domain_weight > 0:
@@ -72,11 +73,18 @@ class HypothesisValidator:
                 self.feedback.append("Hypothesis may lack scientific specificity (+0)")
 
         # 4) Bloom level
-        bloom_msg, bloom_factor = detect_bloom_level(self.doc, self.bloom_verbs, self.bloom_synonyms)
+        bloom_msg, bloom_factor = self.features.bloom_level()
         self.feedback.append(bloom_msg)
         self.score += self.weights.get("bloom", 0) * bloom_factor
         bloom_flag = bloom_factor > 0
 
+        self.signals = {
+            "tone": float(tone_flag),
+            "relation": float(relation_flag),
+            "domain": float(bool(combined_hits)),
+            "bloom": bloom_factor,
+        }
+
         # 5) Contextual hypothesis summary
         self.feedback.append("\n[Contextual Hypothesis Summary]")
 
@@ -115,4 +123,11 @@ class HypothesisValidator:
             )
 
         percentage = (self.score / total) * 100
-        return self.feedback, round(percentage, 1)
+        return SectionResult(
+            "HYPOTHESIS",
+            round(percentage, 1),
+            flags=self.signals,
+            feedback=self.feedback,
+            evidence=evidence_spans(self.evidence),
+            domain_terms=len(self.domain_terms),
+        )
@@ -1,35 +1,36 @@
 # impact_analysis.py - OOP version
 
-from bloom_detection import detect_bloom_level
+from results import SectionResult, evidence_spans
 
 class ImpactValidator:
-    def __init__(self, doc, bloom_verbs, bloom_synonyms, weights):
-        self.doc = doc
-        self.bloom_verbs = bloom_verbs
-        self.bloom_synonyms = bloom_synonyms
+    # Token attributes read from the spaCy Doc (see pipeline.py)
+    REQUIRES = frozenset({"lemma_", "pos_", "tag_"})
+
+    def __init__(self, features, weights):
+        self.features = features
         self.weights = weights
         self.feedback = []
+        self.evidence = []
+        self.signals = {}  # weight key -> detected factor (see rescoring.py)
         self.score = 0
 
     def validate(self):
         total = sum(self.weights.values())
 
-        text_lower = self.doc.text.lower()
+        hits = self.features.keyword_hits
+        self.evidence = hits.evidence("IMPACT_MODAL_PHRASES", "IMPACT_PROJECTION_PHRASES")
 
-        has_modal = any(modal in text_lower for modal in ["might", "could", "it is hoped", "we believe"])
-        has_projection = any(term in text_lower for term in [
-            "will contribute", "will enable", "will support", "is expected to",
-            "to facilitate", "to promote", "to advance", "to inform",
-            "supporting", "positioning", "informing", "aligning"
-        ])
+        has_modal = hits.found("IMPACT_MODAL_PHRASES")
+        has_projection = hits.found("IMPACT_PROJECTION_PHRASES")
 
-        if has_modal and not has_projection:
+        strong_tone = not (has_modal and not has_projection)
+        if not strong_tone:
             self.feedback.append("Indirect or weak modal expressions detected without strong projection (+0)")
         else:
             self.feedback.append(f"Uses direct or contextually strong scientific tone (+{self.weights['tone']})")
             self.score += self.weights["tone"]
 
-        has_future = any(tok.tag_ in ["MD", "VB"] and tok.text.lower() == "will" for tok in self.doc)
+        has_future = self.features.has_future
         self.feedback.append(
             f"Future-oriented verbs detected (+{self.weights['future']})"
             if has_future else
@@ -37,9 +38,21 @@ class ImpactValidator:
         )
         self.score += self.weights["future"] if has_future else 0
 
-        bloom_msg, bloom_factor = detect_bloom_level(self.doc, self.bloom_verbs, self.bloom_synonyms)
+        bloom_msg, bloom_factor = self.features.bloom_level()
         self.feedback.append(bloom_msg)
         self.score += self.weights["bloom"] * bloom_factor
 
+        self.signals = {
+            "tone": float(strong_tone),
+            "future": float(has_future),
+            "bloom": bloom_factor,
+        }
+
         percentage = (self.score / total) * 100
-        return self.feedback, round(percentage, 1)
+        return SectionResult(
+            "IMPACT",
+            round(percentage, 1),
+            flags=self.signals,
+            feedback=self.feedback,
+            evidence=evidence_spans(self.evidence),
+        )
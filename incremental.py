@@ -0,0 +1,196 @@
+# incremental.py - section-level re-validation for interactive editing
+
+import glob
+import hashlib
+import os
+import time
+
+from config import CONFIG_FILE, WEIGHT_FILE
+from loader import Loader
+from abstract_validator import AbstractValidator
+from section_features import extract_features
+from domain_index import is_multi_tag
+from registry import REGISTRY
+
+# (weight section, section Doc it reads, AbstractValidator method)
+VALIDATORS = (
+    ("BACKGROUND",  "background",  "validate_background"),
+    ("HYPOTHESIS",  "hypothesis",  "validate_hypothesis"),
+    ("METHODOLOGY", "methodology", "validate_methodology"),
+    ("OUTCOMES",    "outcomes",    "validate_outcomes"),
+    ("IMPACT",      "impact",      "validate_impact"),
+    ("ETHICS",      "impact",      "validate_ethics"),  # Ethics scans the impact section
+)
+
+
+def section_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IncrementalValidator:
+    """
+    Keeps the evaluation state of one abstract (section hashes, Docs, features
+    and SectionResults) between edits. update() re-parses and re-validates
+    only the sections whose text changed, then recomputes the dependent
+    outputs: Ethics when the impact section changes, the domain choice in
+    multi-domain mode, and the summary.
+
+    A change of config_keywords.json / config_weights.json / lexicon (picked up
+    through the registry) re-validates every section from the kept Docs.
+    """
+
+    def __init__(self, config_file=CONFIG_FILE, weight_file=WEIGHT_FILE,
+                 domain_tag: str | None = None,
+                 lexicon_dir: str = "lexicon",
+                 nlp=None,
+                 doc_cache=None):
+        self.config_file = config_file
+        self.weight_file = weight_file
+        self.domain_tag = domain_tag
+        self.lexicon_dir = lexicon_dir
+        self.doc_cache = doc_cache
+        self.nlp = nlp if nlp is not None else REGISTRY.get_pipeline(
+            AbstractValidator.requirements(), lazy=doc_cache is not None
+        )
+        self.loader = Loader(None, config_file, weight_file, lexicon_dir=lexicon_dir, domain_tag=domain_tag)
+        self.validator = AbstractValidator(
+            None, config_file, weight_file, None,
+            domain_tag=domain_tag,
+            lexicon_dir=lexicon_dir,
+            nlp=self.nlp,
+        )
+        self.hashes = {}          # section -> sha256 of its text
+        self.docs = {}            # section -> Doc
+        self.features = {}        # section -> SectionFeatures
+        self.section_results = {} # weight section -> SectionResult
+        self.resources = ()       # registry objects used by the last update()
+        self.last_changed = set() # sections re-parsed by the last update()
+
+    def load_resources(self):
+        """
+        Resources from the registry; True if any of them changed since the last update.
+        """
+        config = REGISTRY.get_config(self.config_file)
+        weights = REGISTRY.get_weights(self.weight_file)
+        matcher = REGISTRY.get_matcher(self.config_file)
+        bloom_index = REGISTRY.get_bloom_index(self.config_file)
+        lexicon = None if is_multi_tag(self.domain_tag) else REGISTRY.get_lexicon(self.lexicon_dir, self.domain_tag)
+        self.validator.set_resources(config, weights, lexicon, matcher, bloom_index)
+
+        resources = (config, weights, matcher, bloom_index, lexicon)
+        changed = len(resources) != len(self.resources) or any(
+            new is not old for new, old in zip(resources, self.resources)
+        )
+        self.resources = resources
+        return changed
+
+    def parse(self, names, texts):
+        if self.doc_cache is not None:
+            docs = self.doc_cache.pipe(self.nlp, texts)
+        else:
+            docs = self.nlp.pipe(texts)
+        for name, doc in zip(names, docs):
+            self.docs[name] = doc
+
+    def update(self, text, abstract_id=None):
+        """
+        Evaluate a new version of the abstract (raw text in the '# section' format).
+        Returns the AbstractResult; self.validator.results holds the text report.
+        """
+        validator = self.validator
+        resources_changed = self.load_resources()
+
+        *sections, keywords = self.loader.split_sections(text)
+        validator.set_sections(sections, keywords)
+        hashes = {name: section_hash(section) for name, section in zip(AbstractValidator.SECTION_NAMES, sections)}
+        changed = {name for name, digest in hashes.items() if self.hashes.get(name) != digest}
+
+        if changed:
+            names = [name for name in AbstractValidator.SECTION_NAMES if name in changed]
+            self.parse(names, [sections[AbstractValidator.SECTION_NAMES.index(name)] for name in names])
+        self.hashes = hashes
+        self.last_changed = changed
+
+        # Features depend on the matcher / Bloom index too
+        stale = AbstractValidator.SECTION_NAMES if resources_changed else changed
+        for name in stale:
+            self.features[name] = extract_features(self.docs[name], validator.matcher, validator.bloom_index)
+        validator.features = self.features
+        validator.set_docs([self.docs[name] for name in AbstractValidator.SECTION_NAMES])
+
+        rescore = set(stale)
+        if is_multi_tag(self.domain_tag) and rescore & {"background", "hypothesis"}:
+            validator.select_domain()
+            rescore |= {"background", "hypothesis"}  # the chosen lexicon may differ
+
+        for weight_section, name, method in VALIDATORS:
+            if name in rescore or weight_section not in self.section_results:
+                validator.section_results = []
+                getattr(validator, method)()
+                self.section_results[weight_section] = validator.section_results[0]
+
+        validator.section_results = []
+        for weight_section, _, _ in VALIDATORS:
+            validator.record(self.section_results[weight_section])
+
+        # The summary reads every section Doc and the keywords
+        validator.summarize_abstract()
+        return validator.build_result(abstract_id)
+
+
+def revalidate(state, text, abstract_id=None):
+    """
+    Functional form of IncrementalValidator.update(): state is the
+    IncrementalValidator returned by a previous call (or None for a first run).
+    Returns (state, AbstractResult).
+    """
+    if state is None:
+        state = IncrementalValidator()
+    return state, state.update(text, abstract_id)
+
+
+def watch(paths, output_for, interval=0.5, domain_tag=None, doc_cache=None, once=False):
+    """
+    Poll the given files (or every matching file of a directory glob) and re-validate
+    each one incrementally whenever its mtime changes.
+
+    paths      : callable returning the current list of files to watch
+    output_for : callable input_file -> report path
+    """
+    states = {}
+    mtimes = {}
+    nlp = REGISTRY.get_pipeline(AbstractValidator.requirements())
+    print(f"Watching for changes every {interval} s (Ctrl+C to stop)")
+    try:
+        while True:
+            for path in paths():
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                if mtimes.get(path) == mtime:
+                    continue
+                mtimes[path] = mtime
+
+                start = time.perf_counter()
+                state = states.get(path)
+                if state is None:
+                    state = states[path] = IncrementalValidator(domain_tag=domain_tag, nlp=nlp, doc_cache=doc_cache)
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                state.update(text, abstract_id=path)
+                state.validator.output_file = output_for(path)
+                state.validator.save_results()
+
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                changed = ", ".join(sorted(state.last_changed)) or "none"
+                print(f"[watch] {path}: re-parsed sections: {changed} ({elapsed_ms:.0f} ms)")
+            if once:
+                return states
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return states
+
+
+def directory_files(input_dir, pattern="*.txt"):
+    return lambda: sorted(glob.glob(os.path.join(input_dir, pattern)))
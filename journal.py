@@ -0,0 +1,150 @@
+# journal.py - append-only progress journal of a batch run (--resume)
+#
+# One JSON line per finished abstract, appended only after its report has been
+# moved into place:
+#     {"id": ..., "content": ..., "settings": ..., "report": ..., "result": {...}}
+# content is dedup.content_key() of the abstract and settings the
+# settings_signature() of the run. A killed process can at most leave a torn
+# last line, which is dropped when the journal is opened again.
+#
+# With 'abstract_validator.py --resume' an abstract is skipped when its latest
+# entry has the same content and settings and its report is still on disk, so
+# re-running a failed job only costs the unfinished remainder.
+
+import json
+import os
+
+from results import AbstractResult, atomic_path
+
+DEFAULT_NAME = "batch_journal.jsonl"   # inside the batch --output-dir
+SYNC_EVERY = 64                        # lines between fsyncs
+
+
+class Journal:
+    """
+    path     : JSONL journal file, created if missing
+    settings : settings_signature() of the run; entries written under other
+               settings never count as finished
+
+    Only (content, settings, report, line offset) is kept in memory per id;
+    a stored result is read back from the file when it is needed.
+    """
+
+    def __init__(self, path, settings=""):
+        self.path = path
+        self.settings = settings
+        self.entries = {}   # id -> (content, settings, report, offset of its latest line)
+        self.unsynced = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lines = self.load()
+        if lines > 2 * len(self.entries) and lines > SYNC_EVERY:
+            self.compact()
+        self.file = open(path, "ab")
+        self.reader = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self):
+        """
+        Read every entry (the latest line of an id wins) and cut a torn last line.
+        Returns the number of lines read.
+        """
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return 0
+        lines = 0
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write of a killed run
+                try:
+                    entry = json.loads(line)
+                    self.entries[entry["id"]] = (entry["content"], entry["settings"], entry.get("report"), offset)
+                except (ValueError, KeyError, TypeError):
+                    print(f"[WARN] Skipping an unreadable line of the journal {self.path}")
+                lines += 1
+                offset += len(line)
+        if offset < os.path.getsize(self.path):
+            print(f"[WARN] Dropping an incomplete last entry of the journal {self.path}")
+            os.truncate(self.path, offset)
+        return lines
+
+    def compact(self):
+        """
+        Rewrite the journal with only the latest line of each id.
+        """
+        with open(self.path, "rb") as src, atomic_path(self.path) as tmp_path:
+            with open(tmp_path, "wb") as dst:
+                for *_, offset in sorted(self.entries.values(), key=lambda entry: entry[-1]):
+                    src.seek(offset)
+                    dst.write(src.readline())
+        self.load()
+
+    def finished(self, abstract_id, content):
+        """
+        True if abstract_id was completed with this content under the current
+        settings and its report still exists.
+        """
+        entry = self.entries.get(str(abstract_id))
+        if entry is None:
+            return False
+        finished_content, settings, report, _ = entry
+        if finished_content != content or settings != self.settings:
+            return False
+        return not report or (os.path.exists(report) and os.path.getsize(report) > 0)
+
+    def result(self, abstract_id):
+        """
+        Stored AbstractResult of abstract_id (its latest entry).
+        """
+        if self.reader is None:
+            self.reader = open(self.path, "rb")
+        self.reader.seek(self.entries[str(abstract_id)][-1])
+        return AbstractResult.from_dict(json.loads(self.reader.readline())["result"])
+
+    def record(self, abstract_id, content, report, result):
+        """
+        Append the entry of a finished abstract; call it once its report is in place.
+        """
+        abstract_id = str(abstract_id)
+        entry = {
+            "id": abstract_id,
+            "content": content,
+            "settings": self.settings,
+            "report": report,
+            "result": result.to_dict(),
+        }
+        offset = self.file.tell()
+        self.file.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+        # Flushed line by line: a killed process keeps every entry written so far
+        self.file.flush()
+        self.entries[abstract_id] = (content, self.settings, report, offset)
+        self.unsynced += 1
+        if self.unsynced >= SYNC_EVERY:
+            self.sync()
+
+    def sync(self):
+        """
+        fsync the journal so the entries also survive a machine crash.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.sync()
+        self.file.close()
+        if self.reader is not None:
+            self.reader.close()
@@ -0,0 +1,176 @@
+# keyword_matcher.py - compiled keyword / phrase matching for config_keywords.json
+
+from collections import deque
+
+# Lists matched against single-token lemmas (lowercased), e.g. "risk" matches "risks"
+LEMMA_CATEGORIES = (
+    "PROBLEM_KEYWORDS",
+    "JUSTIFICATION_KEYWORDS",
+    "CAUSAL_VERBS",
+    "DOMAIN_KEYWORDS",
+)
+
+# Lists matched as substrings of the lowercased section text
+TEXT_CATEGORIES = (
+    "CONCEPT_KEYWORDS",
+    "KNOWLEDGE_GAP_PHRASES",
+    "HYPOTHESIS_TONE_PHRASES",
+    "OUTCOMES_TONE_PHRASES",
+    "IMPACT_MODAL_PHRASES",
+    "IMPACT_PROJECTION_PHRASES",
+    "ETHICS_KEYWORDS",
+)
+
+# Phrases that used to be hard-coded in the Outcomes / Impact validators; a
+# config_keywords.json that predates these lists gets them as before
+DEFAULT_PHRASES = {
+    "OUTCOMES_TONE_PHRASES": ["is expected to", "aims to", "is anticipated to"],
+    "IMPACT_MODAL_PHRASES": ["might", "could", "it is hoped", "we believe"],
+    "IMPACT_PROJECTION_PHRASES": [
+        "will contribute", "will enable", "will support", "is expected to",
+        "to facilitate", "to promote", "to advance", "to inform",
+        "supporting", "positioning", "informing", "aligning"
+    ],
+}
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over lowercase strings.
+    Finds every occurrence of every pattern in one left-to-right pass,
+    so the cost depends on the text length and not on the number of patterns.
+    """
+
+    def __init__(self, patterns):
+        """
+        patterns : iterable of (pattern, payload) pairs
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]  # node -> list of (pattern length, payload)
+
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append((len(pattern), payload))
+
+        # Breadth-first construction of failure links (children of the root fail to the root)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, text):
+        """
+        Yields (start, end, payload) for every (possibly overlapping) occurrence.
+        """
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, payload in out[node]:
+                yield i + 1 - length, i + 1, payload
+
+
+class KeywordHits:
+    """
+    Matches of one Doc, grouped by config category.
+    spans[category] -> list of (start_char, end_char, term)
+    """
+
+    def __init__(self):
+        self.spans = {}
+
+    def add(self, category, start, end, term):
+        self.spans.setdefault(category, []).append((start, end, term))
+
+    def found(self, category):
+        return bool(self.spans.get(category))
+
+    def terms(self, category):
+        return {term for _, _, term in self.spans.get(category, [])}
+
+    def evidence(self, *categories):
+        """
+        Flat list of (category, term, start_char, end_char) for the given categories.
+        """
+        return [
+            (category, term, start, end)
+            for category in categories
+            for start, end, term in self.spans.get(category, [])
+        ]
+
+
+class KeywordMatcher:
+    """
+    Compiles every keyword list of config_keywords.json once:
+    - LEMMA_CATEGORIES into a lemma -> categories hash table
+    - TEXT_CATEGORIES into a single Aho-Corasick automaton
+    match() then finds all categories in one pass over the Doc.
+    """
+
+    def __init__(self, config):
+        """
+        config : dict from config_keywords.json (only the known list categories are used;
+                 a missing DEFAULT_PHRASES category falls back to its built-in phrases)
+        """
+        self.lemma_table = {}
+        for category in LEMMA_CATEGORIES:
+            for term in config.get(category, []):
+                term = term.lower()
+                categories = self.lemma_table.setdefault(term, [])
+                if category not in categories:
+                    categories.append(category)
+
+        phrases = {}
+        for category in TEXT_CATEGORIES:
+            for phrase in config.get(category, DEFAULT_PHRASES.get(category, [])):
+                phrase = phrase.lower()
+                categories = phrases.setdefault(phrase, [])
+                if category not in categories:
+                    categories.append(category)
+        self.automaton = AhoCorasick(phrases.items())
+
+    def match(self, doc):
+        return self.match_tokens(
+            doc.text,
+            ((token.lemma_.lower(), token.idx, token.idx + len(token.text)) for token in doc)
+        )
+
+    def match_tokens(self, text, tokens):
+        """
+        text   : section text
+        tokens : iterable of (lowercased lemma, start_char, end_char)
+        """
+        hits = KeywordHits()
+
+        if self.lemma_table:
+            for lemma, start, end in tokens:
+                categories = self.lemma_table.get(lemma)
+                if categories:
+                    for category in categories:
+                        hits.add(category, start, end, lemma)
+
+        text_lower = text.lower()
+        for start, end, categories in self.automaton.finditer(text_lower):
+            for category in categories:
+                hits.add(category, start, end, text_lower[start:end])
+        return hits
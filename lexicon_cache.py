@@ -0,0 +1,202 @@
+# lexicon_cache.py - compiled binary lexicon artifacts (no pandas)
+
+import csv
+import hashlib
+import os
+import struct
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"SPAALEX\0"
+FORMAT_VERSION = 1
+ARTIFACT_SUFFIX = ".bin"
+
+# magic, format version, source mtime_ns, source size, source sha256, n_words, pos table size, blob size
+HEADER = struct.Struct("<8sIqQ32sIII")
+
+EXPECTED_COLUMNS = {"word", "pos", "frequency"}
+
+
+class CompiledLexicon:
+    """
+    Lexicon stored column-wise: words sorted alphabetically, with one POS code
+    and one frequency per word (a word listed under several POS appears once per POS).
+    """
+
+    def __init__(self, words, pos_codes, frequencies, pos_labels):
+        self.words = words              # list[str], sorted
+        self.pos_codes = pos_codes      # array('B'), index into pos_labels
+        self.frequencies = frequencies  # array('q')
+        self.pos_labels = pos_labels    # list[str]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        rows : iterable of (word, pos, frequency)
+        """
+        rows = sorted(rows)
+        pos_labels = sorted({pos for _, pos, _ in rows})
+        pos_index = {pos: i for i, pos in enumerate(pos_labels)}
+        return cls(
+            [word for word, _, _ in rows],
+            array("B", (pos_index[pos] for _, pos, _ in rows)),
+            array("q", (freq for _, _, freq in rows)),
+            pos_labels,
+        )
+
+    def as_sets(self):
+        """
+        Same structure Loader.load_domain_lexicon has always returned.
+        """
+        buckets = {label: set() for label in self.pos_labels}
+        for word, code in zip(self.words, self.pos_codes):
+            buckets[self.pos_labels[code]].add(word)
+        return {
+            "NOUN": buckets.get("NOUN", set()),
+            "VERB": buckets.get("VERB", set()),
+            "ADJ":  buckets.get("ADJ", set()),
+            "ALL":  set(self.words),
+        }
+
+    def frequency(self, word):
+        """
+        Total frequency of word over all its POS entries (binary search on the sorted words).
+        """
+        i = bisect_left(self.words, word)
+        total = 0
+        while i < len(self.words) and self.words[i] == word:
+            total += self.frequencies[i]
+            i += 1
+        return total
+
+
+def artifact_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ARTIFACT_SUFFIX
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def read_lexicon_csv(csv_path):
+    """
+    Pandas-free CSV reader. Returns a list of (word, pos, frequency) or None
+    if the file does not have the expected columns.
+    """
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if not EXPECTED_COLUMNS.issubset(reader.fieldnames or []):
+            print(f"[WARN] Invalid lexicon schema in {csv_path}. Expected columns: {EXPECTED_COLUMNS}")
+            return None
+
+        rows = []
+        for row in reader:
+            word = (row["word"] or "").strip().lower()
+            if not word:
+                continue
+            try:
+                frequency = int(float(row["frequency"]))
+            except (TypeError, ValueError):
+                frequency = 0
+            rows.append((word, (row["pos"] or "").strip(), frequency))
+    return rows
+
+
+def write_artifact(lexicon, path, source_stat, source_digest):
+    pos_table = "\n".join(lexicon.pos_labels).encode("utf-8")
+    blob = "\n".join(lexicon.words).encode("utf-8")
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION,
+        source_stat.st_mtime_ns, source_stat.st_size, source_digest,
+        len(lexicon.words), len(pos_table), len(blob),
+    )
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(pos_table)
+        f.write(lexicon.pos_codes.tobytes())
+        f.write(lexicon.frequencies.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def read_artifact_header(path):
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+    if len(data) != HEADER.size:
+        return None
+    fields = HEADER.unpack(data)
+    if fields[0] != MAGIC or fields[1] != FORMAT_VERSION:
+        return None
+    return fields
+
+
+def read_artifact(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    _, _, _, _, _, n_words, pos_size, blob_size = HEADER.unpack_from(data)
+
+    offset = HEADER.size
+    pos_table = data[offset:offset + pos_size].decode("utf-8")
+    offset += pos_size
+    pos_codes = array("B")
+    pos_codes.frombytes(data[offset:offset + n_words])
+    offset += n_words
+    frequencies = array("q")
+    frequencies.frombytes(data[offset:offset + 8 * n_words])
+    offset += 8 * n_words
+    blob = data[offset:offset + blob_size].decode("utf-8")
+
+    words = blob.split("\n") if n_words else []
+    pos_labels = pos_table.split("\n") if pos_size else []
+    return CompiledLexicon(words, pos_codes, frequencies, pos_labels)
+
+
+def is_fresh(header, source_stat, csv_path, verify_hash=False):
+    if header is None:
+        return False
+    _, _, mtime_ns, size, digest, _, _, _ = header
+    if mtime_ns != source_stat.st_mtime_ns or size != source_stat.st_size:
+        return False
+    return not verify_hash or digest == file_sha256(csv_path)
+
+
+def compile_lexicon(csv_path, path=None):
+    """
+    Compile csv_path into its binary artifact. Returns the CompiledLexicon or None.
+    """
+    rows = read_lexicon_csv(csv_path)
+    if rows is None:
+        return None
+    lexicon = CompiledLexicon.from_rows(rows)
+    try:
+        write_artifact(lexicon, path or artifact_path(csv_path), os.stat(csv_path), file_sha256(csv_path))
+    except OSError as exc:
+        # Read-only lexicon directory: keep working from the CSV
+        print(f"[WARN] Could not write compiled lexicon for {csv_path}: {exc}")
+    return lexicon
+
+
+def load_lexicon(csv_path, verify_hash=False):
+    """
+    Load the compiled artifact of csv_path, (re)building it when the CSV's
+    mtime, size or (with verify_hash) content hash no longer match.
+    Returns a CompiledLexicon, or None if the CSV is invalid.
+    """
+    path = artifact_path(csv_path)
+    source_stat = os.stat(csv_path)
+    try:
+        header = read_artifact_header(path)
+    except OSError:
+        header = None
+
+    if is_fresh(header, source_stat, csv_path, verify_hash):
+        try:
+            return read_artifact(path)
+        except (OSError, struct.error, UnicodeDecodeError):
+            pass  # corrupted artifact: rebuild below
+    return compile_lexicon(csv_path, path)
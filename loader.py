@@ -2,7 +2,9 @@
 
 import json
 import os
-import pandas as pd
+
+from corpus_reader import split_sections
+from lexicon_cache import load_lexicon
 
 class Loader:
     def __init__(self,
@@ -41,23 +43,9 @@ class Loader:
             return json.load(f)
 
     def split_sections(self, text):
-        sections = text.split("#")[1:]  # Skip anything before the first #
-        sections = [s.strip() for s in sections]
-        background, hypothesis, methodology, outcomes, impact, keywords = [""] * 6
-        for sec in sections:
-            if sec.lower().startswith("background"):
-                background = sec[len("background"):].strip()
-            elif sec.lower().startswith("hypothesis"):
-                hypothesis = sec[len("hypothesis"):].strip()
-            elif sec.lower().startswith("methodology"):
-                methodology = sec[len("methodology"):].strip()
-            elif sec.lower().startswith("outcomes"):
-                outcomes = sec[len("outcomes"):].strip()
-            elif sec.lower().startswith("impact"):
-                impact = sec[len("impact"):].strip()
-            elif sec.lower().startswith("keywords"):
-                keywords = [kw.strip() for kw in sec[len("keywords"):].strip().split(",") if kw.strip()]
-        return background, hypothesis, methodology, outcomes, impact, keywords
+        # Headers are whole '# section' lines (see corpus_reader.HEADER_RE); a '#'
+        # inside the prose ("the #1 risk factor") no longer starts a new section
+        return split_sections(text)
 
     # ----------------------------
     # Domain lexicon support
@@ -66,6 +54,7 @@ class Loader:
         """
         Load a curated lexicon for a given domain/tag from:
             lexicon/<tag>/lexicon_<tag>.csv
+        through its compiled artifact lexicon/<tag>/lexicon_<tag>.bin (see lexicon_cache.py).
 
         Returns:
             dict with sets of words per POS:
@@ -88,23 +77,11 @@ class Loader:
             print(f"[WARN] Domain lexicon not found for tag '{tag}': {csv_path}")
             return None
 
-        df = pd.read_csv(csv_path)
-
-        expected_cols = {"word", "pos", "frequency"}
-        if not expected_cols.issubset(df.columns):
-            print(f"[WARN] Invalid lexicon schema in {csv_path}. Expected columns: {expected_cols}")
+        # Compiled binary artifact next to the CSV, rebuilt when the CSV changes
+        compiled = load_lexicon(csv_path)
+        if compiled is None:
             return None
-
-        # Normalize words to lowercase strings
-        df["word"] = df["word"].astype(str).str.lower()
-
-        lexicon = {
-            "NOUN": set(df.loc[df["pos"] == "NOUN", "word"]),
-            "VERB": set(df.loc[df["pos"] == "VERB", "word"]),
-            "ADJ":  set(df.loc[df["pos"] == "ADJ",  "word"]),
-            "ALL":  set(df["word"])
-        }
-        return lexicon
+        return compiled.as_sets()
 
     def load_all(self):
         """
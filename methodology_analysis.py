@@ -1,26 +1,24 @@
 # methodology_analysis.py - OOP version
 
-from bloom_detection import detect_bloom_level
+from results import SectionResult
 
 class MethodologyValidator:
-    def __init__(self, doc, bloom_verbs, bloom_synonyms, weights):
-        self.doc = doc
-        self.bloom_verbs = bloom_verbs
-        self.bloom_synonyms = bloom_synonyms
+    # Token attributes read from the spaCy Doc (see pipeline.py)
+    REQUIRES = frozenset({"lemma_", "pos_", "tag_", "dep_"})
+
+    def __init__(self, features, weights):
+        self.features = features
         self.weights = weights
         self.feedback = []
+        self.signals = {}  # weight key -> detected factor (see rescoring.py)
         self.score = 0
 
     def validate(self):
         total = sum(self.weights.values())
 
-        has_future = any(tok.tag_ in ["MD", "VB"] and tok.text.lower() == "will" for tok in self.doc)
-        techniques = [tok.text for tok in self.doc if tok.pos_ == "NOUN" and tok.dep_ in ("nsubj", "dobj")]
-        purpose_found = any(
-            tok.lemma_.lower() in self.bloom_verbs["MEDIUM"] + self.bloom_verbs["HIGH"] or
-            any(tok.lemma_.lower() in syns for syns in self.bloom_synonyms.values())
-            for tok in self.doc if tok.pos_ == "VERB"
-        )
+        has_future = self.features.has_future
+        techniques = self.features.techniques
+        purpose_found = self.features.has_purpose_verb
 
         self.feedback.append("Future tense used to indicate planned actions." if has_future else "No future-oriented verbs found.")
         self.score += self.weights["future"] if has_future else 0
@@ -31,9 +29,21 @@ class MethodologyValidator:
         self.feedback.append("Techniques are associated with analytical/evaluative purpose verbs." if purpose_found else "Techniques may lack clearly stated purpose.")
         self.score += self.weights["purpose"] if purpose_found else 0
 
-        bloom_msg, bloom_factor = detect_bloom_level(self.doc, self.bloom_verbs, self.bloom_synonyms)
+        bloom_msg, bloom_factor = self.features.bloom_level()
         self.feedback.append(bloom_msg)
         self.score += self.weights["bloom"] * bloom_factor
 
+        self.signals = {
+            "future": float(has_future),
+            "technique": float(bool(techniques)),
+            "purpose": float(purpose_found),
+            "bloom": bloom_factor,
+        }
+
         percentage = (self.score / total) * 100
-        return self.feedback, round(percentage, 1)
+        return SectionResult(
+            "METHODOLOGY",
+            round(percentage, 1),
+            flags=self.signals,
+            feedback=self.feedback,
+        )
@@ -1,25 +1,28 @@
 # outcomes_analysis.py - OOP version
 
-from bloom_detection import detect_bloom_level
+from results import SectionResult, evidence_spans
 
 class OutcomesValidator:
-    def __init__(self, doc, bloom_verbs, bloom_synonyms, weights):
-        self.doc = doc
-        self.bloom_verbs = bloom_verbs
-        self.bloom_synonyms = bloom_synonyms
+    # Token attributes read from the spaCy Doc (see pipeline.py)
+    REQUIRES = frozenset({"lemma_", "pos_", "tag_"})
+
+    def __init__(self, features, weights):
+        self.features = features
         self.weights = weights
         self.feedback = []
+        self.evidence = []
+        self.signals = {}  # weight key -> detected factor (see rescoring.py)
         self.score = 0
 
     def validate(self):
         total = sum(self.weights.values())
 
-        text_lower = self.doc.text.lower()
+        hits = self.features.keyword_hits
+        self.evidence = hits.evidence("OUTCOMES_TONE_PHRASES")
 
-        has_direct_tone = any(phrase in text_lower for phrase in [
-            "is expected to", "aims to", "is anticipated to"])
+        has_direct_tone = hits.found("OUTCOMES_TONE_PHRASES")
 
-        has_future = any(tok.tag_ in ["MD", "VB"] and tok.text.lower() == "will" for tok in self.doc)
+        has_future = self.features.has_future
 
         self.feedback.append(
             f"Uses direct and impersonal scientific tone (+{self.weights['tone']})"
@@ -35,9 +38,21 @@ class OutcomesValidator:
         )
         self.score += self.weights["future"] if has_future else 0
 
-        bloom_msg, bloom_factor = detect_bloom_level(self.doc, self.bloom_verbs, self.bloom_synonyms)
+        bloom_msg, bloom_factor = self.features.bloom_level()
         self.feedback.append(bloom_msg)
         self.score += self.weights["bloom"] * bloom_factor
 
+        self.signals = {
+            "tone": float(has_direct_tone),
+            "future": float(has_future),
+            "bloom": bloom_factor,
+        }
+
         percentage = (self.score / total) * 100
-        return self.feedback, round(percentage, 1)
+        return SectionResult(
+            "OUTCOMES",
+            round(percentage, 1),
+            flags=self.signals,
+            feedback=self.feedback,
+            evidence=evidence_spans(self.evidence),
+        )
@@ -0,0 +1,174 @@
+# pipeline.py - requirement-driven spaCy pipeline loading
+#
+# spaCy is only imported when a pipeline is actually loaded, so the CLI can
+# start (--help, --server forwarding) without paying its import time.
+
+MODEL_NAME = "en_core_web_sm"
+
+# Components of en_core_web_sm that must run to fill each token attribute
+ATTRIBUTE_COMPONENTS = {
+    "tag_":   {"tok2vec", "tagger"},
+    "pos_":   {"tok2vec", "tagger", "attribute_ruler"},
+    "lemma_": {"tok2vec", "tagger", "attribute_ruler", "lemmatizer"},
+    "dep_":   {"tok2vec", "parser"},
+    "sents":  set(),  # parser if already required, otherwise the lighter senter
+}
+
+# Every component shipped with en_core_web_sm (senter is disabled by default)
+MODEL_COMPONENTS = ("tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner")
+
+
+def collect_requirements(*consumers):
+    """
+    Union of the REQUIRES attribute declared by validators / summarizers.
+    """
+    requirements = set()
+    for consumer in consumers:
+        requirements |= set(getattr(consumer, "REQUIRES", ()))
+    return requirements
+
+
+def required_components(requirements):
+    """
+    Returns the set of en_core_web_sm components needed for the given token attributes.
+    """
+    unknown = set(requirements) - set(ATTRIBUTE_COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown token requirements: {sorted(unknown)}")
+
+    components = set()
+    for attr in requirements:
+        components |= ATTRIBUTE_COMPONENTS[attr]
+
+    # Sentence boundaries come for free with the parser; otherwise use senter
+    if "sents" in requirements and "parser" not in components:
+        components.add("senter")
+    return components
+
+
+def load_pipeline(requirements, model_name=MODEL_NAME):
+    """
+    Loads model_name with only the components the requirements need.
+    Components that are not needed are excluded (never loaded into memory).
+    """
+    import spacy
+
+    components = required_components(requirements)
+    exclude = [name for name in MODEL_COMPONENTS if name not in components]
+    nlp = spacy.load(model_name, exclude=exclude)
+    if "senter" in components and "senter" in nlp.disabled:
+        nlp.enable_pipe("senter")
+    return nlp
+
+
+def load_lexical_pipeline(model_name=MODEL_NAME):
+    """
+    Tokenizer of model_name (same tokens as the full pipeline) plus spaCy's lookup
+    lemmatizer, for scoring that only needs tokens and lemmas (triage.py).
+    The lookup table comes from spacy-lookups-data; without it the pipeline is
+    the bare tokenizer and token.lemma_ stays empty.
+    """
+    import spacy
+
+    nlp = spacy.load(model_name, exclude=list(MODEL_COMPONENTS))
+    lemmatizer = nlp.add_pipe("lemmatizer", name="lookup_lemmatizer", config={"mode": "lookup"})
+    try:
+        lemmatizer.initialize()
+    except (ValueError, ImportError) as exc:
+        nlp.remove_pipe("lookup_lemmatizer")
+        print(f"[WARN] Lookup lemmatizer unavailable ({exc.__class__.__name__}); "
+              "lexical tier uses lowercased tokens as lemmas (pip install spacy-lookups-data)")
+    return nlp
+
+
+def model_meta(model_name=MODEL_NAME):
+    """
+    meta.json of model_name (installed package or model directory), read without
+    importing spaCy or loading the model; None if it cannot be found.
+    """
+    import importlib.util
+    import json
+    import os
+
+    if os.path.isdir(model_name):
+        path = os.path.join(model_name, "meta.json")
+    else:
+        try:
+            spec = importlib.util.find_spec(model_name)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is None or not spec.submodule_search_locations:
+            return None
+        path = os.path.join(list(spec.submodule_search_locations)[0], "meta.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class LazyPipeline:
+    """
+    Stands in for load_pipeline(requirements, model_name) until the pipeline is
+    actually used, so runs served from the DocCache never load the model:
+    - meta and pipe_names come from the model's meta.json;
+    - vocab is a vocabulary of the model's language (lexical attributes such as
+      is_stop or is_alpha, no weights) until the pipeline is loaded; a DocBin
+      carries its own strings, so cached Docs decode with it;
+    - any other attribute, nlp(text) and nlp.pipe(...) load the pipeline first.
+    """
+
+    def __init__(self, requirements, model_name=MODEL_NAME, load=None):
+        """
+        load : zero-argument callable returning the pipeline (default: load_pipeline)
+        """
+        self.requirements = frozenset(requirements)
+        self.model_name = model_name
+        self._load = load if load is not None else lambda: load_pipeline(requirements, model_name)
+        self._nlp = None
+        self._meta = model_meta(model_name)
+        self._vocab = None
+
+    @property
+    def loaded(self):
+        return self._nlp is not None
+
+    def load(self):
+        if self._nlp is None:
+            self._nlp = self._load()
+        return self._nlp
+
+    @property
+    def meta(self):
+        return self._meta if self._nlp is None and self._meta is not None else self.load().meta
+
+    @property
+    def pipe_names(self):
+        if self._nlp is not None or self._meta is None:
+            return self.load().pipe_names
+        # Same components, in the same order, as load_pipeline() leaves enabled
+        components = required_components(self.requirements)
+        return [name for name in self._meta.get("components", ()) if name in components]
+
+    @property
+    def vocab(self):
+        if self._nlp is not None or self._meta is None:
+            return self.load().vocab
+        if self._vocab is None:
+            from spacy.util import get_lang_class
+            from spacy.vocab import create_vocab
+
+            lang = self._meta.get("lang", "en")
+            self._vocab = create_vocab(lang, get_lang_class(lang).Defaults)
+        return self._vocab
+
+    def __call__(self, text, **kwargs):
+        return self.load()(text, **kwargs)
+
+    def pipe(self, texts, **kwargs):
+        return self.load().pipe(texts, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
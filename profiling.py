@@ -0,0 +1,353 @@
+# profiling.py - per-stage / per-component timings, Chrome trace and summary table
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from pipeline import LazyPipeline
+
+# Profiler used by stage() / scope() / count(); None means profiling is off (no overhead
+# beyond one global lookup per stage)
+ACTIVE = None
+
+MAX_TRACE_EVENTS = 200_000
+
+
+def percentile(values, q):
+    """
+    Linear-interpolated percentile (q in 0-100) of a list of numbers.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class TimedComponent:
+    """
+    Wraps one spaCy pipe component and records the time spent inside it.
+    In nlp.pipe the components are chained generators, so the time spent
+    pulling Docs from the upstream component is subtracted.
+    """
+
+    def __init__(self, name, proc, profiler):
+        self.name = name
+        self.proc = proc
+        self.profiler = profiler
+
+    def __getattr__(self, attr):
+        return getattr(self.proc, attr)
+
+    def __call__(self, doc, **kwargs):
+        start = time.perf_counter()
+        doc = self.proc(doc, **kwargs)
+        self.profiler.record_component(self.name, start, time.perf_counter() - start, 1)
+        return doc
+
+    def pipe(self, docs, **kwargs):
+        upstream = [0.0]
+
+        def feed():
+            iterator = iter(docs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    doc = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    upstream[0] += time.perf_counter() - start
+                yield doc
+
+        if hasattr(self.proc, "pipe"):
+            inner = self.proc.pipe(feed(), **kwargs)
+        else:
+            kwargs = {key: value for key, value in kwargs.items() if key != "batch_size"}
+            inner = (self.proc(doc, **kwargs) for doc in feed())
+
+        while True:
+            upstream[0] = 0.0
+            start = time.perf_counter()
+            try:
+                doc = next(inner)
+            except StopIteration:
+                return
+            self.profiler.record_component(self.name, start, time.perf_counter() - start - upstream[0], 1)
+            yield doc
+
+
+class Profiler:
+    """
+    Collects wall time and call counts per stage (load_resources, parse,
+    validate_*, summarize_abstract, save_results, ...) and per spaCy component,
+    plus token / sentence counters.
+
+    - stages can be grouped per abstract (abstract()), giving percentiles across a batch
+    - hooks are called with every finished stage event (dict), e.g. to feed a metrics system
+    - write_trace() produces a Chrome trace (chrome://tracing, Perfetto)
+    """
+
+    def __init__(self, hooks=None, max_events=MAX_TRACE_EVENTS):
+        self.hooks = list(hooks or [])
+        self.max_events = max_events
+        self.origin = time.perf_counter()
+        self.events = []                       # Chrome trace events
+        self.stages = defaultdict(list)        # stage -> durations (s)
+        self.components = {}                   # component -> [total s, docs, calls]
+        self.counters = defaultdict(int)
+        self.per_abstract = []                 # [{stage: seconds}] one per abstract
+        self.local = threading.local()
+        self.wall_start = None
+        self.wall_end = None
+        self.instrumented = []                 # (nlp, original _components)
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    # ----------------------------
+    # Recording
+    # ----------------------------
+    def trace_event(self, name, category, start, duration, args=None):
+        if len(self.events) >= self.max_events:
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    @contextlib.contextmanager
+    def stage(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.stages[name].append(duration)
+            current = getattr(self.local, "abstract", None)
+            if current is not None:
+                current[name] = current.get(name, 0.0) + duration
+            self.trace_event(name, "stage", start, duration, args)
+            for hook in self.hooks:
+                hook({"name": name, "category": "stage", "seconds": duration, "args": args})
+
+    @contextlib.contextmanager
+    def abstract(self, abstract_id):
+        """
+        Group the stages run inside this block as one abstract (for batch percentiles).
+        """
+        self.local.abstract = {}
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.local.abstract
+            self.local.abstract = None
+            timings["abstract_total"] = time.perf_counter() - start
+            self.per_abstract.append(timings)
+            self.trace_event("abstract", "abstract", start, timings["abstract_total"], {"id": str(abstract_id)})
+
+    def record_component(self, name, start, duration, n_docs):
+        totals = self.components.setdefault(name, [0.0, 0, 0])
+        totals[0] += duration
+        totals[1] += n_docs
+        totals[2] += 1
+        self.trace_event(name, "spacy", start, duration)
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    # ----------------------------
+    # spaCy component instrumentation
+    # ----------------------------
+    def instrument(self, nlp):
+        """
+        Wrap every component of nlp with a TimedComponent (undone by restore()).
+        Timings are only collected in this process, i.e. with n_process=1.
+        A LazyPipeline (pipeline.py) is loaded first.
+        """
+        if isinstance(nlp, LazyPipeline):
+            nlp = nlp.load()
+        self.instrumented.append((nlp, list(nlp._components)))
+        nlp._components = [
+            (name, proc if isinstance(proc, TimedComponent) else TimedComponent(name, proc, self))
+            for name, proc in nlp._components
+        ]
+
+    def restore(self):
+        for nlp, components in reversed(self.instrumented):
+            nlp._components = components
+        self.instrumented = []
+
+    def start(self):
+        self.wall_start = time.perf_counter()
+
+    def stop(self):
+        self.wall_end = time.perf_counter()
+        self.restore()
+
+    # ----------------------------
+    # Reports
+    # ----------------------------
+    def wall_time(self):
+        end = self.wall_end if self.wall_end is not None else time.perf_counter()
+        start = self.wall_start if self.wall_start is not None else self.origin
+        return end - start
+
+    def summary(self):
+        """
+        dict with per-stage, per-component, per-abstract (percentiles) and counter data.
+        """
+        wall = self.wall_time()
+        stages = {
+            name: {
+                "calls": len(durations),
+                "total_ms": sum(durations) * 1000,
+                "mean_ms": sum(durations) / len(durations) * 1000,
+                "p50_ms": percentile(durations, 50) * 1000,
+                "p95_ms": percentile(durations, 95) * 1000,
+                "max_ms": max(durations) * 1000,
+                "share": sum(durations) / wall if wall > 0 else 0.0,
+            }
+            for name, durations in self.stages.items()
+        }
+        components = {
+            name: {
+                "calls": calls,
+                "docs": n_docs,
+                "total_ms": total * 1000,
+                "ms_per_doc": total / n_docs * 1000 if n_docs else 0.0,
+                "share": total / wall if wall > 0 else 0.0,
+            }
+            for name, (total, n_docs, calls) in self.components.items()
+        }
+        per_abstract = {}
+        if self.per_abstract:
+            names = sorted({name for timings in self.per_abstract for name in timings})
+            for name in names:
+                values = [timings.get(name, 0.0) * 1000 for timings in self.per_abstract]
+                per_abstract[name] = {
+                    "p50_ms": percentile(values, 50),
+                    "p90_ms": percentile(values, 90),
+                    "p99_ms": percentile(values, 99),
+                    "max_ms": max(values),
+                }
+        counters = dict(self.counters)
+        if counters.get("tokens") and wall > 0:
+            counters["tokens_per_s"] = round(counters["tokens"] / wall, 1)
+        return {
+            "wall_ms": wall * 1000,
+            "abstracts": len(self.per_abstract),
+            "stages": stages,
+            "components": components,
+            "per_abstract": per_abstract,
+            "counters": counters,
+        }
+
+    def format_summary(self):
+        data = self.summary()
+        lines = [f"[PROFILE] wall time {data['wall_ms']:.1f} ms, {data['abstracts']} abstract(s)"]
+
+        lines.append(f"{'stage':<24} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'% wall':>7}")
+        for name, row in sorted(data["stages"].items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(
+                f"{name:<24} {row['calls']:>7} {row['total_ms']:>10.2f} {row['mean_ms']:>9.3f} "
+                f"{row['p95_ms']:>9.3f} {row['max_ms']:>9.3f} {row['share'] * 100:>6.1f}%"
+            )
+
+        if data["components"]:
+            lines.append(f"\n{'spaCy component':<24} {'docs':>7} {'total ms':>10} {'ms/doc':>9} {'% wall':>7}")
+            for name, row in data["components"].items():
+                lines.append(
+                    f"{name:<24} {row['docs']:>7} {row['total_ms']:>10.2f} {row['ms_per_doc']:>9.3f} "
+                    f"{row['share'] * 100:>6.1f}%"
+                )
+
+        if data["per_abstract"] and data["abstracts"] > 1:
+            lines.append(f"\n{'per abstract':<24} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+            for name, row in data["per_abstract"].items():
+                lines.append(
+                    f"{name:<24} {row['p50_ms']:>9.3f} {row['p90_ms']:>9.3f} {row['p99_ms']:>9.3f} {row['max_ms']:>9.3f}"
+                )
+
+        if data["counters"]:
+            lines.append("\n" + ", ".join(f"{name}: {value}" for name, value in data["counters"].items()))
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """
+        Chrome trace format (JSON object with traceEvents) plus the summary under 'spaa'.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms", "spaa": self.summary()}, f)
+
+
+# ----------------------------
+# Module-level hooks used by the validators
+# ----------------------------
+def activate(profiler):
+    global ACTIVE
+    ACTIVE = profiler
+    profiler.start()
+    return profiler
+
+
+def deactivate():
+    global ACTIVE
+    profiler, ACTIVE = ACTIVE, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+@contextlib.contextmanager
+def profiling(profiler=None, nlp=None):
+    """
+    with profiling(nlp=nlp) as profiler: ...   (stages and, if nlp is given, its components)
+    """
+    profiler = activate(profiler or Profiler())
+    if nlp is not None:
+        profiler.instrument(nlp)
+    try:
+        yield profiler
+    finally:
+        deactivate()
+
+
+def stage(name, **args):
+    """
+    Context manager timing one stage when a profiler is active, no-op otherwise.
+    """
+    if ACTIVE is None:
+        return contextlib.nullcontext()
+    return ACTIVE.stage(name, **args)
+
+
+def scope(abstract_id):
+    """
+    Context manager grouping the stages of one abstract when a profiler is active.
+    """
+    if ACTIVE is None:
+        return contextlib.nullcontext()
+    return ACTIVE.abstract(abstract_id)
+
+
+def count(name, value=1):
+    if ACTIVE is not None:
+        ACTIVE.count(name, value)
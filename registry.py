@@ -0,0 +1,134 @@
+# registry.py - process-wide registry of loaded resources
+
+import os
+import threading
+
+from bloom_detection import BloomIndex
+from domain_index import DomainIndex, discover_tags, lexicon_csv_path
+from keyword_matcher import KeywordMatcher
+from loader import Loader
+from pipeline import MODEL_NAME, LazyPipeline, load_pipeline
+import profiling
+
+
+class ResourceRegistry:
+    """
+    Thread-safe cache of the expensive resources shared by every validator:
+    spaCy pipelines, config JSON files, compiled keyword matchers, Bloom indexes
+    and curated
+    domain lexicons.
+
+    - Pipelines are keyed by (model name, required token attributes).
+    - Config files are keyed by path, lexicons by (lexicon_dir, tag) and the
+      multi-domain index by lexicon_dir.
+    - File-backed entries are reloaded when the file's mtime changes.
+
+    Returned objects are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pipelines = {}
+        self._files = {}  # key -> (signature such as mtime_ns, value)
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _get_file(self, key, path, load):
+        return self._get_signed(key, self._mtime(path), load)
+
+    def _get_signed(self, key, signature, load):
+        """
+        Cached value for key, reloaded whenever signature (e.g. an mtime) changes.
+        """
+        with self._lock:
+            cached = self._files.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            value = load()
+            self._files[key] = (signature, value)
+            return value
+
+    def get_pipeline(self, requirements, model_name=MODEL_NAME, lazy=False):
+        """
+        spaCy pipeline with only the components needed for the requirements (see pipeline.py).
+        lazy: unless already loaded, return a LazyPipeline that loads it on first use
+              (runs served from the DocCache then never load the model)
+        """
+        key = (model_name, frozenset(requirements))
+        with self._lock:
+            nlp = self._pipelines.get(key)
+            if nlp is None and lazy:
+                return LazyPipeline(requirements, model_name, lambda: self.get_pipeline(requirements, model_name))
+            if nlp is None:
+                with profiling.stage("load_model", model=model_name):
+                    nlp = load_pipeline(requirements, model_name)
+                self._pipelines[key] = nlp
+            return nlp
+
+    def get_config(self, config_file):
+        """
+        Parsed JSON file (config_keywords.json or config_weights.json).
+        """
+        loader = Loader(None, config_file, None)
+        return self._get_file(("config", os.path.abspath(config_file)), config_file, loader.load_config)
+
+    def get_weights(self, weight_file):
+        return self.get_config(weight_file)
+
+    def get_matcher(self, config_file):
+        """
+        KeywordMatcher compiled from config_keywords.json (recompiled if the file changes).
+        """
+        return self._get_file(
+            ("matcher", os.path.abspath(config_file)),
+            config_file,
+            lambda: KeywordMatcher(self.get_config(config_file))
+        )
+
+    def get_bloom_index(self, config_file):
+        """
+        BloomIndex built from BLOOM_VERBS / BLOOM_SYNONYMS (rebuilt if the file changes).
+        """
+        def build():
+            config = self.get_config(config_file)
+            return BloomIndex(config["BLOOM_VERBS"], config["BLOOM_SYNONYMS"])
+
+        return self._get_file(("bloom", os.path.abspath(config_file)), config_file, build)
+
+    def get_lexicon(self, lexicon_dir, domain_tag):
+        """
+        Domain lexicon for domain_tag (see Loader.load_domain_lexicon), or None.
+        """
+        if domain_tag is None:
+            return None
+        loader = Loader(None, None, None, lexicon_dir=lexicon_dir, domain_tag=domain_tag)
+        tag_norm = domain_tag.lower()
+        csv_path = lexicon_csv_path(lexicon_dir, tag_norm)
+        key = ("lexicon", os.path.abspath(lexicon_dir), tag_norm)
+        return self._get_file(key, csv_path, loader.load_domain_lexicon)
+
+    def get_domain_index(self, lexicon_dir):
+        """
+        DomainIndex over every lexicon under lexicon_dir (rebuilt if a lexicon is added or changes).
+        """
+        tags = discover_tags(lexicon_dir)
+        signature = tuple((tag, self._mtime(lexicon_csv_path(lexicon_dir, tag))) for tag in tags)
+        return self._get_signed(
+            ("domain_index", os.path.abspath(lexicon_dir)),
+            signature,
+            lambda: DomainIndex(lexicon_dir, tags)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._pipelines.clear()
+            self._files.clear()
+
+
+# Shared by every AbstractValidator / BatchValidator in the process
+REGISTRY = ResourceRegistry()
@@ -0,0 +1,186 @@
+# rescoring.py - NLP-free re-scoring of stored validator signals
+
+import json
+
+import numpy as np
+
+from results import atomic_path
+
+
+def signal_columns(weights):
+    """
+    One 'SECTION.key' column per weight of config_weights.json, in config order.
+    """
+    return [f"{section}.{key}" for section, section_weights in weights.items() for key in section_weights]
+
+
+def signal_record(validator):
+    """
+    (id, signals, domain_hits) of an evaluated AbstractValidator; small enough
+    to keep for every abstract of a large batch once its Docs are released.
+    """
+    return validator.loader.input_file, validator.signals, validator.domain_hits
+
+
+def result_record(result):
+    """
+    (id, signals, domain_hits) of a stored AbstractResult, as signal_record()
+    returns for the validator that produced it.
+    """
+    signals = {section.section: section.flags for section in result.sections}
+    domain_hits = {
+        section.section: section.domain_terms
+        for section in result.sections if section.section in ("BACKGROUND", "HYPOTHESIS")
+    }
+    return result.id, signals, domain_hits
+
+
+class FeatureMatrix:
+    """
+    Signals detected by the validators for a corpus, one row per abstract:
+        values[i, j]      : factor found for columns[j] in ids[i]
+                            (0/1 for flags, the Bloom factor for 'bloom')
+        domain_hits[i, j] : number of domain terms found for domain_columns[j]
+
+    A section score is sum(weight * factor) / sum(weights) * 100, so any weight
+    configuration can be applied to the stored signals without parsing again.
+    """
+
+    def __init__(self, ids, columns, values, domain_columns=(), domain_hits=None):
+        self.ids = list(ids)
+        self.columns = list(columns)
+        self.values = np.asarray(values, dtype=np.float64).reshape(len(self.ids), len(self.columns))
+        self.domain_columns = list(domain_columns)
+        if domain_hits is None:
+            domain_hits = np.zeros((len(self.ids), len(self.domain_columns)), dtype=np.int64)
+        self.domain_hits = np.asarray(domain_hits, dtype=np.int64).reshape(len(self.ids), len(self.domain_columns))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_validators(cls, validators, weights):
+        """
+        validators : evaluated AbstractValidator instances (see AbstractValidator.record)
+        weights    : weight configuration that defines the columns
+        """
+        return cls.from_records((signal_record(validator) for validator in validators), weights)
+
+    @classmethod
+    def from_records(cls, records, weights):
+        """
+        records : iterable of (id, signals, domain_hits) as returned by signal_record()
+        """
+        columns = signal_columns(weights)
+        domain_columns = [section for section in weights if section in ("BACKGROUND", "HYPOTHESIS")]
+        ids, rows, hit_rows = [], [], []
+        for abstract_id, signals, domain_hits in records:
+            ids.append(abstract_id)
+            rows.append([
+                signals.get(section, {}).get(key, 0.0)
+                for section, key in (column.split(".", 1) for column in columns)
+            ])
+            hit_rows.append([domain_hits.get(section, 0) for section in domain_columns])
+        return cls(ids, columns, rows, domain_columns, hit_rows)
+
+    def sections(self):
+        """
+        Weight sections in column order.
+        """
+        seen = []
+        for column in self.columns:
+            section = column.split(".", 1)[0]
+            if section not in seen:
+                seen.append(section)
+        return seen
+
+    def section_columns(self, section):
+        return [j for j, column in enumerate(self.columns) if column.split(".", 1)[0] == section]
+
+    def save(self, path):
+        if not path.endswith(".npz"):
+            path += ".npz"  # as np.savez_compressed would name it
+        with atomic_path(path) as tmp_path:
+            np.savez_compressed(
+                tmp_path,
+                ids=np.array(self.ids, dtype=str),
+                columns=np.array(self.columns, dtype=str),
+                values=self.values,
+                domain_columns=np.array(self.domain_columns, dtype=str),
+                domain_hits=self.domain_hits,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["ids"].tolist(),
+                data["columns"].tolist(),
+                data["values"],
+                data["domain_columns"].tolist(),
+                data["domain_hits"],
+            )
+
+
+def weight_matrix(weight_configs, columns):
+    """
+    (n_configs, n_columns) array of weights. Every key of every configuration
+    must be a stored column, otherwise its signal is unknown.
+    """
+    positions = {column: j for j, column in enumerate(columns)}
+    matrix = np.zeros((len(weight_configs), len(columns)), dtype=np.float64)
+    for i, weights in enumerate(weight_configs):
+        for column in signal_columns(weights):
+            if column not in positions:
+                raise ValueError(f"No stored signal for weight '{column}'")
+            section, key = column.split(".", 1)
+            matrix[i, positions[column]] = weights[section][key]
+    return matrix
+
+
+def rescore(features, weight_configs):
+    """
+    Apply one or many weight configurations to stored signals.
+
+    features       : FeatureMatrix
+    weight_configs : list of dicts with the config_weights.json structure
+    returns        : dict section -> (n_configs, n_abstracts) array of scores (%),
+                     rounded to one decimal like the reports
+    """
+    W = weight_matrix(weight_configs, features.columns)
+    scores = {}
+    for section in features.sections():
+        cols = features.section_columns(section)
+        W_section = W[:, cols]
+        totals = W_section.sum(axis=1)
+        raw = W_section @ features.values[:, cols].T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = np.where(totals[:, None] > 0, raw / totals[:, None] * 100, 0.0)
+        scores[section] = np.round(percentage, 1)
+    return scores
+
+
+def load_weight_configs(paths):
+    configs = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            configs.append(json.load(f))
+    return configs
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SPAA - re-score stored signals with other weights")
+    parser.add_argument("features", help="Feature matrix written with --features-out (.npz)")
+    parser.add_argument("weights", nargs="+", help="One or more config_weights.json candidates")
+    args = parser.parse_args()
+
+    features = FeatureMatrix.load(args.features)
+    configs = load_weight_configs(args.weights)
+    scores = rescore(features, configs)
+
+    print(f"{len(features)} abstracts x {len(configs)} weight configurations (mean score %)")
+    print("weights".ljust(40) + "".join(section[:11].rjust(12) for section in scores))
+    for i, path in enumerate(args.weights):
+        print(path[-40:].ljust(40) + "".join(f"{scores[section][i].mean():12.1f}" for section in scores))
@@ -0,0 +1,297 @@
+# results.py - typed result model, text renderer and machine-readable serializers
+
+import csv
+import json
+import os
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+# weight section -> (report title, score label), in report order
+SECTION_LABELS = {
+    "BACKGROUND":  ("BACKGROUND VALIDATION", "BKG_SCORE"),
+    "HYPOTHESIS":  ("HYPOTHESIS VALIDATION", "HYP_SCORE"),
+    "METHODOLOGY": ("METHODOLOGY VALIDATION", "METH_SCORE"),
+    "OUTCOMES":    ("EXPECTED OUTCOMES VALIDATION", "OUT_SCORE"),
+    "IMPACT":      ("IMPACT VALIDATION", "IMPACT_SCORE"),
+    "ETHICS":      ("ETHICS VALIDATION", "ETHICS_SCORE"),
+}
+
+REPORT_BANNER = (
+    "========================================================",
+    "      SPAA: SCIENTIFIC PROPOSAL ABSTRACT ANALIZER",
+    "        ",
+    "--------------------------------------------------------",
+    " A domain-aware expert system for evaluating scientific",
+    " proposal abstracts using NLP-spaCy and curated lexicons.",
+    "--------------------------------------------------------",
+    "Developer: Flavio F. Contreras-Torres",
+    "Version: v.1.0 - May, 2025. Oviedo",
+    "Version: v.1.1 - November, 2025. Monterrey",
+)
+
+
+@dataclass(slots=True)
+class EvidenceSpan:
+    category: str   # config_keywords.json list that matched
+    term: str
+    start: int      # character offsets in the section text
+    end: int
+
+
+@dataclass(slots=True)
+class SectionResult:
+    """
+    Outcome of one validator.
+    flags        : weight key -> detected factor (0/1, or the Bloom factor for 'bloom')
+    domain_terms : number of domain lexicon terms found (Background / Hypothesis)
+    """
+    section: str    # weight section, e.g. 'BACKGROUND'
+    score: float    # percentage, rounded to one decimal
+    flags: dict = field(default_factory=dict)
+    feedback: list = field(default_factory=list)
+    evidence: list = field(default_factory=list)  # [EvidenceSpan]
+    domain_terms: int = 0
+
+
+@dataclass(slots=True)
+class AbstractResult:
+    id: str
+    executed_at: str
+    sections: list = field(default_factory=list)  # [SectionResult] in report order
+    summary: str = ""
+    keywords: list = field(default_factory=list)
+    best_domain: str | None = None
+    domain_scores: dict = field(default_factory=dict)  # multi-domain mode only
+
+    def section(self, name):
+        for result in self.sections:
+            if result.section == name:
+                return result
+        return None
+
+    def scores(self):
+        return {result.section: result.score for result in self.sections}
+
+    def to_dict(self):
+        data = asdict(self)
+        data["scores"] = self.scores()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Inverse of to_dict() (e.g. for results stored as JSON by dedup.py).
+        """
+        sections = [
+            SectionResult(
+                section=section["section"],
+                score=section["score"],
+                flags=dict(section.get("flags", {})),
+                feedback=list(section.get("feedback", [])),
+                evidence=[EvidenceSpan(**span) for span in section.get("evidence", [])],
+                domain_terms=section.get("domain_terms", 0),
+            )
+            for section in data.get("sections", [])
+        ]
+        return cls(
+            id=data["id"],
+            executed_at=data["executed_at"],
+            sections=sections,
+            summary=data.get("summary", ""),
+            keywords=list(data.get("keywords", [])),
+            best_domain=data.get("best_domain"),
+            domain_scores=dict(data.get("domain_scores", {})),
+        )
+
+
+def evidence_spans(hits):
+    """
+    [(category, term, start_char, end_char)] (KeywordHits.evidence) -> [EvidenceSpan]
+    """
+    return [EvidenceSpan(category, term, start, end) for category, term, start, end in hits]
+
+
+# ----------------------------
+# Text report (output_results.txt)
+# ----------------------------
+def render_text(result):
+    """
+    Lines of the human-readable report, as written to output_results.txt.
+    """
+    lines = list(REPORT_BANNER)
+    lines += [
+        f"Execution Date: {result.executed_at}",
+        "--------------------------------------------------------",
+        "GitHub: https://github.com/NanoBiostructuresRG",
+        "========================================================\n",
+    ]
+
+    for number, section in enumerate(result.sections, start=1):
+        title, label = SECTION_LABELS[section.section]
+        heading = f"[{number}. {title}]\n"
+        lines.append(heading if number == 1 else "\n" + heading)
+        lines.extend(section.feedback)
+        lines.append(f"\n{label}: {section.score}%\n")
+
+    lines.append(f"\n[{len(result.sections) + 1}. ABSTRACT SUMMARY]\n")
+    lines.append(result.summary)
+
+    if result.domain_scores:
+        lines.append(f"\n[{len(result.sections) + 2}. DOMAIN FIT]\n")
+        for tag, fit in result.domain_scores.items():
+            lines.append(
+                f"{tag}: BKG_SCORE {fit['background_score']}% ({fit['background_hits']} terms) | "
+                f"HYP_SCORE {fit['hypothesis_score']}% ({fit['hypothesis_hits']} terms)"
+            )
+        if result.best_domain:
+            lines.append(f"\nBest-fitting domain: {result.best_domain} (used for sections 1-2)")
+        else:
+            lines.append("\nNo domain lexicon available.")
+    return lines
+
+
+# ----------------------------
+# Machine-readable output
+# ----------------------------
+def flat_row(result):
+    """
+    One flat record per abstract: scores, flags and domain term counts as columns.
+    """
+    row = {"id": result.id, "executed_at": result.executed_at, "best_domain": result.best_domain or ""}
+    for section in result.sections:
+        row[f"{section.section}.score"] = section.score
+        for key, value in section.flags.items():
+            row[f"{section.section}.{key}"] = value
+        if section.section in ("BACKGROUND", "HYPOTHESIS"):
+            row[f"{section.section}.domain_terms"] = section.domain_terms
+    row["keywords"] = ", ".join(result.keywords)
+    return row
+
+
+def to_columns(results):
+    """
+    dict column -> list of values (columnar layout of flat_row).
+    """
+    columns = {}
+    rows = [flat_row(result) for result in results]
+    for row in rows:
+        for name in row:
+            columns.setdefault(name, [])
+    for row in rows:
+        for name, values in columns.items():
+            values.append(row.get(name))
+    return columns
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Write to a hidden temporary file next to path (same extension, so writers
+    that append one keep it) and move it over path only once the block
+    completes: a crash never leaves a half-written report behind.
+    """
+    directory, name = os.path.split(path)
+    root, extension = os.path.splitext(name)
+    tmp_path = os.path.join(directory, f".{root}.tmp{os.getpid()}{extension}")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([result.to_dict() for result in results], f, ensure_ascii=False, indent=2)
+
+
+def write_jsonl(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+
+
+def write_csv(results, path):
+    columns = to_columns(results)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(list(columns))
+        writer.writerows(zip(*columns.values()))
+
+
+def write_parquet(results, path):
+    """
+    Columnar Parquet file (needs the optional pyarrow package).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(pa.table(to_columns(results)), path)
+
+
+def write_npz(results, path):
+    """
+    Columnar NumPy archive: one array per column.
+    """
+    import numpy as np
+
+    np.savez_compressed(path, **{name: np.array(values) for name, values in to_columns(results).items()})
+
+
+WRITERS = {
+    ".json": write_json,
+    ".jsonl": write_jsonl,
+    ".csv": write_csv,
+    ".parquet": write_parquet,
+    ".npz": write_npz,
+}
+
+
+def check_results_path(path):
+    """
+    Fail before any work is done if path has no writer (or Parquet lacks pyarrow).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unknown results format '{extension}'; expected one of {', '.join(WRITERS)}")
+    if extension == ".parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow); use .npz or .csv instead")
+    return extension
+
+
+def write_results(results, path):
+    """
+    Write results in the format given by the extension of path (see WRITERS).
+    """
+    writer = WRITERS[check_results_path(path)]
+    with atomic_path(path) as tmp_path:
+        writer(list(results), tmp_path)
+
+
+def read_columns(path):
+    """
+    Bulk load of a cohort written by write_results (.csv, .parquet or .npz)
+    as dict column -> list/array of values.
+    """
+    if path.endswith(".npz"):
+        import numpy as np
+
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).to_pydict()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        columns = {name: [] for name in header}
+        for row in reader:
+            for name, value in zip(header, row):
+                columns[name].append(value)
+    return columns
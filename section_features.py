@@ -0,0 +1,137 @@
+# section_features.py - single extraction pass per section Doc
+
+import numpy as np
+from spacy.attrs import POS, TAG, DEP, LOWER, LEMMA, IDX, LENGTH, IS_ALPHA, IS_STOP
+from spacy.strings import hash_string
+from spacy.symbols import NOUN, VERB
+
+from bloom_detection import resolve_bloom_level
+
+
+class SectionFeatures:
+    """
+    Compact facts about one section, extracted from its spaCy Doc in a single pass.
+    Validators score from this object, so the Doc can be dropped afterwards.
+
+    text             : section text
+    n_tokens         : number of tokens
+    lemmas           : lowercased lemma per token
+    has_future       : 'will' used as modal (MD/VB tag)
+    verb_lemmas      : lowercased lemmas of VERB tokens
+    techniques       : NOUN tokens acting as subject / direct object
+    has_purpose_verb : a VERB is a MEDIUM/HIGH Bloom verb or any Bloom synonym
+    keyword_hits     : KeywordHits for every config_keywords.json category
+    bloom_histogram  : Counter of (level, exact|synonym) over verb_lemmas
+    """
+
+    __slots__ = (
+        "text", "n_tokens", "lemmas",
+        "has_future", "verb_lemmas", "techniques", "has_purpose_verb",
+        "keyword_hits", "bloom_histogram",
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+    def bloom_level(self):
+        """
+        (message, factor) of the highest Bloom level found in the section.
+        """
+        return resolve_bloom_level(self.bloom_histogram)
+
+
+FULL_ATTRS = [LOWER, LEMMA, IDX, LENGTH, POS, TAG, DEP]
+LEXICAL_ATTRS = [LOWER, LEMMA, IDX, LENGTH, IS_ALPHA, IS_STOP]
+WILL = hash_string("will")
+
+
+def decode_lemmas(doc, lemma, lower):
+    """
+    (distinct lemmas, lowercased lemma per token); the lowercased text stands in
+    where a token has no lemma. Each distinct lemma is decoded from the
+    StringStore once.
+    """
+    strings = doc.vocab.strings
+    forms = {}
+    lemmas = []
+    for key in np.where(lemma != 0, lemma, lower).tolist():
+        form = forms.get(key)
+        if form is None:
+            form = forms[key] = strings[key].lower()
+        lemmas.append(form)
+    return list(forms.values()), lemmas
+
+
+def extract_features(doc, matcher, bloom_index, text=None):
+    """
+    doc         : spaCy Doc of one section
+    matcher     : compiled KeywordMatcher
+    bloom_index : BloomIndex
+    text        : the text doc was made from, if at hand (doc.text rebuilds it token by token)
+
+    Token attributes are read with one to_array call, without Token objects.
+    """
+    text = doc.text if text is None else text
+    strings = doc.vocab.strings
+    attrs = doc.to_array(FULL_ATTRS).reshape(len(doc), len(FULL_ATTRS))
+    lower, lemma, idx, length, pos, tag, dep = attrs.T
+    _, lemmas = decode_lemmas(doc, lemma, lower)
+    starts = idx.tolist()
+    ends = (idx + length).tolist()
+
+    verbs = np.flatnonzero(pos == VERB).tolist()
+    verb_lemmas = [lemmas[i] for i in verbs]
+    subjects = (dep == strings["nsubj"]) | (dep == strings["dobj"])
+    techniques = [text[starts[i]:ends[i]] for i in np.flatnonzero((pos == NOUN) & subjects).tolist()]
+    modal = (tag == strings["MD"]) | (tag == strings["VB"])
+    purpose_lemmas = bloom_index.purpose_lemmas
+
+    return SectionFeatures(
+        text=text,
+        n_tokens=len(doc),
+        lemmas=lemmas,
+        has_future=bool((modal & (lower == WILL)).any()),
+        verb_lemmas=verb_lemmas,
+        techniques=techniques,
+        has_purpose_verb=any(lemma in purpose_lemmas for lemma in verb_lemmas),
+        keyword_hits=matcher.match_tokens(text, list(zip(lemmas, starts, ends))),
+        bloom_histogram=bloom_index.histogram(verb_lemmas),
+    )
+
+
+def extract_lexical_features(doc, matcher, bloom_index, text=None):
+    """
+    SectionFeatures of a Doc with only tokens and (lookup) lemmas, for the lexical
+    tier of triage.py. The lemma falls back to the lowercased text when the Doc
+    has none. Attributes that need the tagger or parser are approximated:
+        verb_lemmas : lemmas that are Bloom verbs or synonyms, whatever their POS
+        has_purpose_verb : any lemma is a purpose verb (see BloomIndex)
+        has_future  : the token 'will' anywhere
+        techniques  : content words (no stop words, punctuation or numbers)
+
+    text : the text doc was made from, if at hand (doc.text rebuilds it token by token)
+    """
+    text = doc.text if text is None else text
+    attrs = doc.to_array(LEXICAL_ATTRS).reshape(len(doc), len(LEXICAL_ATTRS))
+    lower, lemma, idx, length, is_alpha, is_stop = attrs.T
+    forms, lemmas = decode_lemmas(doc, lemma, lower)
+    starts = idx.tolist()
+    ends = (idx + length).tolist()
+    content = np.flatnonzero(is_alpha & (is_stop == 0)).tolist()
+
+    bloom_forms = {form for form in forms if bloom_index.lookup(form)}
+    verb_lemmas = [lemma for lemma in lemmas if lemma in bloom_forms] if bloom_forms else []
+    purpose_lemmas = bloom_index.purpose_lemmas
+
+    return SectionFeatures(
+        text=text,
+        n_tokens=len(doc),
+        lemmas=lemmas,
+        has_future=bool((lower == WILL).any()),
+        verb_lemmas=verb_lemmas,
+        techniques=[text[starts[i]:ends[i]] for i in content],
+        has_purpose_verb=any(form in purpose_lemmas for form in forms),
+        keyword_hits=matcher.match_tokens(text, list(zip(lemmas, starts, ends))),
+        bloom_histogram=bloom_index.histogram(verb_lemmas),
+    )
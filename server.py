@@ -0,0 +1,350 @@
+# server.py - long-running validation server with a warm spaCy pipeline
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import signal
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import CONFIG_FILE, WEIGHT_FILE
+from loader import Loader
+from batch_validator import BatchValidator
+from abstract_validator import AbstractValidator
+from doc_cache import DocCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from domain_index import ALL_TAGS, discover_tags, is_multi_tag, parse_tags
+from registry import REGISTRY
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WINDOW_MS = 20
+DEFAULT_MAX_BATCH = 32
+
+
+class ValidationService:
+    """
+    Keeps the spaCy pipeline, config and lexicons loaded and evaluates
+    abstracts submitted from any thread.
+
+    Requests arriving within batch_window seconds of each other (up to
+    max_batch abstracts) are grouped into one micro-batch: all their sections
+    go through a single nlp.pipe call on the worker thread, then each caller's
+    Future receives its own report.
+    """
+
+    def __init__(self, config_file=CONFIG_FILE, weight_file=WEIGHT_FILE,
+                 domain_tag: str | None = None,
+                 lexicon_dir: str = "lexicon",
+                 batch_window: float = DEFAULT_WINDOW_MS / 1000,
+                 max_batch: int = DEFAULT_MAX_BATCH,
+                 nlp=None,
+                 doc_cache=None):
+        """
+        domain_tag   : default lexicon tag; a request may ask for another one (see check_tag)
+        batch_window : seconds to wait for more requests after the first one of a batch
+        max_batch    : maximum number of abstracts per micro-batch
+        """
+        self.config_file = config_file
+        self.weight_file = weight_file
+        self.domain_tag = domain_tag
+        self.lexicon_dir = lexicon_dir
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.doc_cache = doc_cache
+        self.loader = Loader(None, config_file, weight_file, lexicon_dir=lexicon_dir)
+        self.batches = {}  # domain tag -> BatchValidator holding the shared resources (worker thread only)
+        self.nlp = nlp if nlp is not None else REGISTRY.get_pipeline(AbstractValidator.requirements())
+        self.queue = queue.Queue()
+        self.ids = itertools.count(1)
+        self.served = 0
+        self.n_batches = 0
+        self.worker = None
+
+    def batch_for(self, domain_tag):
+        """
+        BatchValidator whose resources (weights, matcher, lexicon) serve domain_tag.
+        """
+        batch = self.batches.get(domain_tag)
+        if batch is None:
+            batch = BatchValidator(
+                [],
+                self.config_file,
+                self.weight_file,
+                output_dir="",
+                domain_tag=domain_tag,
+                lexicon_dir=self.lexicon_dir,
+                nlp=self.nlp,
+            )
+        batch.load_resources()  # cheap: the registry reloads only changed files
+        self.batches[domain_tag] = batch  # only once its resources loaded
+        return batch
+
+    def check_tag(self, domain_tag):
+        """
+        Canonical form of a client-supplied tag: None, a lexicon tag under
+        lexicon_dir, 'all' or a comma-separated list of lexicon tags. Anything
+        else raises TypeError / ValueError, so every tag cached by batch_for()
+        names existing lexicons.
+        """
+        if domain_tag is None:
+            return None
+        if not isinstance(domain_tag, str):
+            raise TypeError(f"'tag' must be a string, got {type(domain_tag).__name__}")
+        if domain_tag.strip().lower() == ALL_TAGS:
+            return ALL_TAGS
+        known = set(discover_tags(self.lexicon_dir))
+        tags = list(dict.fromkeys(parse_tags(domain_tag, self.lexicon_dir)))
+        unknown = [tag for tag in tags if tag not in known]
+        if not tags or unknown:
+            raise ValueError(f"Unknown domain tag(s) {unknown or [domain_tag]}; available: {sorted(known)}")
+        if not is_multi_tag(domain_tag):
+            return tags[0]
+        # Still a multi-domain tag when the list names a single lexicon
+        return ",".join(tags) if len(tags) > 1 else f"{tags[0]},"
+
+    def start(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._work, name="spaa-batcher", daemon=True)
+            self.worker.start()
+        return self
+
+    def stop(self):
+        if self.worker is not None:
+            self.queue.put(None)
+            self.worker.join()
+            self.worker = None
+
+    def submit(self, sections, keywords=(), abstract_id=None, domain_tag=None):
+        """
+        sections : [background, hypothesis, methodology, outcomes, impact] texts
+        keywords : list of keyword strings
+        Returns a Future resolved with the report_dict() of the abstract.
+        Malformed input raises here (TypeError / ValueError), before it can
+        reach the micro-batch shared with other requests.
+        """
+        sections = list(sections)
+        if len(sections) != len(AbstractValidator.SECTION_NAMES):
+            raise ValueError(f"Expected {len(AbstractValidator.SECTION_NAMES)} sections, got {len(sections)}")
+        for name, section in zip(AbstractValidator.SECTION_NAMES, sections):
+            if not isinstance(section, str):
+                raise TypeError(f"Section '{name}' must be a string, got {type(section).__name__}")
+        if isinstance(keywords, str) or not all(isinstance(kw, str) for kw in keywords):
+            raise TypeError("'keywords' must be a list of strings")
+        domain_tag = self.check_tag(domain_tag)
+        future = Future()
+        abstract_id = abstract_id if abstract_id is not None else f"request-{next(self.ids)}"
+        tag = domain_tag if domain_tag is not None else self.domain_tag
+        self.queue.put((future, abstract_id, sections, list(keywords), tag))
+        return future
+
+    def submit_text(self, text, abstract_id=None, domain_tag=None):
+        """
+        Same as submit() for a raw abstract in the '# section' file format.
+        """
+        if not isinstance(text, str):
+            raise TypeError(f"'text' must be a string, got {type(text).__name__}")
+        *sections, keywords = self.loader.split_sections(text)
+        return self.submit(sections, keywords, abstract_id, domain_tag)
+
+    def _collect(self):
+        """
+        Block for the first request, then gather more until the window closes
+        or the batch is full. Returns None once stop() was called.
+        """
+        first = self.queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)  # finish this batch, then stop
+                break
+            batch.append(item)
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self._process(batch)
+
+    def _parse(self, texts):
+        if self.doc_cache is not None:
+            return list(self.doc_cache.pipe(self.nlp, texts, batch_size=len(texts)))
+        return list(self.nlp.pipe(texts, batch_size=len(texts)))
+
+    def _process(self, batch):
+        n = len(AbstractValidator.SECTION_NAMES)
+        try:
+            docs = self._parse([section for _, _, sections, _, _ in batch for section in sections])
+        except Exception as exc:
+            if len(batch) > 1:
+                # Parse each request on its own so that one bad request
+                # does not fail the others of the micro-batch
+                for request in batch:
+                    self._process([request])
+            else:
+                batch[0][0].set_exception(exc)
+                self.served += 1
+            return
+
+        self.n_batches += 1
+        for i, (future, abstract_id, sections, keywords, tag) in enumerate(batch):
+            try:
+                validator = self.batch_for(tag).evaluate_parsed(
+                    abstract_id, sections, keywords, docs[i * n:(i + 1) * n]
+                )
+                future.set_result(validator.report_dict(abstract_id))
+            except Exception as exc:
+                future.set_exception(exc)
+            self.served += 1
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /validate  {"id": ..., "text": "# background ..."}  or
+                    {"id": ..., "sections": {"background": ..., ...}, "keywords": [...]}
+                    optional "tag" (see ValidationService.check_tag); answers with
+                    the JSON report, or 400 for malformed input
+    GET  /health    service status
+    """
+
+    server_version = "SPAA/1.1"
+    timeout_s = 300
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        service = self.server.service
+        self.send_json(200, {
+            "status": "ok",
+            "model": service.nlp.meta.get("name"),
+            "components": service.nlp.pipe_names,
+            "requests": service.served,
+            "batches": service.n_batches,
+        })
+
+    def do_POST(self):
+        if self.path != "/validate":
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            service = self.server.service
+            if "text" in request:
+                future = service.submit_text(request["text"], request.get("id"), request.get("tag"))
+            elif "sections" in request:
+                sections = [request["sections"].get(name, "") for name in AbstractValidator.SECTION_NAMES]
+                future = service.submit(sections, request.get("keywords", []), request.get("id"), request.get("tag"))
+            else:
+                raise ValueError("Request needs 'text' or 'sections'")
+        except (ValueError, AttributeError, TypeError) as exc:
+            self.send_json(400, {"error": str(exc)})
+            return
+
+        try:
+            self.send_json(200, future.result(timeout=self.timeout_s))
+        except Exception as exc:
+            self.send_json(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+    """
+    HTTP server bound to host:port, or to a Unix socket if socket_path is given.
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        httpd = ThreadingUnixHTTPServer(socket_path, ValidationRequestHandler)
+    else:
+        httpd = ThreadingHTTPServer((host, port), ValidationRequestHandler)
+    httpd.service = service
+    return httpd
+
+
+def stop_on_sigterm(signum, frame):
+    raise SystemExit(0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SPAA - validation server with a warm spaCy pipeline")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help=f"Bind address (default: {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT}).")
+    parser.add_argument("--socket", type=str, default=None, help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument("--tag", type=str, default=None, help="Default domain tag (a request may override it).")
+    parser.add_argument(
+        "--window-ms",
+        type=float,
+        default=DEFAULT_WINDOW_MS,
+        help=f"Micro-batching window in milliseconds (default: {DEFAULT_WINDOW_MS})."
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=DEFAULT_MAX_BATCH,
+        help=f"Maximum abstracts per micro-batch (default: {DEFAULT_MAX_BATCH})."
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk cache of parsed sections.")
+    parser.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory of the parsed-section cache.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    doc_cache = None if args.no_cache else DocCache(args.cache_dir, DEFAULT_MAX_BYTES)
+    service = ValidationService(
+        domain_tag=args.tag,
+        batch_window=args.window_ms / 1000,
+        max_batch=args.max_batch,
+        doc_cache=doc_cache,
+    ).start()
+    httpd = make_server(service, args.host, args.port, args.socket)
+    where = f"unix:{args.socket}" if args.socket else f"http://{args.host}:{args.port}"
+    signal.signal(signal.SIGTERM, stop_on_sigterm)  # clean shutdown under process managers
+    print(f"SPAA server ready on {where} (window {args.window_ms} ms, max batch {args.max_batch})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.stop()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
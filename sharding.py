@@ -0,0 +1,623 @@
+# sharding.py - sharded multi-process runs: file-based work queue, forked workers, result merge
+#
+# Usage:
+#     python sharding.py run --input-dir submissions --output-dir output --workers 8 --tag pparg
+#     python sharding.py run --corpus archive.txt --output-dir output --workers 8 --results-out output/cohort.jsonl
+#     python sharding.py run --output-dir /nfs/output --workers 8     # join an existing queue (another host)
+#     python sharding.py merge --output-dir output --results-out output/cohort.csv
+#
+# The input is cut into shards of about --shard-kb of text (groups of files of a
+# directory, or byte ranges of corpus files, see corpus_reader.py), many more
+# shards than workers. Workers pull the next shard as soon as they are free, so
+# a worker slowed down by long abstracts simply takes fewer shards, and a shard
+# whose worker died or stopped renewing its lease is taken over by another one.
+#
+# Queue layout (<output-dir>/queue):
+#     manifest.json                   run settings (tag, config, weights, ...) and number of shards
+#     pending/<shard>.json            shard spec, waiting
+#     running/<shard>@<worker>.json   claimed by <worker> (host-pid); file mtime = lease heartbeat
+#     done/<shard>.json               finished (timings); results in results/<shard>.jsonl
+#     failed/<shard>.json             given up after MAX_ATTEMPTS (last error inside)
+#
+# Every state change is a rename or an atomic replace, which holds on a local
+# disk and on NFS, so several hosts can run 'sharding.py run' on the same NFS
+# output directory (their clocks must agree within the lease time).
+# Once all shards are done the per-shard results are merged into one cohort
+# file and a cohort summary (<output-dir>/cohort_summary.json).
+
+import argparse
+import datetime
+import gc
+import glob
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import time
+import traceback
+
+import numpy as np
+
+from config import CONFIG_FILE, WEIGHT_FILE
+from corpus_reader import open_corpus
+from results import AbstractResult, atomic_path, write_results
+
+QUEUE_DIR = "queue"
+SUMMARY_NAME = "cohort_summary.json"
+DEFAULT_SHARD_KB = 256
+DEFAULT_LEASE = 300.0   # seconds without heartbeat before a running shard can be taken over
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 1.0
+STATES = ("pending", "running", "done", "failed")
+
+
+def worker_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# ----------------------------
+# Shard planning
+# ----------------------------
+def plan_file_shards(input_files, shard_bytes):
+    """
+    Consecutive groups of files of about shard_bytes each (input order kept).
+    """
+    shards, paths, size = [], [], 0
+    for path in input_files:
+        paths.append(os.path.abspath(path))
+        size += os.path.getsize(path)
+        if size >= shard_bytes:
+            shards.append({"kind": "files", "paths": paths, "bytes": size})
+            paths, size = [], 0
+    if paths:
+        shards.append({"kind": "files", "paths": paths, "bytes": size})
+    return shards
+
+
+def plan_corpus_shards(corpus_files, shard_bytes):
+    """
+    Byte ranges of about shard_bytes of every corpus file, cut at abstract starts
+    (this also builds the offset index the workers will reuse).
+    """
+    shards = []
+    corpus_files = [os.path.abspath(path) for path in corpus_files]
+    for number, path in enumerate(corpus_files):
+        # Ids repeated across the files are reported here and qualified by every worker
+        with open_corpus(path, earlier=corpus_files[:number]) as reader:
+            n = max(1, math.ceil(len(reader.buffer) / shard_bytes))
+            for start, end in reader.byte_ranges(n):
+                if end > start:
+                    shards.append({"kind": "corpus", "path": path, "earlier": corpus_files[:number],
+                                   "start": start, "end": end, "bytes": end - start})
+    return shards
+
+
+# ----------------------------
+# Queue
+# ----------------------------
+class ShardQueue:
+    """
+    File-based work queue shared by the workers of one or several hosts.
+    directory : <output-dir>/queue
+    lease     : seconds after which a running shard whose file was not touched
+                (heartbeat) may be taken over by another worker
+    """
+
+    def __init__(self, directory, lease=DEFAULT_LEASE):
+        self.directory = directory
+        self.lease = lease
+        self.manifest = read_json(os.path.join(directory, "manifest.json"))
+
+    @classmethod
+    def create(cls, directory, shards, manifest, lease=DEFAULT_LEASE):
+        """
+        Build the queue in a temporary directory and rename it into place. If
+        another process (or host) created it first, its queue is joined instead.
+        """
+        tmp_dir = os.path.join(os.path.dirname(directory) or ".", f".{QUEUE_DIR}.{worker_name()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        for state in STATES + ("results",):
+            os.makedirs(os.path.join(tmp_dir, state))
+        for i, spec in enumerate(shards):
+            shard_id = f"{i:06d}"
+            write_json(os.path.join(tmp_dir, "pending", f"{shard_id}.json"), dict(spec, id=shard_id, attempts=0))
+        write_json(os.path.join(tmp_dir, "manifest.json"), dict(manifest, shards=len(shards)))
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.exists(os.path.join(directory, "manifest.json")):
+                raise
+        return cls(directory, lease)
+
+    def shard_ids(self):
+        return [f"{i:06d}" for i in range(self.manifest["shards"])]
+
+    def path(self, state, shard_id, worker=None):
+        name = f"{shard_id}@{worker}.json" if worker else f"{shard_id}.json"
+        return os.path.join(self.directory, state, name)
+
+    def results_path(self, shard_id):
+        return os.path.join(self.directory, "results", f"{shard_id}.jsonl")
+
+    def running(self):
+        """
+        List of (shard_id, worker, path) of the claimed shards.
+        """
+        found = []
+        for name in self.entries("running"):
+            shard_id, _, worker = name[:-len(".json")].partition("@")
+            found.append((shard_id, worker, os.path.join(self.directory, "running", name)))
+        return found
+
+    def entries(self, state):
+        """
+        Shard file names in a state directory (hidden temporary files excluded).
+        """
+        return sorted(
+            name for name in os.listdir(os.path.join(self.directory, state))
+            if name.endswith(".json") and not name.startswith(".")
+        )
+
+    def status(self):
+        counts = {state: len(self.entries(state)) for state in STATES}
+        counts["total"] = self.manifest["shards"]
+        return counts
+
+    def claim(self, worker):
+        """
+        Claim the next pending shard (taking over expired leases when none is left).
+        Returns its spec, or None when there is nothing to claim.
+        """
+        for attempt in range(2):
+            for name in self.entries("pending"):
+                shard_id = name[:-len(".json")]
+                pending = os.path.join(self.directory, "pending", name)
+                claimed = self.path("running", shard_id, worker)
+                try:
+                    # The lease starts now, not when the shard was queued (rename keeps the mtime)
+                    os.utime(pending)
+                    os.rename(pending, claimed)
+                except FileNotFoundError:
+                    # Another worker was faster (or an NFS retry of our own rename)
+                    if not os.path.exists(claimed):
+                        continue
+                if os.path.exists(self.path("done", shard_id)):
+                    os.remove(claimed)  # finished meanwhile by the worker that lost its lease
+                    continue
+                return read_json(claimed)
+            if attempt == 0 and not self.requeue_stale():
+                break
+        return None
+
+    def heartbeat(self, shard_id, worker):
+        try:
+            os.utime(self.path("running", shard_id, worker))
+        except FileNotFoundError:
+            pass  # lease lost; the results are identical whoever finishes first
+
+    def complete(self, shard_id, worker, stats):
+        write_json(self.path("done", shard_id), stats)
+        try:
+            os.remove(self.path("running", shard_id, worker))
+        except FileNotFoundError:
+            pass
+
+    def release(self, path, error):
+        """
+        Put a claimed shard back in pending, or in failed after MAX_ATTEMPTS.
+        """
+        try:
+            spec = read_json(path)
+        except (OSError, ValueError):
+            return False
+        spec["attempts"] = spec.get("attempts", 0) + 1
+        spec["error"] = error
+        state = "failed" if spec["attempts"] >= MAX_ATTEMPTS else "pending"
+        write_json(self.path(state, spec["id"]), spec)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        if state == "failed":
+            print(f"[WARN] Shard {spec['id']} failed {spec['attempts']} times: {error.strip().splitlines()[-1]}")
+        return True
+
+    def requeue_stale(self):
+        """
+        Move running shards whose lease expired back to pending. Returns how many.
+        """
+        now = time.time()
+        count = 0
+        for shard_id, worker, path in self.running():
+            try:
+                expired = now - os.stat(path).st_mtime > self.lease
+            except FileNotFoundError:
+                continue
+            if expired and self.take_over(shard_id, worker, path, f"lease of {worker} expired"):
+                count += 1
+        return count
+
+    def requeue_dead(self):
+        """
+        Move running shards of dead worker processes of this host back to pending.
+        """
+        host = socket.gethostname()
+        count = 0
+        for shard_id, worker, path in self.running():
+            worker_host, _, pid = worker.rpartition("-")
+            if worker_host == host and pid.isdigit() and not pid_alive(int(pid)):
+                if self.take_over(shard_id, worker, path, f"worker {worker} died"):
+                    count += 1
+        return count
+
+    def take_over(self, shard_id, worker, path, reason):
+        # Rename first so that only one process releases the shard
+        mine = self.path("running", shard_id, f"{worker}~{worker_name()}")
+        try:
+            os.rename(path, mine)
+        except FileNotFoundError:
+            return False
+        return self.release(mine, reason)
+
+
+# ----------------------------
+# Workers
+# ----------------------------
+def shard_abstracts(batch, spec, readers):
+    """
+    (id, sections, keywords) of every abstract of a shard.
+    readers : path -> CorpusReader kept open by the worker across its shards
+    """
+    if spec["kind"] == "files":
+        yield from batch.iter_sections(spec["paths"])
+        return
+    reader = readers.get(spec["path"])
+    if reader is None:
+        reader = readers[spec["path"]] = open_corpus(spec["path"], earlier=spec.get("earlier", ()))
+    yield from reader.iter_range(spec["start"], spec["end"])
+
+
+def run_shard(batch, queue, spec, worker, readers):
+    """
+    Evaluate one shard: per-abstract reports, then the shard results file, then done.
+    """
+    started = time.time()
+    last_beat = started
+    results = []
+    for validator in batch.validate_all(shard_abstracts(batch, spec, readers)):
+        validator.save_results()
+        results.append(validator.result)
+        if time.time() - last_beat > queue.lease / 4:
+            queue.heartbeat(spec["id"], worker)
+            last_beat = time.time()
+    write_results(results, queue.results_path(spec["id"]))
+    queue.complete(spec["id"], worker, {
+        "id": spec["id"],
+        "worker": worker,
+        "abstracts": len(results),
+        "bytes": spec.get("bytes", 0),
+        "started_at": started,
+        "finished_at": time.time(),
+    })
+    return len(results)
+
+
+def work(batch, queue):
+    """
+    Worker loop: claim shards until the queue has nothing left to claim.
+    """
+    # Whole lines, so that the output of concurrent workers does not interleave mid-line
+    sys.stdout.reconfigure(line_buffering=True)
+    worker = worker_name()
+    readers = {}
+    try:
+        while True:
+            spec = queue.claim(worker)
+            if spec is None:
+                return
+            try:
+                run_shard(batch, queue, spec, worker, readers)
+            except Exception:
+                queue.release(queue.path("running", spec["id"], worker), traceback.format_exc())
+    finally:
+        for reader in readers.values():
+            reader.close()
+
+
+def run_workers(batch, queue, workers, poll=POLL_INTERVAL):
+    """
+    Fork workers that share the coordinator's warm pipeline and resources
+    (copy-on-write) until every shard is done or failed. Workers that die are
+    replaced and their shards requeued; shards leased by other hosts are waited for.
+    """
+    context = multiprocessing.get_context("fork")
+    batch.load_resources()
+    # Keep the loaded model out of the garbage collector's reach, so that the
+    # children do not copy its pages just by traversing it
+    gc.freeze()
+    while True:
+        queue.requeue_dead()
+        status = queue.status()
+        if status["pending"] == 0 and status["running"] == 0:
+            break
+        if status["pending"] == 0:
+            # Only shards leased by other hosts are left: wait for them or for their lease to expire
+            time.sleep(poll)
+            queue.requeue_stale()
+            continue
+        processes = [context.Process(target=work, args=(batch, queue)) for _ in range(min(workers, status["pending"]))]
+        # Unflushed output would be copied into (and printed again by) every child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                print(f"[WARN] Worker {process.pid} exited with code {process.exitcode}; its shard is requeued")
+    gc.unfreeze()
+
+
+# ----------------------------
+# Merge
+# ----------------------------
+def read_shard_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [AbstractResult.from_dict(json.loads(line)) for line in f if line.strip()]
+
+
+def cohort_summary(results, shard_stats, failed):
+    """
+    Cohort-level view of a sharded run: score distribution per section, best
+    domains, and per-worker / overall throughput from the shard timings.
+    """
+    scores = {}
+    for result in results:
+        for section, score in result.scores().items():
+            scores.setdefault(section, []).append(score)
+    domains = {}
+    for result in results:
+        if result.best_domain:
+            domains[result.best_domain] = domains.get(result.best_domain, 0) + 1
+    workers = {}
+    for stats in shard_stats:
+        entry = workers.setdefault(stats["worker"], {"shards": 0, "abstracts": 0, "seconds": 0.0})
+        entry["shards"] += 1
+        entry["abstracts"] += stats["abstracts"]
+        entry["seconds"] += stats["finished_at"] - stats["started_at"]
+    wall = (
+        max(stats["finished_at"] for stats in shard_stats) - min(stats["started_at"] for stats in shard_stats)
+        if shard_stats else 0.0
+    )
+    return {
+        "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "abstracts": len(results),
+        "shards": len(shard_stats),
+        "failed_shards": failed,
+        "wall_s": wall,
+        "abstracts_per_s": len(results) / wall if wall > 0 else 0.0,
+        "workers": workers,
+        "scores": {
+            section: {
+                "mean": float(np.mean(values)),
+                "median": float(np.median(values)),
+                "p10": float(np.percentile(values, 10)),
+                "p90": float(np.percentile(values, 90)),
+                "min": float(np.min(values)),
+                "max": float(np.max(values)),
+            }
+            for section, values in scores.items()
+        },
+        "best_domain": domains,
+    }
+
+
+def format_summary(summary):
+    lines = [
+        f"Cohort: {summary['abstracts']} abstracts in {summary['shards']} shards, "
+        f"{summary['wall_s']:.2f} s ({summary['abstracts_per_s']:.1f} abstracts/s, {len(summary['workers'])} workers)",
+        f"{'section':<14} {'mean':>7} {'median':>7} {'p10':>7} {'p90':>7} {'min':>7} {'max':>7}",
+    ]
+    for section, stats in summary["scores"].items():
+        lines.append(f"{section:<14} " + " ".join(
+            f"{stats[key]:>7.1f}" for key in ("mean", "median", "p10", "p90", "min", "max")
+        ))
+    if summary["best_domain"]:
+        lines.append("Best domains: " + ", ".join(
+            f"{tag} ({count})" for tag, count in sorted(summary["best_domain"].items(), key=lambda item: -item[1])
+        ))
+    if summary["failed_shards"]:
+        lines.append(f"[WARN] Failed shards (not in the cohort): {', '.join(summary['failed_shards'])}")
+    return "\n".join(lines)
+
+
+def merge(queue, results_out=None, features_out=None, summary_out=None):
+    """
+    Concatenate the per-shard results in shard (= input) order into results_out
+    and features_out, and write the cohort summary. Returns the summary.
+    """
+    results, shard_stats, failed = [], [], []
+    for shard_id in queue.shard_ids():
+        done = queue.path("done", shard_id)
+        if os.path.exists(done):
+            shard_stats.append(read_json(done))
+            results.extend(read_shard_results(queue.results_path(shard_id)))
+        elif os.path.exists(queue.path("failed", shard_id)):
+            failed.append(shard_id)
+    summary = cohort_summary(results, shard_stats, failed)
+    if results_out:
+        write_results(results, results_out)
+        print(f"Structured results saved to: {results_out}")
+    if features_out:
+        from registry import REGISTRY
+        from rescoring import FeatureMatrix, result_record
+
+        weights = REGISTRY.get_weights(queue.manifest["options"]["weight_file"])
+        FeatureMatrix.from_records((result_record(result) for result in results), weights).save(features_out)
+        print(f"Signal matrix saved to: {features_out}")
+    if summary_out:
+        write_json(summary_out, summary)
+        print(f"Cohort summary saved to: {summary_out}")
+    return summary
+
+
+# ----------------------------
+# Coordinator
+# ----------------------------
+def build_batch(options, output_dir, doc_cache=None):
+    """
+    (BatchValidator, settings_signature) for the run options of a queue manifest.
+    """
+    from batch_validator import BatchValidator
+    from dedup import settings_signature
+
+    batch = BatchValidator(
+        [],
+        options["config_file"],
+        options["weight_file"],
+        output_dir=output_dir,
+        domain_tag=options["tag"],
+        lexicon_dir=options["lexicon_dir"],
+        batch_size=options["batch_size"],
+        n_process=1,
+        doc_cache=doc_cache,
+        corpus=options.get("corpus", False),
+    )
+    settings = settings_signature(
+        options["config_file"], options["weight_file"], options["tag"], options["lexicon_dir"], batch.nlp
+    )
+    return batch, settings
+
+
+def open_queue(args, doc_cache=None):
+    """
+    Join the queue under --output-dir, or plan the shards and create it.
+    Returns (queue, batch); every host works with the options of the manifest.
+    """
+    directory = os.path.join(args.output_dir, QUEUE_DIR)
+    if os.path.exists(os.path.join(directory, "manifest.json")):
+        queue = ShardQueue(directory, args.lease)
+        if args.input_dir or args.corpus:
+            print(f"[WARN] Joining the existing queue {directory}; its inputs and options are used "
+                  f"(remove it to start a new run)")
+        batch, settings = build_batch(queue.manifest["options"], args.output_dir, doc_cache)
+    else:
+        options = {
+            "tag": args.tag,
+            "config_file": os.path.abspath(args.config),
+            "weight_file": os.path.abspath(args.weights),
+            "lexicon_dir": os.path.abspath(args.lexicon_dir),
+            "batch_size": args.batch_size,
+            "corpus": bool(args.corpus),
+        }
+        if args.corpus:
+            shards = plan_corpus_shards(args.corpus, args.shard_kb * 1024)
+        elif args.input_dir:
+            input_files = sorted(glob.glob(os.path.join(args.input_dir, args.glob)))
+            shards = plan_file_shards(input_files, args.shard_kb * 1024)
+        else:
+            raise SystemExit(f"No queue in {directory}: give --input-dir or --corpus to start a run")
+        batch, settings = build_batch(options, args.output_dir, doc_cache)
+        manifest = {
+            "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "inputs": {"corpus": args.corpus} if args.corpus else {"input_dir": args.input_dir, "glob": args.glob},
+            "options": options,
+            "settings": settings,
+        }
+        # Another host may have created the queue meanwhile: then that one is joined
+        queue = ShardQueue.create(directory, shards, manifest, args.lease)
+    if queue.manifest["settings"] != settings:
+        raise SystemExit("This host's config, weights, lexicons or model differ from the ones the queue was "
+                         "started with; its results would not be comparable")
+    return queue, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPAA sharded multi-process runs (file-based work queue)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Create (or join) the queue under --output-dir and work on it.")
+    run.add_argument("--input-dir", type=str, default=None, help="Directory of abstract files.")
+    run.add_argument("--glob", type=str, default="*.txt", help="Filename pattern inside --input-dir (default: *.txt).")
+    run.add_argument("--corpus", type=str, nargs="+", default=None, help="Multi-abstract corpus files (corpus_reader.py).")
+    run.add_argument("--tag", type=str, default=None, help="Domain tag (e.g., pparg, all).")
+    run.add_argument("--config", type=str, default=CONFIG_FILE, help="Keyword configuration file.")
+    run.add_argument("--weights", type=str, default=WEIGHT_FILE, help="Weight configuration file.")
+    run.add_argument("--lexicon-dir", type=str, default="lexicon", help="Base directory of the domain lexicons.")
+    run.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes on this host (default: CPU count).")
+    run.add_argument("--shard-kb", type=int, default=DEFAULT_SHARD_KB,
+                     help=f"Approximate text size of a shard in KB (default: {DEFAULT_SHARD_KB}).")
+    run.add_argument("--batch-size", type=int, default=64, help="nlp.pipe batch size inside a worker.")
+    run.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                     help=f"Seconds without heartbeat before a shard is taken over (default: {DEFAULT_LEASE:.0f}).")
+    run.add_argument("--no-cache", action="store_true", help="Do not use the parsed-section cache.")
+
+    commands.add_parser("merge", help="Merge the finished shards of the queue under --output-dir.")
+
+    for command in commands.choices.values():
+        command.add_argument("--output-dir", type=str, default="output", help="Reports and queue directory (default: output).")
+        command.add_argument("--results-out", type=str, default=None,
+                             help="Merged structured results (.json, .jsonl, .csv, .parquet, .npz).")
+        command.add_argument("--features-out", type=str, default=None, help="Merged signal matrix (.npz) for rescoring.py.")
+        command.add_argument("--summary-out", type=str, default=None,
+                             help=f"Cohort summary JSON (default: <output-dir>/{SUMMARY_NAME}).")
+    args = parser.parse_args()
+
+    if args.results_out:
+        from results import check_results_path
+
+        check_results_path(args.results_out)
+    summary_out = args.summary_out or os.path.join(args.output_dir, SUMMARY_NAME)
+
+    if args.command == "merge":
+        directory = os.path.join(args.output_dir, QUEUE_DIR)
+        if not os.path.exists(os.path.join(directory, "manifest.json")):
+            raise SystemExit(f"No queue in {directory}")
+        queue = ShardQueue(directory)
+    else:
+        os.makedirs(args.output_dir, exist_ok=True)
+        doc_cache = None
+        if not args.no_cache:
+            from doc_cache import DocCache
+
+            doc_cache = DocCache()
+        queue, batch = open_queue(args, doc_cache)
+        status = queue.status()
+        print(f"Queue {queue.directory}: {status['total']} shards, {status['done']} done, "
+              f"{status['pending']} pending, {status['running']} running, {status['failed']} failed")
+        run_workers(batch, queue, args.workers)
+
+    status = queue.status()
+    if status["done"] + status["failed"] < status["total"]:
+        print(f"[WARN] {status['total'] - status['done'] - status['failed']} shards not finished; merging what is done")
+    summary = merge(queue, args.results_out, args.features_out, summary_out)
+    print(format_summary(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# streaming.py - constant-memory JSONL in / JSONL out validation
+
+import contextlib
+import json
+import sys
+
+from abstract_validator import AbstractValidator
+
+
+def open_stream(path, mode):
+    """
+    File for path, or stdin/stdout for '-' (left open on exit).
+    """
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin if "r" in mode else sys.stdout)
+    return open(path, mode, encoding="utf-8")
+
+
+def read_records(stream):
+    """
+    Yields one dict per non-empty JSONL line; malformed lines are reported and skipped.
+    """
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            print(f"[WARN] Skipping line {line_no}: invalid JSON ({exc})", file=sys.stderr)
+            continue
+        if not isinstance(record, dict):
+            print(f"[WARN] Skipping line {line_no}: expected a JSON object", file=sys.stderr)
+            continue
+        record.setdefault("id", f"line-{line_no}")
+        yield record
+
+
+def record_error(record):
+    """
+    Why record does not have the expected shape, or None if it does.
+    """
+    if "sections" in record:
+        sections = record["sections"]
+        if not isinstance(sections, dict):
+            return f"'sections' must be an object, got {type(sections).__name__}"
+        for name in AbstractValidator.SECTION_NAMES:
+            if not isinstance(sections.get(name, ""), str):
+                return f"section '{name}' must be a string, got {type(sections[name]).__name__}"
+        keywords = record.get("keywords", [])
+        if not isinstance(keywords, (list, str)) or (
+            isinstance(keywords, list) and not all(isinstance(kw, str) for kw in keywords)
+        ):
+            return "'keywords' must be a list of strings or a comma-separated string"
+    elif not isinstance(record.get("text", ""), str):
+        return f"'text' must be a string, got {type(record['text']).__name__}"
+    return None
+
+
+def iter_abstracts(records, loader):
+    """
+    (id, sections, keywords) for every record:
+        {"id": ..., "sections": {"background": ..., ...}, "keywords": [...]}
+    or  {"id": ..., "text": "# background ..."} in the input file format.
+    Records of another shape are reported and skipped.
+    """
+    for record in records:
+        error = record_error(record)
+        if error is not None:
+            print(f"[WARN] Skipping record {record['id']}: {error}", file=sys.stderr)
+            continue
+        if "sections" in record:
+            sections = [record["sections"].get(name, "") for name in AbstractValidator.SECTION_NAMES]
+            keywords = record.get("keywords", [])
+            if isinstance(keywords, str):
+                keywords = [kw.strip() for kw in keywords.split(",") if kw.strip()]
+        else:
+            *sections, keywords = loader.split_sections(record.get("text", ""))
+        yield record["id"], sections, keywords
+
+
+def stream_validate(batch, input_path="-", output_path="-", include_report=True):
+    """
+    Reads JSONL abstracts from input_path, validates them in rolling nlp.pipe
+    batches and writes one JSON line per abstract as soon as it is scored.
+
+    batch          : BatchValidator holding the pipeline and resources
+                     (its batch_size / n_process / doc_cache are used)
+    include_report : also emit the full text report of each abstract
+
+    Only the abstracts of the batch in flight are held in memory, whatever the input size.
+    Returns the number of abstracts written.
+    """
+    written = 0
+    with open_stream(input_path, "r") as source, open_stream(output_path, "w") as sink:
+        # Progress messages go to stderr so that stdout carries only JSONL
+        with contextlib.redirect_stdout(sys.stderr):
+            abstracts = iter_abstracts(read_records(source), batch.loader)
+            for validator in batch.validate_all(abstracts):
+                result = validator.report_dict()
+                if not include_report:
+                    del result["report"]
+                sink.write(json.dumps(result, ensure_ascii=False) + "\n")
+                sink.flush()
+                written += 1
+    return written
@@ -1,51 +1,139 @@
 # summarizer.py version 1.1
 
+from bisect import bisect_right
+
+import numpy as np
+from spacy.attrs import IDX, IS_PUNCT, IS_STOP, LENGTH, LOWER, SENT_START
+
+KEYWORD_BONUS = 10
+
+
+def keyword_tuple(keywords):
+    """
+    Lowercased, de-duplicated keywords, prepared once and shared by every section.
+    """
+    return tuple(dict.fromkeys(kw.lower() for kw in keywords)) if keywords else ()
+
+
+def find_keyword_sentences(text_lower, sent_chars, keywords):
+    """
+    Boolean mask of the sentences (start_char, end_char) whose text contains a keyword.
+    One str.find pass per keyword over the whole lowercased text; after a hit the
+    search resumes at the next sentence.
+    """
+    found = np.zeros(len(sent_chars), dtype=bool)
+    if "" in keywords:
+        found[:] = True  # '' is a substring of every sentence
+        return found
+    starts = [start for start, _ in sent_chars]
+    n_sents = len(sent_chars)
+    for kw in keywords:
+        pos = text_lower.find(kw)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            if i >= 0 and pos + len(kw) <= sent_chars[i][1]:
+                found[i] = True
+                i += 1
+                # skip sentences already marked
+                while i < n_sents and found[i]:
+                    i += 1
+                if i == n_sents:
+                    break
+                pos = text_lower.find(kw, starts[i])
+            else:
+                pos = text_lower.find(kw, pos + 1)
+    return found
+
+
 class Summarizer:
+    """
+    Extractive summary of one Doc. Tokens are handled as arrays (doc.to_array):
+    word frequencies are a bincount over lowercased-text ids of the non-stopword,
+    non-punctuation tokens, and a sentence scores the sum of its tokens' frequencies
+    (+KEYWORD_BONUS if its lowercased text contains a keyword).
+    """
+
+    # Sentence boundaries; is_stop / is_punct are lexical and need no component
+    REQUIRES = frozenset({"sents"})
+
     def __init__(self, doc, keywords=None, max_chars=2000):
         self.doc = doc
-        self.keywords = [kw.lower() for kw in keywords] if keywords else []
+        self.text = doc.text  # Doc.text joins every token on each access
+        self.keywords = keyword_tuple(keywords)
         self.max_chars = max_chars
-        self.sentences = [sent for sent in doc.sents]
-        self.word_frequencies = {}
-        self.sentence_scores = {}
+        self.columns = doc.to_array([LOWER, IS_STOP, IS_PUNCT, SENT_START, IDX, LENGTH])
+        self.sentence_bounds()
+        self.token_ids = None         # dense id of each token's lowercased text
+        self.word_frequencies = None  # id -> count over non-stopword, non-punctuation tokens
+        self.sentence_scores = None   # score of each sentence (in document order)
+        self.scored = None            # True for sentences with a frequent word or a keyword
+
+    def sentence_bounds(self):
+        """
+        Token starts and character spans of the sentences (same segmentation as doc.sents).
+        """
+        doc = self.doc
+        if "sents" in doc.user_hooks or not doc.has_annotation("SENT_START") or len(doc) == 0:
+            sents = list(doc.sents)
+            self.sent_starts = np.array([sent.start for sent in sents], dtype=np.intp)
+            self.sent_chars = [(sent.start_char, sent.end_char) for sent in sents]
+            return
+        starts = np.flatnonzero(self.columns[:, 3] == 1)
+        if len(starts) == 0 or starts[0] != 0:
+            starts = np.concatenate(([0], starts))
+        last = np.append(starts[1:], len(doc)) - 1
+        idx, length = self.columns[:, 4], self.columns[:, 5]
+        self.sent_starts = starts.astype(np.intp)
+        self.sent_chars = list(zip(idx[starts].tolist(), (idx[last] + length[last]).tolist()))
 
     def calculate_frequencies(self):
-        for token in self.doc:
-            if token.is_stop == False and token.is_punct == False:
-                word = token.text.lower()
-                if word not in self.word_frequencies:
-                    self.word_frequencies[word] = 1
-                else:
-                    self.word_frequencies[word] += 1
+        unique_lower, self.token_ids = np.unique(self.columns[:, 0], return_inverse=True)
+        content = (self.columns[:, 1] == 0) & (self.columns[:, 2] == 0)
+        self.word_frequencies = np.bincount(self.token_ids[content], minlength=len(unique_lower))
+
+    def keyword_sentences(self):
+        """
+        Boolean mask of the sentences whose lowercased text contains a keyword.
+        """
+        if not self.keywords:
+            return np.zeros(len(self.sent_chars), dtype=bool)
+        text = self.text
+        text_lower = text.lower()
+        # Offsets of the lowercased text only line up when lowercasing keeps the length
+        # and has no context-dependent letters (final sigma)
+        if len(text_lower) == len(text) and "\u03a3" not in text:
+            return find_keyword_sentences(text_lower, self.sent_chars, self.keywords)
+        return np.array([
+            any(kw in text[start_char:end_char].lower() for kw in self.keywords)
+            for start_char, end_char in self.sent_chars
+        ], dtype=bool)
 
     def score_sentences(self):
-        for sent in self.sentences:
-            for word in sent:
-                if word.text.lower() in self.word_frequencies:
-                    if sent not in self.sentence_scores:
-                        self.sentence_scores[sent] = self.word_frequencies[word.text.lower()]
-                    else:
-                        self.sentence_scores[sent] += self.word_frequencies[word.text.lower()]
-        
-            # Bonus if sentence contains a keyword
-            sent_text = sent.text.lower()
-            if any(kw in sent_text for kw in self.keywords):
-                self.sentence_scores[sent] = self.sentence_scores.get(sent, 0) + 10  #bonus
-                               
+        # Each token adds the frequency of its lowercased text; sentences are contiguous token segments
+        token_weights = self.word_frequencies[self.token_ids]
+        self.sentence_scores = np.add.reduceat(token_weights, self.sent_starts)
+        self.scored = self.sentence_scores > 0
+
+        # Bonus if sentence contains a keyword
+        bonus = self.keyword_sentences()
+        self.sentence_scores = self.sentence_scores + bonus * KEYWORD_BONUS
+        self.scored |= bonus
+
     def summarize(self, n_sentences=3):
-        if not self.doc or not self.doc.text.strip():
+        if not self.doc or not self.text.strip():
             return ""
-        
+
         self.calculate_frequencies()
         self.score_sentences()
 
-        if not self.sentence_scores:
+        candidates = np.flatnonzero(self.scored)
+        if len(candidates) == 0:
             return ""
 
-        summarized = sorted(self.sentence_scores, key=self.sentence_scores.get, reverse=True)
-        summarized = summarized[:n_sentences]
-        summarized = sorted(summarized, key=lambda s: s.start)  # keep original order
-        summary_text = " ".join([sent.text for sent in summarized])
+        # Highest scores first; ties keep document order (stable sort)
+        ranked = candidates[np.argsort(-self.sentence_scores[candidates], kind="stable")]
+        summarized = np.sort(ranked[:n_sentences])  # keep original order
+        summary_text = " ".join([self.text[slice(*self.sent_chars[i])] for i in summarized])
 
         # Restricted up to max_chars (with spaces)
         if len(summary_text) > self.max_chars:
@@ -62,6 +150,8 @@ class StructuredSummarizer:
     Construye un resumen estructurado del abstract usando Summarizer sección por sección.
     """
 
+    REQUIRES = Summarizer.REQUIRES
+
     def __init__(self, keywords=None,
                  max_chars_per_section=400,
                  prefix_labels=True):
@@ -70,7 +160,7 @@ class StructuredSummarizer:
         max_chars_per_section : límite por defecto de caracteres para cada mini-resumen de sección
         prefix_labels         : si True, antepone 'Background:', 'Hypothesis:', etc.
         """
-        self.keywords = [kw.lower() for kw in keywords] if keywords else []
+        self.keywords = keyword_tuple(keywords)  # preparadas una sola vez para todas las secciones
         self.max_chars_per_section = max_chars_per_section
         self.prefix_labels = prefix_labels
 
@@ -79,9 +169,10 @@ class StructuredSummarizer:
         Resumen extractivo de una sección individual.
         max_chars_override: si se pasa, domina sobre max_chars_per_section.
         """
-        if doc is None or not doc.text.strip():
+        if doc is None:
             return ""
 
+        # Empty or whitespace-only sections give "" (see Summarizer.summarize)
         s = Summarizer(
             doc,
             keywords=self.keywords,
@@ -0,0 +1,523 @@
+# triage.py - two-tier intake triage: lexical scores for every abstract, full parse near the thresholds
+#
+# Usage (from the repository root):
+#     python triage.py --input-dir submissions --threshold 60 --band 10 --out output/triage.csv
+#     python triage.py --corpus archive.txt --threshold OVERALL=60 --threshold METHODOLOGY=50 --audit 0.05
+#
+# Tier 1 scores every abstract with the model's tokenizer and a lookup lemmatizer
+# (pipeline.load_lexical_pipeline) through the usual validators, fed by
+# section_features.extract_lexical_features. Background and Ethics only read
+# lemmas and keywords, Hypothesis tone / relation / domain likewise; what needs
+# POS tags, tags or the parse (Bloom level, future tense, techniques) is
+# approximated, so tier-1 scores are provisional.
+#
+# An abstract is accepted when every configured score reaches its threshold
+# (OVERALL is the mean of the six section scores). The tier-1 decision is kept
+# unless a score it depends on lies within --band points of its threshold: those
+# borderline abstracts go through the full en_core_web_sm pipeline (tier 2),
+# whose decision is final. A --audit fraction of the other abstracts, picked by
+# a hash of their id, is also scored in full to measure how often both tiers agree.
+
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+import zlib
+from collections import deque
+
+from config import CONFIG_FILE, WEIGHT_FILE
+from corpus_reader import open_corpus
+from domain_index import is_multi_tag
+from registry import REGISTRY
+from results import atomic_path
+
+DEFAULT_THRESHOLD = 60.0   # OVERALL score (%)
+DEFAULT_BAND = 10.0        # score points on each side of a threshold
+DEFAULT_AUDIT = 0.02       # fraction of tier-1 decisions re-scored in full
+OVERALL = "OVERALL"
+
+
+def overall_scores(scores):
+    """
+    Section scores plus OVERALL, the mean of the section scores.
+    """
+    scores = dict(scores)
+    scores[OVERALL] = round(sum(scores.values()) / len(scores), 1) if scores else 0.0
+    return scores
+
+
+def decide(scores, thresholds, band):
+    """
+    (accepted, borderline) for scores (with OVERALL) against thresholds {key: minimum}.
+    An abstract that misses one threshold by more than band is rejected whatever
+    the other scores are; otherwise it is borderline when any score lies within
+    band of its threshold.
+    """
+    margins = [scores[key] - minimum for key, minimum in thresholds.items()]
+    if any(margin < -band for margin in margins):
+        return False, False
+    accepted = all(margin >= 0 for margin in margins)
+    return accepted, any(abs(margin) < band for margin in margins)
+
+
+def audited(abstract_id, fraction):
+    """
+    Stable choice of about fraction of all ids (same ids on every run).
+    """
+    return zlib.crc32(str(abstract_id).encode("utf-8")) % 10000 < fraction * 10000
+
+
+def parse_thresholds(values, sections):
+    """
+    ['60', 'METHODOLOGY=50', ...] -> {key: minimum}; a bare number is OVERALL.
+    """
+    thresholds = {}
+    for value in values or [str(DEFAULT_THRESHOLD)]:
+        key, _, minimum = value.rpartition("=")
+        key = key.strip().upper() or OVERALL
+        if key != OVERALL and key not in sections:
+            raise ValueError(f"Unknown threshold '{key}': expected {OVERALL} or one of {', '.join(sections)}")
+        thresholds[key] = float(minimum)
+    return thresholds
+
+
+# ----------------------------
+# Tier 1
+# ----------------------------
+class LexicalScorer:
+    """
+    Provisional section scores from tokens and lookup lemmas only.
+    Sections of many abstracts are streamed through one nlp.pipe call; each
+    abstract is scored by the same AbstractValidator methods as a full run.
+    """
+
+    SECTIONS_PER_ABSTRACT = 5
+
+    def __init__(self, config_file, weight_file, domain_tag=None, lexicon_dir="lexicon",
+                 batch_size=256, nlp=None):
+        from pipeline import load_lexical_pipeline
+
+        self.config_file = config_file
+        self.weight_file = weight_file
+        self.domain_tag = domain_tag
+        self.lexicon_dir = lexicon_dir
+        self.batch_size = batch_size
+        self.nlp = nlp if nlp is not None else load_lexical_pipeline()
+        self.config = REGISTRY.get_config(config_file)
+        self.weights = REGISTRY.get_weights(weight_file)
+        self.domain_lexicon = None if is_multi_tag(domain_tag) else REGISTRY.get_lexicon(lexicon_dir, domain_tag)
+        self.matcher = REGISTRY.get_matcher(config_file)
+        self.bloom_index = REGISTRY.get_bloom_index(config_file)
+
+    def score(self, abstract_id, sections, keywords, docs):
+        from abstract_validator import AbstractValidator
+        from section_features import extract_lexical_features
+
+        validator = AbstractValidator(
+            abstract_id,
+            self.config_file,
+            self.weight_file,
+            None,
+            domain_tag=self.domain_tag,
+            lexicon_dir=self.lexicon_dir,
+            nlp=self.nlp
+        )
+        validator.set_resources(self.config, self.weights, self.domain_lexicon, self.matcher, self.bloom_index)
+        validator.set_sections(sections, keywords)
+        validator.features = {
+            name: extract_lexical_features(doc, self.matcher, self.bloom_index, text)
+            for name, doc, text in zip(validator.SECTION_NAMES, docs, sections)
+        }
+        if is_multi_tag(self.domain_tag):
+            validator.select_domain()
+        for validate in (
+            validator.validate_background,
+            validator.validate_hypothesis,
+            validator.validate_methodology,
+            validator.validate_outcomes,
+            validator.validate_impact,
+            validator.validate_ethics,
+        ):
+            validate()
+        return validator.scores
+
+    def score_all(self, abstracts):
+        """
+        abstracts : iterable of (key, id, sections, keywords)
+        Yields (key, id, sections, keywords, section scores) in input order.
+        """
+        pending = deque()
+
+        def texts():
+            for item in abstracts:
+                pending.append(item)
+                yield from item[2]
+
+        docs = self.nlp.pipe(texts(), batch_size=self.batch_size)
+        for abstract_docs in zip(*[iter(docs)] * self.SECTIONS_PER_ABSTRACT):
+            key, abstract_id, sections, keywords = pending.popleft()
+            yield key, abstract_id, sections, keywords, self.score(abstract_id, sections, keywords, abstract_docs)
+
+
+# ----------------------------
+# Input
+# ----------------------------
+class Inputs:
+    """
+    Abstracts of a directory of files or of corpus files, addressable by a key
+    (file path, or (corpus path, position)) so that tier 2 can read the few
+    escalated abstracts again instead of holding every text in memory.
+    """
+
+    def __init__(self, loader, files=(), corpora=(), rebuild_index=False):
+        self.loader = loader
+        self.files = list(files)
+        self.corpora = list(corpora)
+        self.rebuild_index = rebuild_index
+        self.readers = {}
+
+    def reader(self, path):
+        if path not in self.readers:
+            earlier = self.corpora[:self.corpora.index(path)]
+            self.readers[path] = open_corpus(path, earlier=earlier, rebuild=self.rebuild_index)
+        return self.readers[path]
+
+    def read(self, key):
+        """
+        (key, id, sections, keywords) of one abstract.
+        """
+        if isinstance(key, tuple):
+            abstract_id, sections, keywords = self.reader(key[0]).read(key[1])
+            return key, abstract_id, sections, keywords
+        with open(key, "r", encoding="utf-8") as f:
+            *sections, keywords = self.loader.split_sections(f.read())
+        return key, key, sections, keywords
+
+    def keys(self):
+        yield from self.files
+        for path in self.corpora:
+            for i in range(len(self.reader(path))):
+                yield (path, i)
+
+    def __iter__(self):
+        for key in self.keys():
+            yield self.read(key)
+
+    def close(self):
+        for reader in self.readers.values():
+            reader.close()
+        self.readers = {}
+
+
+# ----------------------------
+# Records
+# ----------------------------
+class RecordWriter:
+    """
+    One triage record per abstract, as JSON lines (.jsonl) or CSV (.csv).
+    """
+
+    def __init__(self, f, path, score_keys):
+        self.f = f
+        self.score_keys = list(score_keys)
+        self.csv = None
+        if path.lower().endswith(".csv"):
+            fields = ["id", "decision", "tier", "reason", "tier1_decision", "tier2_decision"]
+            fields += [f"tier{tier}.{key}" for tier in (1, 2) for key in self.score_keys]
+            self.csv = csv.DictWriter(f, fieldnames=fields)
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.csv is None:
+            self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        row = {name: record[name] for name in ("id", "decision", "tier", "reason", "tier1_decision")}
+        row["tier2_decision"] = record["tier2_decision"] or ""
+        for tier in (1, 2):
+            scores = record[f"tier{tier}_scores"] or {}
+            for key in self.score_keys:
+                row[f"tier{tier}.{key}"] = scores.get(key, "")
+        self.csv.writerow(row)
+
+
+def check_records_path(path):
+    if not path.lower().endswith((".jsonl", ".csv")):
+        raise ValueError(f"Unsupported triage output '{path}': use .jsonl or .csv")
+
+
+def label(accepted):
+    return "accept" if accepted else "reject"
+
+
+# ----------------------------
+# Cascade
+# ----------------------------
+class TriageCascade:
+    """
+    inputs      : Inputs of the run
+    thresholds  : {OVERALL or SECTION: minimum score}
+    band        : uncertainty band (score points) around every threshold
+    audit       : fraction of confident tier-1 decisions also scored in full
+    output_dir  : optional directory for the full reports of the tier-2 abstracts
+    """
+
+    def __init__(self, inputs, config_file, weight_file, thresholds, band=DEFAULT_BAND, audit=DEFAULT_AUDIT,
+                 domain_tag=None, lexicon_dir="lexicon", batch_size=64, output_dir=None):
+        self.inputs = inputs
+        self.config_file = config_file
+        self.weight_file = weight_file
+        self.thresholds = thresholds
+        self.band = band
+        self.audit = audit
+        self.domain_tag = domain_tag
+        self.lexicon_dir = lexicon_dir
+        self.batch_size = batch_size
+        self.output_dir = output_dir
+        self.stats = {}
+
+    def tier1(self, scorer, writer):
+        """
+        Scores every abstract lexically with scorer (LexicalScorer); writes the
+        confident decisions and returns the records of the abstracts that need
+        the full pipeline.
+        """
+        escalated = []
+        total = 0
+        accepted_alone = 0
+        for key, abstract_id, _, _, scores in scorer.score_all(self.inputs):
+            total += 1
+            scores = overall_scores(scores)
+            accepted, borderline = decide(scores, self.thresholds, self.band)
+            record = {
+                "id": abstract_id,
+                "decision": label(accepted),
+                "tier": 1,
+                "reason": "confident",
+                "tier1_decision": label(accepted),
+                "tier2_decision": None,
+                "tier1_scores": scores,
+                "tier2_scores": None,
+            }
+            if borderline:
+                record["reason"] = "borderline"
+            elif audited(abstract_id, self.audit):
+                record["reason"] = "audit"
+            else:
+                accepted_alone += accepted
+                if writer is not None:
+                    writer.write(record)
+                continue
+            escalated.append((key, record))
+        self.stats["abstracts"] = total
+        self.stats["tier1_accepted"] = accepted_alone
+        return escalated
+
+    def tier2(self, nlp, escalated, writer):
+        """
+        Full pipeline nlp for the escalated abstracts; its decision is final.
+        """
+        from batch_validator import BatchValidator
+
+        if not escalated:
+            return []
+        batch = BatchValidator(
+            [],
+            self.config_file,
+            self.weight_file,
+            self.output_dir or "",
+            domain_tag=self.domain_tag,
+            lexicon_dir=self.lexicon_dir,
+            batch_size=self.batch_size,
+            nlp=nlp,
+            corpus=bool(self.inputs.corpora),
+        )
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        abstracts = (self.inputs.read(key)[1:] for key, _ in escalated)
+        records = []
+        for (_, record), validator in zip(escalated, batch.validate_all(abstracts)):
+            if self.output_dir:
+                validator.save_results()
+            scores = overall_scores(validator.scores)
+            accepted, _ = decide(scores, self.thresholds, 0.0)
+            record.update(decision=label(accepted), tier=2, tier2_decision=label(accepted), tier2_scores=scores)
+            if writer is not None:
+                writer.write(record)
+            records.append(record)
+        return records
+
+    def run(self, out=None):
+        """
+        Runs both tiers; returns the summary dict (also kept in self.stats).
+        out : optional .jsonl / .csv path for one record per abstract
+        """
+        score_keys = list(REGISTRY.get_weights(self.weight_file)) + [OVERALL]
+        if not out:
+            return self.cascade(None, score_keys)
+        check_records_path(out)
+        directory = os.path.dirname(out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_path(out) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                return self.cascade(RecordWriter(f, out, score_keys), score_keys)
+
+    def cascade(self, writer, score_keys):
+        from abstract_validator import AbstractValidator
+
+        # Both pipelines are loaded before the clock starts: a model load would
+        # otherwise dominate the tier-2 rate when few abstracts are escalated
+        start = time.perf_counter()
+        scorer = LexicalScorer(
+            self.config_file, self.weight_file, self.domain_tag, self.lexicon_dir, batch_size=4 * self.batch_size
+        )
+        nlp = REGISTRY.get_pipeline(AbstractValidator.requirements())
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        escalated = self.tier1(scorer, writer)
+        tier1_seconds = time.perf_counter() - start
+        records = self.tier2(nlp, escalated, writer)
+        tier2_seconds = time.perf_counter() - start - tier1_seconds
+        self.stats["load_seconds"] = round(load_seconds, 3)
+        self.summarize(records, tier1_seconds, tier2_seconds, score_keys)
+        return self.stats
+
+    def summarize(self, records, tier1_seconds, tier2_seconds, score_keys):
+        """
+        Rates and the speed-up exclude loading the pipelines (load_seconds).
+        """
+        stats = self.stats
+        total = stats["abstracts"]
+        elapsed = tier1_seconds + tier2_seconds
+        stats.update(
+            thresholds=self.thresholds,
+            band=self.band,
+            audit_fraction=self.audit,
+            escalated=len(records),
+            accepted=stats["tier1_accepted"] + sum(record["decision"] == "accept" for record in records),
+            tier1_seconds=round(tier1_seconds, 3),
+            tier2_seconds=round(tier2_seconds, 3),
+            tier1_rate=round(total / tier1_seconds, 1) if tier1_seconds > 0 else None,
+            tier2_rate=round(len(records) / tier2_seconds, 1) if records and tier2_seconds > 0 else None,
+            rate=round(total / elapsed, 1) if elapsed > 0 else None,
+        )
+        # Against scoring every abstract with the full pipeline at the tier-2 rate
+        stats["speedup_vs_full"] = (
+            round(stats["rate"] / stats["tier2_rate"], 1) if stats["rate"] and stats["tier2_rate"] else None
+        )
+
+        def agreement(subset):
+            agreeing = sum(record["tier1_decision"] == record["tier2_decision"] for record in subset)
+            return {
+                "abstracts": len(subset),
+                "agreement": round(agreeing / len(subset), 4) if subset else None,
+                "accept_to_reject": sum(
+                    record["tier1_decision"] == "accept" and record["tier2_decision"] == "reject" for record in subset
+                ),
+                "reject_to_accept": sum(
+                    record["tier1_decision"] == "reject" and record["tier2_decision"] == "accept" for record in subset
+                ),
+            }
+
+        # The audit sample estimates the agreement of the decisions tier 1 takes alone
+        stats["agreement"] = {
+            "borderline": agreement([record for record in records if record["reason"] == "borderline"]),
+            "audit": agreement([record for record in records if record["reason"] == "audit"]),
+            "all": agreement(records),
+        }
+        # Mean |tier 1 - tier 2| per score, to tune --band
+        stats["mean_abs_score_diff"] = {
+            key: round(sum(abs(r["tier1_scores"][key] - r["tier2_scores"][key]) for r in records) / len(records), 2)
+            for key in score_keys
+        } if records else {}
+
+
+def print_summary(stats):
+    total = stats["abstracts"]
+    print(f"Triage completed: {total} abstracts, {stats['accepted']} accepted "
+          f"(thresholds {', '.join(f'{key}>={value:g}' for key, value in stats['thresholds'].items())}, "
+          f"band {stats['band']:g})")
+    print(f"Pipelines loaded in {stats['load_seconds']:.2f} s (not counted in the rates below)")
+    print(f"Tier 1 (lexical): {total} abstracts in {stats['tier1_seconds']:.2f} s ({stats['tier1_rate'] or 0:.1f} abstracts/s)")
+    share = stats["escalated"] / total * 100 if total else 0.0
+    print(f"Tier 2 (full):    {stats['escalated']} abstracts ({share:.1f}%) in {stats['tier2_seconds']:.2f} s "
+          f"({stats['tier2_rate'] or 0:.1f} abstracts/s)")
+    if stats["speedup_vs_full"]:
+        print(f"Overall: {stats['rate']:.1f} abstracts/s, {stats['speedup_vs_full']:.1f}x the full pipeline alone")
+    for name, agreement in stats["agreement"].items():
+        if agreement["abstracts"]:
+            print(f"Agreement ({name}): {agreement['agreement'] * 100:.1f}% of {agreement['abstracts']} "
+                  f"({agreement['accept_to_reject']} accept->reject, {agreement['reject_to_accept']} reject->accept)")
+    if stats["agreement"]["audit"]["abstracts"] == 0:
+        print("[WARN] No audited abstracts: raise --audit to measure the agreement of tier-1 decisions")
+    if stats["mean_abs_score_diff"]:
+        print("Mean |tier 1 - tier 2| score difference: "
+              + ", ".join(f"{key} {value:.1f}" for key, value in stats["mean_abs_score_diff"].items()))
+
+
+def main():
+    from loader import Loader
+
+    parser = argparse.ArgumentParser(description="SPAA triage cascade: lexical tier, full parse for borderline abstracts")
+    parser.add_argument("--input-dir", type=str, default=None, help="Directory of abstract files.")
+    parser.add_argument("--glob", type=str, default="*.txt", help="Filename pattern inside --input-dir (default: *.txt).")
+    parser.add_argument("--corpus", type=str, nargs="+", default=None, help="Multi-abstract corpus files (corpus_reader.py).")
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild the corpus offset indexes.")
+    parser.add_argument("--threshold", type=str, action="append", default=None,
+                        help=f"Acceptance threshold, KEY=VALUE with KEY {OVERALL} (mean of the sections) or a section "
+                             f"(e.g. METHODOLOGY=50); repeatable, a bare number is {OVERALL} (default: {DEFAULT_THRESHOLD:g}).")
+    parser.add_argument("--band", type=float, default=DEFAULT_BAND,
+                        help=f"Tier-1 scores within this many points of a threshold go to the full pipeline (default: {DEFAULT_BAND:g}).")
+    parser.add_argument("--audit", type=float, default=DEFAULT_AUDIT,
+                        help=f"Fraction of the other abstracts also scored in full to measure agreement (default: {DEFAULT_AUDIT:g}).")
+    parser.add_argument("--tag", type=str, default=None, help="Domain tag (e.g., pparg, all).")
+    parser.add_argument("--config", type=str, default=CONFIG_FILE, help="Keyword configuration file.")
+    parser.add_argument("--weights", type=str, default=WEIGHT_FILE, help="Weight configuration file.")
+    parser.add_argument("--lexicon-dir", type=str, default="lexicon", help="Base directory of the domain lexicons.")
+    parser.add_argument("--batch-size", type=int, default=64, help="nlp.pipe batch size of the full pipeline.")
+    parser.add_argument("--out", type=str, default=None, help="One triage record per abstract (.jsonl or .csv).")
+    parser.add_argument("--output-dir", type=str, default=None, help="Also write the full reports of the tier-2 abstracts here.")
+    parser.add_argument("--summary-out", type=str, default=None, help="Write the triage summary as JSON here.")
+    args = parser.parse_args()
+
+    if bool(args.input_dir) == bool(args.corpus):
+        parser.error("give one of --input-dir or --corpus")
+    if not 0.0 <= args.audit <= 1.0:
+        parser.error("--audit must be between 0 and 1")
+    try:
+        thresholds = parse_thresholds(args.threshold, list(REGISTRY.get_weights(args.weights)))
+        if args.out:
+            check_records_path(args.out)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    files = sorted(glob.glob(os.path.join(args.input_dir, args.glob))) if args.input_dir else []
+    inputs = Inputs(Loader(None, args.config, args.weights), files, args.corpus or (), args.rebuild_index)
+    cascade = TriageCascade(
+        inputs, args.config, args.weights, thresholds,
+        band=args.band,
+        audit=args.audit,
+        domain_tag=args.tag,
+        lexicon_dir=args.lexicon_dir,
+        batch_size=args.batch_size,
+        output_dir=args.output_dir,
+    )
+    try:
+        stats = cascade.run(args.out)
+    finally:
+        inputs.close()
+    print_summary(stats)
+    if args.out:
+        print(f"Triage records saved to: {args.out}")
+    if args.summary_out:
+        with atomic_path(args.summary_out) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stats, f, indent=2)
+        print(f"Triage summary saved to: {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()